@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# BFS só de distâncias em mapas grandes: niveis_bfs com o laço em Python
+# contra o motor NumPy (bfs_vetorizada.py), que expande um nível inteiro por
+# vez. A montagem da matriz de adjacência é medida à parte, já que fica em
+# cache até o grafo mudar; busca_bfs sem histórico entra como referência.
+# Distâncias e pais dos dois motores são conferidos.
+#
+# Uso: python benchmarks/benchmark_bfs_vetorizada.py [--tamanhos 10000,100000,1000000] [--compacto]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from bfs_vetorizada import obter_matriz
+from gerador_mapas import gerar_caverna
+from grafo import MOTOR_NUMPY, MOTOR_PYTHON
+
+def cronometrar(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+def conferir(grafo, python, vetorizado):
+    # Mesmos nós alcançados, com a mesma distância e o mesmo pai
+    if len(python) != len(vetorizado):
+        return False
+    ids = np.fromiter(python.distancias, dtype=np.int64, count=len(python))
+    indices = vetorizado.matriz.indices_de(ids)
+    distancias = np.fromiter(python.distancias.values(), dtype=np.int64, count=len(python))
+    pais = np.fromiter((-1 if pai is None else pai for pai in python.pais.values()), dtype=np.int64, count=len(python))
+    pais_vetorizados = vetorizado.pais[indices]
+    pais_vetorizados = np.where(pais_vetorizados < 0, -1, vetorizado.matriz.ids[pais_vetorizados])
+    return bool(np.array_equal(vetorizado.distancias[indices], distancias)
+                and np.array_equal(pais_vetorizados, pais))
+
+def main():
+    parser = argparse.ArgumentParser(description="BFS por níveis: laço em Python x NumPy")
+    parser.add_argument("--tamanhos", default="10000,100000,1000000", help="números de locais, separados por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções de cada motor (vale a melhor)")
+    parser.add_argument("--semente", type=int, default=1, help="semente do gerador")
+    parser.add_argument("--compacto", action="store_true", help="usa GrafoCSR em vez de Grafo")
+    args = parser.parse_args()
+
+    for tamanho in (int(t) for t in args.tamanhos.split(",")):
+        mapa = gerar_caverna(tamanho, semente=args.semente, compacto=args.compacto)
+        grafo = mapa.grafo
+        print(f"{tamanho} locais ({type(grafo).__name__})")
+
+        _, tempo_matriz = cronometrar(obter_matriz, grafo)
+        tempos_python = []
+        tempos_numpy = []
+        for _ in range(args.repeticoes):
+            python, tempo = cronometrar(grafo.niveis_bfs, mapa.inicio_id, motor=MOTOR_PYTHON)
+            tempos_python.append(tempo)
+            vetorizado, tempo = cronometrar(grafo.niveis_bfs, mapa.inicio_id, motor=MOTOR_NUMPY)
+            tempos_numpy.append(tempo)
+        _, tempo_busca = cronometrar(grafo.busca_bfs, mapa.inicio_id, mapa.tesouros[0], registrar_historico=False)
+
+        confere = "ok" if conferir(grafo, python, vetorizado) else "DIFERENTE"
+        print(f"  python {min(tempos_python):8.3f} s   numpy {min(tempos_numpy):8.3f} s   "
+              f"({min(tempos_python) / min(tempos_numpy):5.1f}x, {confere})   "
+              f"matriz {tempo_matriz:.3f} s   busca_bfs até o tesouro {tempo_busca:.3f} s   "
+              f"{len(python)} locais alcançados")
+
+if __name__ == "__main__":
+    main()
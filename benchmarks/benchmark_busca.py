@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# Benchmark das buscas BFS/DFS: compara a versão com predecessores
+# (atual) com a versão antiga que copiava o caminho a cada nó empilhado.
+#
+# Uso: python benchmarks/benchmark_busca.py [--nos 200000]
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from grafo import Grafo, NoGrafo
+
+def criar_grade(lado):
+    # Grade lado x lado com conexões horizontais e verticais
+    grafo = Grafo()
+    for linha in range(lado):
+        for coluna in range(lado):
+            no_id = linha * lado + coluna + 1
+            grafo.adicionar_no(NoGrafo(no_id, f"Local {no_id}", coluna * 40, linha * 40))
+    for linha in range(lado):
+        for coluna in range(lado):
+            no_id = linha * lado + coluna + 1
+            if coluna + 1 < lado:
+                grafo.adicionar_aresta(no_id, no_id + 1)
+            if linha + 1 < lado:
+                grafo.adicionar_aresta(no_id, no_id + lado)
+    return grafo
+
+# Versões antigas (sem histórico), que carregam uma cópia do caminho por nó
+def bfs_copiando_caminho(grafo, inicio_id, destino_id):
+    visitados = set()
+    fronteira = set([inicio_id])
+    fila = deque([(inicio_id, [inicio_id])])
+    while fila:
+        atual, caminho = fila.popleft()
+        fronteira.discard(atual)
+        if atual == destino_id:
+            return caminho
+        if atual not in visitados:
+            visitados.add(atual)
+            for vizinho in grafo.arestas[atual]:
+                if grafo.nos[vizinho].eh_armadilha:
+                    continue
+                if vizinho not in visitados and vizinho not in fronteira:
+                    novo_caminho = caminho.copy()
+                    novo_caminho.append(vizinho)
+                    fronteira.add(vizinho)
+                    fila.append((vizinho, novo_caminho))
+    return None
+
+def dfs_copiando_caminho(grafo, inicio_id, destino_id):
+    visitados = set()
+    pilha = [(inicio_id, [inicio_id])]
+    while pilha:
+        atual, caminho = pilha.pop()
+        if atual == destino_id:
+            return caminho
+        if atual not in visitados:
+            visitados.add(atual)
+            vizinhos = list(grafo.arestas[atual])
+            vizinhos.reverse()
+            for vizinho in vizinhos:
+                if grafo.nos[vizinho].eh_armadilha:
+                    continue
+                if vizinho not in visitados:
+                    novo_caminho = caminho.copy()
+                    novo_caminho.append(vizinho)
+                    pilha.append((vizinho, novo_caminho))
+    return None
+
+def medir(funcao, *args):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    tempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tempo, pico
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memória e tempo das buscas")
+    parser.add_argument("--nos", type=int, default=200_000, help="número aproximado de locais")
+    parser.add_argument("--limite-copia", type=int, default=20_000,
+                        help="acima deste tamanho o DFS que copia o caminho é omitido (esgota a memória)")
+    args = parser.parse_args()
+    
+    lado = max(2, int(args.nos ** 0.5))
+    grafo = criar_grade(lado)
+    inicio_id, destino_id = 1, lado * lado
+    print(f"Grade {lado}x{lado} ({lado * lado} locais), de {inicio_id} até {destino_id}")
+    
+    casos = [
+        ("BFS copiando caminho", bfs_copiando_caminho, (grafo, inicio_id, destino_id)),
+        ("BFS com predecessores", lambda *a: grafo.busca_bfs(*a, registrar_historico=False)[0], (inicio_id, destino_id)),
+        ("DFS copiando caminho", dfs_copiando_caminho, (grafo, inicio_id, destino_id)),
+        ("DFS com predecessores", lambda *a: grafo.busca_dfs(*a, registrar_historico=False)[0], (inicio_id, destino_id)),
+    ]
+    
+    for nome, funcao, argumentos in casos:
+        if nome == "DFS copiando caminho" and lado * lado > args.limite_copia:
+            print(f"{nome:<24} omitido (acima de --limite-copia)")
+            continue
+        caminho, tempo, pico = medir(funcao, *argumentos)
+        tamanho = len(caminho) if caminho else 0
+        print(f"{nome:<24} tempo {tempo:8.3f} s   pico {pico / 2**20:9.1f} MiB   caminho {tamanho} nós")
+
+if __name__ == "__main__":
+    main()
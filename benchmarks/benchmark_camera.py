@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# Tempo de desenho de um quadro do tabuleiro com a câmera, em cavernas de
+# tamanhos crescentes. Como só os locais dentro da vista são desenhados, o
+# tempo por quadro deve depender do zoom (quantos locais cabem na tela) e não
+# do tamanho do mapa. Roda sem janela (SDL_VIDEODRIVER=dummy).
+#
+# Uso: python benchmarks/benchmark_camera.py [--tamanhos 1000,100000] [--quadros 20] [--compacto]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pygame
+
+from camera import Camera
+from configuracoes import ALTURA, LARGURA
+from gerador_mapas import gerar_caverna
+from renderizacao import desenhar_grafo
+
+TAMANHOS = [1_000, 10_000, 100_000, 1_000_000]
+ZOOMS = [1.0, 0.4, 0.16]
+AREA = (0, 0, 1050, ALTURA)
+
+def medir_quadro(tela, grafo, camera, estados, quadros):
+    caminho, visitados, fronteira = estados
+    # Primeiro quadro à parte: monta o índice espacial e os caches de texto
+    desenhar_grafo(tela, grafo, None, caminho, visitados, fronteira, camera=camera)
+    tempos = []
+    for _ in range(quadros):
+        inicio = time.perf_counter()
+        desenhar_grafo(tela, grafo, None, caminho, visitados, fronteira, camera=camera)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo por quadro do tabuleiro com câmera")
+    parser.add_argument("--tamanhos", default=",".join(str(t) for t in TAMANHOS),
+                        help="números de locais, separados por vírgula")
+    parser.add_argument("--quadros", type=int, default=20, help="quadros cronometrados por caso")
+    parser.add_argument("--semente", type=int, default=1, help="semente do gerador")
+    parser.add_argument("--compacto", action="store_true", help="usa GrafoCSR em vez de Grafo")
+    args = parser.parse_args()
+
+    pygame.init()
+    tela = pygame.display.set_mode((LARGURA, ALTURA))
+
+    for tamanho in (int(t) for t in args.tamanhos.split(",")):
+        mapa = gerar_caverna(tamanho, semente=args.semente, compacto=args.compacto)
+        grafo = mapa.grafo
+        # Uma busca de verdade deixa visitados, fronteira e caminho para colorir
+        caminho, _, visitados, fronteira, _ = grafo.busca_bfs(mapa.inicio_id, mapa.tesouros[0],
+                                                              registrar_historico=False)
+        x_min, y_min, x_max, y_max, _ = grafo.obter_geometria()
+        print(f"{tamanho} locais")
+
+        for zoom in ZOOMS:
+            camera = Camera(AREA, zoom=zoom)
+            camera.centralizar((x_min + x_max) / 2, (y_min + y_max) / 2)
+            tempo = medir_quadro(tela, grafo, camera, (caminho, visitados, fronteira), args.quadros)
+            na_tela = sum(1 for _ in grafo.nos_no_retangulo(*camera.retangulo_visivel()))
+            print(f"  zoom {zoom:4.2f}   {na_tela:>6} locais na tela   {tempo * 1000:7.2f} ms/quadro")
+        del mapa, grafo, caminho, visitados, fronteira
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# Tesouro isolado por armadilhas: quanto a BFS e a DFS levam para descobrir
+# que não há caminho (exploram toda a região do jogador) contra a consulta ao
+# índice de componentes (componentes.py). As vizinhas do tesouro viram
+# armadilhas depois que o índice foi montado, como definir_armadilha faria
+# durante o jogo; cada armadilha divide a componente na hora, explorando só
+# o pedaço cortado (o tesouro), e as consultas são só ao union-find.
+#
+# Uso: python benchmarks/benchmark_componentes.py [--tamanhos 10000,100000,1000000] [--compacto]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gerador_mapas import gerar_caverna
+
+def cronometrar(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description="Tesouro inalcançável: busca completa x índice de componentes")
+    parser.add_argument("--tamanhos", default="10000,100000,1000000", help="números de locais, separados por vírgula")
+    parser.add_argument("--consultas", type=int, default=1000, help="consultas ao índice depois da primeira")
+    parser.add_argument("--semente", type=int, default=1, help="semente do gerador")
+    parser.add_argument("--compacto", action="store_true", help="usa GrafoCSR em vez de Grafo")
+    args = parser.parse_args()
+
+    for tamanho in (int(t) for t in args.tamanhos.split(",")):
+        mapa = gerar_caverna(tamanho, semente=args.semente, compacto=args.compacto)
+        grafo = mapa.grafo
+        inicio_id, tesouro_id = mapa.inicio_id, mapa.tesouros[0]
+        print(f"{tamanho} locais ({type(grafo).__name__})")
+
+        _, tempo_montagem = cronometrar(grafo.obter_componentes)
+        inicio = time.perf_counter()
+        for vizinho in grafo.arestas[tesouro_id]:
+            grafo.nos[vizinho].definir_armadilha()
+        tempo_armadilhas = time.perf_counter() - inicio
+
+        alcancavel, tempo_primeira = cronometrar(grafo.alcancavel, inicio_id, tesouro_id)
+        inicio = time.perf_counter()
+        for _ in range(args.consultas):
+            grafo.alcancavel(inicio_id, tesouro_id)
+        tempo_consulta = (time.perf_counter() - inicio) / args.consultas
+        resultado_bfs, tempo_bfs = cronometrar(grafo.busca_bfs, inicio_id, tesouro_id)
+        resultado_dfs, tempo_dfs = cronometrar(grafo.busca_dfs, inicio_id, tesouro_id)
+
+        confere = "ok" if not alcancavel and resultado_bfs[0] is None and resultado_dfs[0] is None else "DIFERENTE"
+        print(f"  busca_bfs {tempo_bfs:8.3f} s   busca_dfs {tempo_dfs:8.3f} s   "
+              f"índice: montagem {tempo_montagem:.3f} s, armadilhas {tempo_armadilhas * 1e3:.2f} ms, "
+              f"primeira consulta {tempo_primeira * 1e6:.1f} µs, "
+              f"depois {tempo_consulta * 1e6:.1f} µs ({confere})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# Escalabilidade das buscas (BFS, BFS bidirecional, DFS, Dijkstra e A*) em
+# cavernas geradas por gerador_mapas.py, de 10² a 10⁶ locais. Para cada tamanho e busca mede
+# tempo (mediana das repetições), pico de memória (tracemalloc, numa execução
+# à parte para não distorcer o tempo), nós expandidos e tamanho do histórico.
+# Os resultados podem ser gravados em JSON para acompanhar regressões entre
+# versões.
+#
+# Uso: python benchmarks/benchmark_escalabilidade.py [--tamanhos 100,1000,10000]
+#                                                    [--saida resultados.json]
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gerador_mapas import DENSIDADE_ARMADILHAS, GRAU_MEDIO, gerar_caverna
+
+TAMANHOS = [100, 1_000, 10_000, 100_000, 1_000_000]
+BUSCAS = ["busca_bfs", "busca_bfs_bidirecional", "busca_dfs", "busca_dijkstra", "busca_a_estrela"]
+
+def executar(grafo, busca, inicio_id, destino_id):
+    return getattr(grafo, busca)(inicio_id, destino_id, registrar_historico=True)
+
+def medir_tempo(grafo, busca, inicio_id, destino_id, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = executar(grafo, busca, inicio_id, destino_id)
+        tempos.append(time.perf_counter() - inicio)
+        # Libera o histórico antes da próxima repetição
+        del resultado
+    return statistics.median(tempos)
+
+def medir_pico(grafo, busca, inicio_id, destino_id):
+    tracemalloc.start()
+    resultado = executar(grafo, busca, inicio_id, destino_id)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, pico
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo e memória das buscas por tamanho de mapa")
+    parser.add_argument("--tamanhos", default=",".join(str(t) for t in TAMANHOS),
+                        help="números de locais, separados por vírgula")
+    parser.add_argument("--grau", type=float, default=GRAU_MEDIO, help="grau médio das cavernas")
+    parser.add_argument("--armadilhas", type=float, default=DENSIDADE_ARMADILHAS,
+                        help="fração dos locais com armadilha")
+    parser.add_argument("--semente", type=int, default=1, help="semente do gerador")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções cronometradas por busca")
+    parser.add_argument("--compacto", action="store_true", help="usa GrafoCSR em vez de Grafo")
+    parser.add_argument("--saida", help="grava os resultados neste arquivo JSON")
+    args = parser.parse_args()
+
+    tamanhos = [int(t) for t in args.tamanhos.split(",")]
+    resultados = []
+
+    for tamanho in tamanhos:
+        inicio = time.perf_counter()
+        mapa = gerar_caverna(tamanho, args.grau, args.armadilhas, args.semente, compacto=args.compacto)
+        tempo_geracao = time.perf_counter() - inicio
+        grafo = mapa.grafo
+        inicio_id, destino_id = mapa.inicio_id, mapa.tesouros[0]
+        print(f"{tamanho} locais (gerados em {tempo_geracao:.2f} s)")
+
+        for busca in BUSCAS:
+            tempo = medir_tempo(grafo, busca, inicio_id, destino_id, args.repeticoes)
+            (caminho, historico, visitados, _, _), pico = medir_pico(grafo, busca, inicio_id, destino_id)
+            resultado = {
+                "tamanho": tamanho,
+                "busca": busca,
+                "tempo_s": tempo,
+                "pico_memoria_bytes": pico,
+                "nos_expandidos": len(visitados),
+                "tamanho_caminho": len(caminho) if caminho else 0,
+                "custo_caminho": grafo.custo_caminho(caminho) if caminho else None,
+                "passos_historico": len(historico),
+                "eventos_historico": len(historico.tipos),
+                "memoria_historico_bytes": historico.memoria_bytes(),
+                "tempo_geracao_s": tempo_geracao,
+            }
+            resultados.append(resultado)
+            print(f"  {busca:<22} tempo {tempo:8.3f} s   pico {pico / 2**20:8.1f} MiB   "
+                  f"expandidos {len(visitados):>8}   caminho {resultado['tamanho_caminho']:>6}   "
+                  f"histórico {len(historico):>8} passos / {resultado['memoria_historico_bytes'] / 2**20:.1f} MiB")
+            del caminho, historico, visitados
+
+        # Nós expandidos por cada busca em relação à BFS comum
+        expandidos = {r["busca"]: r["nos_expandidos"] for r in resultados if r["tamanho"] == tamanho}
+        if expandidos["busca_bfs"]:
+            print("  expandidos em relação à BFS: " + ", ".join(
+                f"{busca} {expandidos[busca] / expandidos['busca_bfs']:.1%}" for busca in BUSCAS[1:]))
+        del mapa, grafo
+
+    if args.saida:
+        documento = {
+            "parametros": {
+                "grau": args.grau,
+                "armadilhas": args.armadilhas,
+                "semente": args.semente,
+                "repeticoes": args.repeticoes,
+                "compacto": args.compacto,
+            },
+            "ambiente": {
+                "python": platform.python_version(),
+                "implementacao": platform.python_implementation(),
+                "sistema": platform.platform(),
+                "processador": platform.processor() or platform.machine(),
+            },
+            "resultados": resultados,
+        }
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(documento, arquivo, indent=2)
+        print(f"Resultados gravados em {args.saida}")
+
+if __name__ == "__main__":
+    main()
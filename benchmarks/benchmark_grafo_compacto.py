@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Compara memória e velocidade de travessia entre Grafo (dicionários de
+# NoGrafo e listas) e GrafoCSR (arrays tipados).
+#
+# Uso: python benchmarks/benchmark_grafo_compacto.py [--nos 1000000]
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmark_busca import criar_grade
+from grafo_compacto import GrafoCSR
+
+def memoria_retida(construir):
+    # Memória que continua alocada depois da construção (temporários liberados)
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objeto = construir()
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objeto, depois - antes
+
+def tempo_busca(grafo, busca, inicio_id, destino_id):
+    inicio = time.perf_counter()
+    caminho = getattr(grafo, busca)(inicio_id, destino_id, registrar_historico=False)[0]
+    return time.perf_counter() - inicio, caminho
+
+def main():
+    parser = argparse.ArgumentParser(description="Grafo em dicionários x GrafoCSR")
+    parser.add_argument("--nos", type=int, default=1_000_000, help="número aproximado de locais")
+    args = parser.parse_args()
+    
+    lado = max(2, int(args.nos ** 0.5))
+    total = lado * lado
+    print(f"Grade {lado}x{lado} ({total} locais)")
+    
+    # Os nomes da versão "com nomes" são as mesmas strings do Grafo de origem,
+    # então só a lista de referências entra na conta
+    grafo, memoria_dict = memoria_retida(lambda: criar_grade(lado))
+    compacto, memoria_csr = memoria_retida(lambda: GrafoCSR.de_grafo(grafo))
+    sem_nomes, memoria_csr_sem_nomes = memoria_retida(lambda: GrafoCSR.de_grafo(grafo, manter_nomes=False))
+    
+    print(f"{'Grafo (dicionários)':<24} {memoria_dict / 2**20:9.1f} MiB  {memoria_dict / total:7.1f} bytes/nó")
+    print(f"{'GrafoCSR + lista de nomes':<24} {memoria_csr / 2**20:9.1f} MiB  {memoria_csr / total:7.1f} bytes/nó")
+    print(f"{'GrafoCSR sem nomes':<24} {memoria_csr_sem_nomes / 2**20:9.1f} MiB  {memoria_csr_sem_nomes / total:7.1f} bytes/nó")
+    
+    for busca in ("busca_bfs", "busca_dfs"):
+        for nome, g in (("Grafo (dicionários)", grafo), ("GrafoCSR", sem_nomes)):
+            tempo, caminho = tempo_busca(g, busca, 1, total)
+            print(f"{busca} {nome:<20} {tempo:8.3f} s   caminho {len(caminho) if caminho else 0} nós")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# Mede o tempo de importação a frio do núcleo (grafo.py) e verifica que ele
+# não carrega o pygame. Cada medição roda em um processo novo com
+# "python -X importtime"; o valor reportado é o tempo cumulativo do módulo.
+#
+# Uso: python benchmarks/benchmark_importacao.py [--repeticoes 15] [--meta-ms 50]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Meta de tempo de importação a frio do núcleo, em milissegundos
+META_MS = 50
+
+CODIGO = "import grafo, sys; sys.exit(1 if 'pygame' in sys.modules else 0)"
+
+def medir_importacao(modulo):
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", CODIGO],
+                              cwd=RAIZ, capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise SystemExit("O núcleo importou o pygame!")
+    
+    # Formato: "import time: self [us] | cumulative | nome"
+    for linha in processo.stderr.splitlines():
+        partes = [parte.strip() for parte in linha.split("|")]
+        if len(partes) == 3 and partes[2] == modulo:
+            return int(partes[1]) / 1000
+    raise SystemExit(f"Módulo {modulo} não apareceu na saída de -X importtime")
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação a frio do núcleo")
+    parser.add_argument("--repeticoes", type=int, default=15)
+    parser.add_argument("--meta-ms", type=float, default=META_MS)
+    args = parser.parse_args()
+    
+    tempos = [medir_importacao("grafo") for _ in range(args.repeticoes)]
+    mediana = statistics.median(tempos)
+    print(f"import grafo: mediana {mediana:.1f} ms, mínimo {min(tempos):.1f} ms, máximo {max(tempos):.1f} ms "
+          f"({args.repeticoes} processos, meta {args.meta_ms:.0f} ms)")
+    
+    if mediana > args.meta_ms:
+        print("Acima da meta!")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
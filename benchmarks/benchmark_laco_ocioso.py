@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Uso de CPU do jogo parado (estado JOGANDO, sem entrada do usuário): o laço
+# antigo, que acorda 60 vezes por segundo para ler eventos e conferir o que
+# redesenhar, contra laco_principal, que dorme (esperar_eventos) até o
+# próximo evento ou prazo. Roda sem janela (driver de vídeo "dummy"), então
+# o custo de enviar quadros ao monitor não entra; numa janela de verdade o
+# laço antigo gasta ainda mais. O driver "dummy" também não sabe acordar o
+# pygame.event.wait do laço atual, e o SDL passa a consultar a fila a cada
+# 1 ms; nos drivers de janela (X11, Wayland, Windows, macOS) a espera dorme
+# de fato até o evento, então a CPU medida aqui é um limite por cima.
+#
+# Uso: python benchmarks/benchmark_laco_ocioso.py [--segundos 5] [--mapa caverna.ctmapa] [--desempenho]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from configuracoes import ALTURA, LARGURA
+from jogo_caca_tesouro_pygame import Jogo, laco_principal
+
+def laco_fixo(jogo, tela):
+    # O laço de antes: 60 quadros por segundo, com ou sem mudanças
+    clock = pygame.time.Clock()
+    executando = True
+    while executando:
+        for evento in pygame.event.get():
+            if not jogo.processar_evento(evento):
+                executando = False
+        jogo.atualizar_animacao()
+        retangulos = jogo.desenhar(tela)
+        if retangulos:
+            pygame.display.update(retangulos)
+        clock.tick(60)
+
+def medir(laco, jogo, tela, segundos):
+    # Roda o laço até um QUIT agendado e devolve (% de CPU, quadros por segundo)
+    pygame.event.clear()
+    pygame.time.set_timer(pygame.QUIT, int(segundos * 1000), 1)
+    contador = []
+    desenhar = jogo.desenhar
+    jogo.desenhar = lambda tela: contador.append(None) or desenhar(tela)
+    cpu = time.process_time()
+    inicio = time.perf_counter()
+    laco(jogo, tela)
+    parede = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu
+    del jogo.desenhar
+    return 100 * cpu / parede, len(contador) / parede
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU do jogo parado: laço de 60 quadros fixos x laço orientado a eventos")
+    parser.add_argument("--segundos", type=float, default=5, help="duração de cada medição")
+    parser.add_argument("--mapa", default=None, help="arquivo de mapa (padrão: mapa original)")
+    parser.add_argument("--desempenho", action="store_true", help="com o painel de desempenho (F3) visível")
+    args = parser.parse_args()
+
+    pygame.init()
+    tela = pygame.display.set_mode((LARGURA, ALTURA))
+    jogo = Jogo(args.mapa)
+    if args.desempenho:
+        jogo.alternar_desempenho()
+    # Primeiro quadro completo fora da medição
+    jogo.desenhar(tela)
+
+    for nome, laco in (("60 quadros fixos", laco_fixo), ("orientado a eventos", laco_principal)):
+        cpu, quadros = medir(laco, jogo, tela, args.segundos)
+        print(f"{nome:<20} CPU {cpu:6.2f}%   {quadros:6.1f} iterações/s")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
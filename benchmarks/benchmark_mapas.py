@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# Tempo de carregamento de mapas grandes no formato texto (.json) e no
+# binário (.ctmapa), com e sem mmap, e tempo até a primeira busca.
+#
+# Uso: python benchmarks/benchmark_mapas.py [--nos 1000000]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmark_busca import criar_grade
+from mapas import Mapa, carregar_mapa_binario, carregar_mapa_json, salvar_mapa_binario, salvar_mapa_json
+
+def cronometrar(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description="Carregamento de mapas: JSON x binário")
+    parser.add_argument("--nos", type=int, default=1_000_000, help="número aproximado de locais")
+    args = parser.parse_args()
+    
+    lado = max(2, int(args.nos ** 0.5))
+    total = lado * lado
+    mapa = Mapa(criar_grade(lado), 1, [total])
+    mapa.grafo.nos[total].definir_tesouro()
+    print(f"Grade {lado}x{lado} ({total} locais)")
+    
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo_json = os.path.join(pasta, "mapa.json")
+        arquivo_binario = os.path.join(pasta, "mapa.ctmapa")
+        salvar_mapa_json(mapa, arquivo_json)
+        salvar_mapa_binario(mapa, arquivo_binario)
+        print(f"Tamanho: JSON {os.path.getsize(arquivo_json) / 2**20:.1f} MiB, "
+              f"binário {os.path.getsize(arquivo_binario) / 2**20:.1f} MiB")
+        
+        casos = [
+            ("JSON", carregar_mapa_json, {}),
+            ("binário sem mmap", carregar_mapa_binario, {"usar_mmap": False}),
+            ("binário com mmap", carregar_mapa_binario, {}),
+        ]
+        for nome, carregar, opcoes in casos:
+            arquivo = arquivo_json if nome == "JSON" else arquivo_binario
+            carregado, tempo_carga = cronometrar(carregar, arquivo, **opcoes)
+            # Uma busca curta mostra o custo de acesso logo após abrir o mapa
+            _, tempo_busca = cronometrar(carregado.grafo.busca_bfs, 1, lado + 2, registrar_historico=False)
+            print(f"{nome:<18} carga {tempo_carga:8.3f} s   primeira busca {tempo_busca:8.4f} s")
+
+if __name__ == "__main__":
+    main()
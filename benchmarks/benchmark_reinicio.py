@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Custo de reiniciar uma partida: reler o mapa do arquivo e remontar o índice
+# de componentes (como o jogo fazia a cada "Reiniciar Jogo") contra pegar o
+# modelo compartilhado já carregado (mapas.carregar_modelo), que só confere
+# se o arquivo mudou no disco.
+#
+# Uso: python benchmarks/benchmark_reinicio.py [--tamanhos 10000,100000,1000000] [--formato ctmapa]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gerador_mapas import gerar_caverna
+from mapas import carregar_mapa, carregar_modelo, salvar_mapa
+
+def recarregar(caminho_arquivo):
+    mapa = carregar_mapa(caminho_arquivo)
+    mapa.grafo.obter_componentes()
+    return mapa
+
+def reaproveitar(caminho_arquivo):
+    mapa = carregar_modelo(caminho_arquivo)
+    mapa.grafo.obter_componentes()
+    return mapa
+
+def cronometrar(funcao, repeticoes, *args):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao(*args)
+    return (time.perf_counter() - inicio) / repeticoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Reinício de partida: recarregar o mapa x modelo compartilhado")
+    parser.add_argument("--tamanhos", default="10000,100000,1000000", help="números de locais, separados por vírgula")
+    parser.add_argument("--formato", choices=("ctmapa", "json"), default="ctmapa", help="formato do arquivo de mapa")
+    parser.add_argument("--reinicios", type=int, default=3, help="reinícios medidos recarregando o mapa")
+    parser.add_argument("--semente", type=int, default=1, help="semente do gerador")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for tamanho in (int(t) for t in args.tamanhos.split(",")):
+            arquivo = os.path.join(pasta, f"caverna{tamanho}.{args.formato}")
+            salvar_mapa(gerar_caverna(tamanho, semente=args.semente), arquivo)
+
+            tempo_recarregar = cronometrar(recarregar, args.reinicios, arquivo)
+            # O primeiro uso do modelo paga a carga; os seguintes não
+            tempo_primeiro = cronometrar(reaproveitar, 1, arquivo)
+            tempo_modelo = cronometrar(reaproveitar, 1000, arquivo)
+            print(f"{tamanho} locais: recarregar {tempo_recarregar:8.3f} s   "
+                  f"modelo: primeira carga {tempo_primeiro:.3f} s, depois {tempo_modelo * 1e6:.1f} µs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Tesouro mais próximo em mapas com muitos tesouros: uma busca por tesouro
+# (busca_bfs / busca_dijkstra para cada um, ficando com o melhor) contra uma
+# única busca multifonte (busca_mais_proximo) e contra a árvore multifonte
+# em cache (arvore_ate), que responde a qualquer ponto de partida.
+#
+# Uso: python benchmarks/benchmark_tesouros.py [--nos 20000] [--tesouros 1,10,100,500]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gerador_mapas import gerar_caverna
+
+def cronometrar(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+def uma_busca_por_tesouro(grafo, inicio_id, tesouros, por_custo):
+    busca = grafo.busca_dijkstra if por_custo else grafo.busca_bfs
+    melhor = None
+    for tesouro_id in tesouros:
+        caminho = busca(inicio_id, tesouro_id, registrar_historico=False)[0]
+        if caminho is None:
+            continue
+        custo = grafo.custo_caminho(caminho) if por_custo else len(caminho) - 1
+        if melhor is None or custo < melhor:
+            melhor = custo
+    return melhor
+
+def main():
+    parser = argparse.ArgumentParser(description="Tesouro mais próximo: N buscas x uma busca multifonte")
+    parser.add_argument("--nos", type=int, default=20_000, help="número de locais")
+    parser.add_argument("--tesouros", default="1,10,100,500", help="quantidades de tesouros, separadas por vírgula")
+    parser.add_argument("--semente", type=int, default=1, help="semente do gerador")
+    args = parser.parse_args()
+
+    for num_tesouros in (int(t) for t in args.tesouros.split(",")):
+        mapa = gerar_caverna(args.nos, semente=args.semente, num_tesouros=num_tesouros)
+        grafo = mapa.grafo
+        print(f"{args.nos} locais, {num_tesouros} tesouros")
+
+        for por_custo in (False, True):
+            nome = "Dijkstra" if por_custo else "BFS"
+            esperado, tempo_separadas = cronometrar(uma_busca_por_tesouro, grafo, mapa.inicio_id,
+                                                    mapa.tesouros, por_custo)
+            (_, caminho), tempo_multifonte = cronometrar(grafo.busca_mais_proximo, mapa.inicio_id,
+                                                         mapa.tesouros, por_custo)
+            obtido = None
+            if caminho is not None:
+                obtido = grafo.custo_caminho(caminho) if por_custo else len(caminho) - 1
+            confere = "ok" if obtido == esperado or abs(obtido - esperado) < 1e-6 else "DIFERENTE"
+            print(f"  {nome:<8} {num_tesouros} buscas {tempo_separadas:8.3f} s   "
+                  f"multifonte {tempo_multifonte:8.4f} s   ({tempo_separadas / tempo_multifonte:7.1f}x, {confere})")
+
+        grafo.arvores.clear()
+        arvore, tempo_arvore = cronometrar(grafo.arvore_ate, *mapa.tesouros)
+        print(f"  árvore multifonte (todos os pontos de partida) {tempo_arvore:.3f} s, "
+              f"{len(arvore.distancias)} locais alcançam um tesouro")
+
+if __name__ == "__main__":
+    main()
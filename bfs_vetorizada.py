@@ -0,0 +1,172 @@
+# BFS por níveis com NumPy, para consultas só de distância em mapas enormes.
+#
+# A adjacência vira uma matriz esparsa em formato CSR com índices de nó (não
+# ids): os vizinhos do nó i são indices[indptr[i]:indptr[i + 1]]. Cada nível
+# da BFS é expandido de uma vez: as fatias de todos os nós da fronteira são
+# juntadas num único array de vizinhos, que é filtrado por máscaras booleanas
+# (já alcançados, armadilhas) e deduplicado mantendo a primeira ocorrência.
+# Como a fronteira segue a ordem em que a BFS comum enfileiraria os nós,
+# distâncias e pais saem iguais aos de GrafoBase.niveis_bfs com o motor
+# Python.
+#
+# NumPy é uma dependência opcional: este módulo só é importado quando o
+# motor MOTOR_NUMPY é pedido (veja GrafoBase.niveis_bfs).
+
+import weakref
+
+import numpy as np
+
+from grafo_compacto import MARCA_ARMADILHA, GrafoCSR
+
+# Matriz de cada grafo, junto com a versão do grafo usada para montá-la
+MATRIZES = weakref.WeakKeyDictionary()
+
+class MatrizAdjacencia:
+    def __init__(self, ids, indptr, alvos, armadilhas):
+        # alvos são os ids dos vizinhos, como em GrafoCSR
+        self.ids = ids                  # int64[n]: id de cada índice
+        self.indptr = indptr            # int64[n + 1]
+        self.armadilhas = armadilhas    # bool[n]
+
+        primeiro = int(ids[0]) if len(ids) else 0
+        if len(ids) and int(ids[-1]) - primeiro == len(ids) - 1 and np.all(np.diff(ids) == 1):
+            self.primeiro_id = primeiro
+            self.ordem = None
+        else:
+            # Ids quaisquer: busca binária sobre os ids ordenados
+            self.primeiro_id = None
+            self.ordem = np.argsort(ids, kind='stable')
+            self.ids_ordenados = ids[self.ordem]
+
+        self.indices = self.indices_de(alvos)  # int64[m]: índices dos vizinhos
+
+    def indices_de(self, ids):
+        # Índices de um array de ids (todos precisam existir no grafo)
+        ids = np.asarray(ids, dtype=np.int64)
+        if self.ordem is None:
+            return ids - self.primeiro_id
+        return self.ordem[np.searchsorted(self.ids_ordenados, ids)]
+
+    def indice_de(self, no_id):
+        # Índice de um único id; KeyError se ele não estiver no grafo
+        if self.ordem is None:
+            indice = no_id - self.primeiro_id
+        else:
+            posicao = int(np.searchsorted(self.ids_ordenados, no_id))
+            indice = int(self.ordem[posicao]) if posicao < len(self.ordem) else -1
+        if not 0 <= indice < len(self.ids) or self.ids[indice] != no_id:
+            raise KeyError(no_id)
+        return indice
+
+def montar_matriz(grafo):
+    if isinstance(grafo, GrafoCSR):
+        # Os arrays do GrafoCSR (inclusive memoryviews de um .ctmapa) são
+        # lidos sem cópia; só os alvos, que são ids, viram índices
+        ids = np.frombuffer(grafo.ids, dtype=np.int64)
+        indptr = np.frombuffer(grafo.offsets, dtype=np.int64)
+        alvos = np.frombuffer(grafo.alvos, dtype=np.int64)
+        armadilhas = (np.frombuffer(grafo.marcadores, dtype=np.uint8) & MARCA_ARMADILHA) != 0
+        return MatrizAdjacencia(ids, indptr, alvos, armadilhas)
+
+    ids = np.fromiter(grafo.nos, dtype=np.int64, count=len(grafo.nos))
+    graus = np.fromiter((len(grafo.arestas[no_id]) for no_id in grafo.nos), dtype=np.int64, count=len(ids))
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(graus, out=indptr[1:])
+    alvos = np.fromiter((vizinho for no_id in grafo.nos for vizinho in grafo.arestas[no_id]),
+                        dtype=np.int64, count=int(indptr[-1]))
+    armadilhas = np.fromiter((no.eh_armadilha for no in grafo.nos.values()), dtype=bool, count=len(ids))
+    return MatrizAdjacencia(ids, indptr, alvos, armadilhas)
+
+def obter_matriz(grafo):
+    # A matriz só é refeita quando o grafo muda (grafo.versao)
+    versao, matriz = MATRIZES.get(grafo, (None, None))
+    if matriz is None or versao != grafo.versao:
+        matriz = montar_matriz(grafo)
+        MATRIZES[grafo] = (grafo.versao, matriz)
+    return matriz
+
+class NiveisVetorizados:
+    # Resultado de niveis_bfs_numpy: distancias (int32, -1 = não alcançado)
+    # e pais (int64, -1 = sem pai) por índice de nó, mais consultas por id
+    # com a mesma interface de grafo.NiveisBFS
+    def __init__(self, matriz, distancias, pais):
+        self.matriz = matriz
+        self.distancias = distancias
+        self.pais = pais
+
+    def __contains__(self, no_id):
+        try:
+            return self.distancias[self.matriz.indice_de(no_id)] >= 0
+        except KeyError:
+            return False
+
+    def __len__(self):
+        return int(np.count_nonzero(self.distancias >= 0))
+
+    def distancia(self, no_id):
+        if no_id not in self:
+            return None
+        return int(self.distancias[self.matriz.indice_de(no_id)])
+
+    def pai(self, no_id):
+        if no_id not in self:
+            return None
+        indice = self.pais[self.matriz.indice_de(no_id)]
+        return None if indice < 0 else int(self.matriz.ids[indice])
+
+    def caminho(self, no_id):
+        if no_id not in self:
+            return None
+        indices = [self.matriz.indice_de(no_id)]
+        while self.pais[indices[-1]] >= 0:
+            indices.append(int(self.pais[indices[-1]]))
+        indices.reverse()
+        return [int(no) for no in self.matriz.ids[indices]]
+
+def expandir_nivel(matriz, fronteira):
+    # Vizinhos de todos os nós da fronteira, na ordem (nó da fronteira,
+    # ordem da lista de vizinhos), e o nó da fronteira de onde cada um veio
+    inicios = matriz.indptr[fronteira]
+    graus = matriz.indptr[fronteira + 1] - inicios
+    total = int(graus.sum())
+    # Posição em indices de cada vizinho: início da fatia do seu nó mais o
+    # deslocamento dentro dela
+    deslocamentos = np.repeat(inicios - (np.cumsum(graus) - graus), graus)
+    vizinhos = matriz.indices[deslocamentos + np.arange(total)]
+    return vizinhos, np.repeat(fronteira, graus)
+
+def niveis_bfs_numpy(grafo, inicio_id, destino_id=None):
+    matriz = obter_matriz(grafo)
+    num_nos = len(matriz.ids)
+    distancias = np.full(num_nos, -1, dtype=np.int32)
+    pais = np.full(num_nos, -1, dtype=np.int64)
+    resultado = NiveisVetorizados(matriz, distancias, pais)
+
+    if inicio_id not in grafo.nos:
+        return resultado
+    inicio = matriz.indice_de(inicio_id)
+    destino = matriz.indice_de(destino_id) if destino_id is not None and destino_id in grafo.nos else None
+
+    # Armadilhas nunca entram na BFS, exceto como ponto de partida
+    bloqueados = matriz.armadilhas.copy()
+    bloqueados[inicio] = True
+    distancias[inicio] = 0
+
+    fronteira = np.array([inicio], dtype=np.int64)
+    nivel = 0
+    while len(fronteira) and (destino is None or distancias[destino] < 0):
+        nivel += 1
+        vizinhos, origens = expandir_nivel(matriz, fronteira)
+        novos = ~bloqueados[vizinhos]
+        vizinhos = vizinhos[novos]
+        origens = origens[novos]
+        # Primeira ocorrência de cada vizinho (np.unique devolve a posição da
+        # primeira), de volta na ordem em que apareceram
+        _, primeiros = np.unique(vizinhos, return_index=True)
+        primeiros.sort()
+        fronteira = vizinhos[primeiros]
+        distancias[fronteira] = nivel
+        pais[fronteira] = origens[primeiros]
+        bloqueados[fronteira] = True
+
+    return resultado
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# Buscas em lote, sem interface: resolve muitas consultas de caminho sobre um
+# mapa e grava os resultados à medida que ficam prontos.
+#
+# Arquivo de consultas (texto), uma por linha; linhas vazias e começadas por
+# "#" são ignoradas:
+#
+#   1 15        caminho do local 1 ao local 15
+#   1 *         caminho do local 1 até o tesouro mais próximo
+#   * 15        distância de todos os locais até o local 15
+#   * *         distância de todos os locais até o tesouro mais próximo
+#
+# Saída em JSON Lines, uma linha por resultado, na ordem em que terminam
+# ("consulta" é o número da linha no arquivo de consultas):
+#
+#   {"consulta": 1, "inicio": 1, "destino": 15, "passos": 5, "custo": 1019.2, "caminho": [1, ...]}
+#   {"consulta": 3, "inicio": 7, "destino": 15, "passos": 4, "proximo": 9}
+#
+# Consultas sem caminho têm "passos": null. As consultas são divididas em
+# lotes e distribuídas por um ProcessPoolExecutor. Cada processo carrega o
+# mapa uma única vez, na inicialização, e as tarefas levam só as consultas;
+# com mapas .ctmapa o arquivo é mapeado em memória, então os processos
+# compartilham as mesmas páginas em vez de cada um ter sua cópia. O histórico
+# de visualização não é gravado.
+#
+# Com --motor, as consultas BFS de um local a outro usam GrafoBase.niveis_bfs
+# com o motor escolhido ("numpy" expande cada nível de uma vez; veja
+# bfs_vetorizada.py). Os caminhos são os mesmos de busca_bfs.
+#
+# Uso: python buscas_em_lote.py mapa.ctmapa consultas.txt resultados.jsonl
+#          [--algoritmo bfs] [--motor numpy] [--processos 4] [--lote 256] [--sem-caminho]
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from grafo import MOTOR_NUMPY, MOTOR_PYTHON
+from mapas import carregar_modelo
+
+TODOS = "*"
+ALGORITMOS = {
+    "bfs": "busca_bfs",
+    "bidirecional": "busca_bfs_bidirecional",
+    "dfs": "busca_dfs",
+    "dijkstra": "busca_dijkstra",
+    "a_estrela": "busca_a_estrela",
+}
+TAMANHO_LOTE = 256
+
+# Mapa do processo atual, carregado por iniciar_processo
+_mapa = None
+
+def iniciar_processo(caminho_mapa):
+    global _mapa
+    _mapa = carregar_modelo(caminho_mapa)
+
+def ler_consultas(caminho_arquivo):
+    # Gera (número da linha, inicio, destino); inicio e destino são ids ou TODOS
+    with open(caminho_arquivo, encoding='utf-8') as arquivo:
+        for numero, linha in enumerate(arquivo, 1):
+            campos = linha.split()
+            if not campos or campos[0].startswith("#"):
+                continue
+            if len(campos) != 2:
+                raise ValueError(f"{caminho_arquivo}: linha {numero}: esperado 'inicio destino'")
+            try:
+                inicio, destino = (campo if campo == TODOS else int(campo) for campo in campos)
+            except ValueError:
+                raise ValueError(f"{caminho_arquivo}: linha {numero}: ids devem ser inteiros ou '{TODOS}'") from None
+            yield numero, inicio, destino
+
+def resolver_consulta(numero, inicio_id, destino_id, busca, incluir_caminho, motor=None, mapa=None):
+    # mapa=None usa o mapa do processo (iniciar_processo); o servidor de
+    # caminhos passa o seu quando resolve consultas em threads
+    if mapa is None:
+        mapa = _mapa
+    grafo = mapa.grafo
+    destinos = mapa.tesouros if destino_id == TODOS else [destino_id]
+
+    if ((inicio_id != TODOS and inicio_id not in grafo.nos)
+            or any(no_id not in grafo.nos for no_id in destinos)):
+        return [{"consulta": numero, "inicio": inicio_id, "destino": destino_id, "erro": "local inexistente"}]
+
+    if inicio_id == TODOS:
+        # Uma única BFS reversa responde por todos os locais
+        arvore = grafo.arvore_ate(*destinos)
+        return [{"consulta": numero, "inicio": no_id, "destino": arvore.destino(no_id),
+                 "passos": distancia, "proximo": arvore.proximo(no_id)}
+                for no_id, distancia in arvore.distancias.items()]
+
+    if destino_id == TODOS:
+        # Tesouro mais próximo numa única busca multifonte, em distância
+        # para Dijkstra e A* e em passos para as demais
+        por_custo = busca in ("busca_dijkstra", "busca_a_estrela")
+        destino_id, caminho = grafo.busca_mais_proximo(inicio_id, destinos, por_custo)
+    elif motor is not None:
+        caminho = grafo.niveis_bfs(inicio_id, destino_id, motor).caminho(destino_id)
+    else:
+        caminho = getattr(grafo, busca)(inicio_id, destino_id, registrar_historico=False)[0]
+
+    resultado = {"consulta": numero, "inicio": inicio_id, "destino": destino_id,
+                 "passos": len(caminho) - 1 if caminho else None,
+                 "custo": grafo.custo_caminho(caminho) if caminho else None}
+    if incluir_caminho:
+        resultado["caminho"] = caminho
+    return [resultado]
+
+def resolver_lote(consultas, busca, incluir_caminho, motor=None):
+    # Executado nos processos do pool; devolve as linhas de saída já prontas
+    linhas = []
+    for numero, inicio_id, destino_id in consultas:
+        for resultado in resolver_consulta(numero, inicio_id, destino_id, busca, incluir_caminho, motor):
+            linhas.append(json.dumps(resultado))
+    return linhas
+
+def dividir_em_lotes(consultas, tamanho):
+    lote = []
+    for consulta in consultas:
+        lote.append(consulta)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def executar(caminho_mapa, caminho_consultas, saida, algoritmo="bfs", processos=None,
+             tamanho_lote=TAMANHO_LOTE, incluir_caminho=True, motor=None):
+    # Resolve as consultas e escreve cada linha de resultado em saida (um
+    # arquivo aberto) assim que seu lote termina. Devolve o número de linhas
+    busca = ALGORITMOS[algoritmo]
+    if motor is not None and busca != "busca_bfs":
+        raise ValueError("o motor só se aplica ao algoritmo bfs")
+    lotes = dividir_em_lotes(ler_consultas(caminho_consultas), tamanho_lote)
+    escritas = 0
+
+    def escrever(linhas):
+        nonlocal escritas
+        for linha in linhas:
+            saida.write(linha)
+            saida.write("\n")
+        saida.flush()
+        escritas += len(linhas)
+
+    if processos == 1:
+        # Sem pool: útil para depurar e em máquinas com um único núcleo
+        iniciar_processo(caminho_mapa)
+        for lote in lotes:
+            escrever(resolver_lote(lote, busca, incluir_caminho, motor))
+        return escritas
+
+    processos = processos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=processos, initializer=iniciar_processo,
+                             initargs=(caminho_mapa,)) as executor:
+        # Poucos lotes em andamento por vez, para não ler o arquivo de
+        # consultas inteiro para a memória
+        pendentes = set()
+        for lote in lotes:
+            if len(pendentes) >= 2 * processos:
+                prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    escrever(futuro.result())
+            pendentes.add(executor.submit(resolver_lote, lote, busca, incluir_caminho, motor))
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                escrever(futuro.result())
+    return escritas
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve consultas de caminho em lote, em vários processos")
+    parser.add_argument("mapa", help="arquivo de mapa (.json ou .ctmapa); 'padrao' usa o mapa original")
+    parser.add_argument("consultas", help="arquivo de consultas, uma 'inicio destino' por linha")
+    parser.add_argument("saida", help="arquivo de resultados (JSON Lines); '-' escreve na saída padrão")
+    parser.add_argument("--algoritmo", choices=sorted(ALGORITMOS), default="bfs", help="busca usada nas consultas")
+    parser.add_argument("--motor", choices=[MOTOR_PYTHON, MOTOR_NUMPY], default=None,
+                        help="motor de niveis_bfs para as consultas bfs (padrão: busca_bfs)")
+    parser.add_argument("--processos", type=int, default=None, help="número de processos (padrão: um por núcleo)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="consultas por tarefa")
+    parser.add_argument("--sem-caminho", action="store_true", help="não inclui a lista de locais de cada caminho")
+    args = parser.parse_args()
+    if args.motor is not None and args.algoritmo != "bfs":
+        parser.error("--motor só se aplica a --algoritmo bfs")
+
+    caminho_mapa = None if args.mapa == "padrao" else args.mapa
+    inicio = time.perf_counter()
+    if args.saida == "-":
+        escritas = executar(caminho_mapa, args.consultas, sys.stdout, args.algoritmo, args.processos,
+                            args.lote, not args.sem_caminho, args.motor)
+    else:
+        with open(args.saida, "w", encoding="utf-8") as saida:
+            escritas = executar(caminho_mapa, args.consultas, saida, args.algoritmo, args.processos,
+                                args.lote, not args.sem_caminho, args.motor)
+    print(f"{escritas} resultados em {time.perf_counter() - inicio:.2f} s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
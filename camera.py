@@ -0,0 +1,89 @@
+# Câmera do tabuleiro: converte coordenadas do mapa (mundo) para a tela com
+# deslocamento e zoom, para que mapas maiores que o tabuleiro possam ser
+# percorridos. Só faz contas, sem depender do pygame; o desenho que usa a
+# câmera fica em renderizacao.py.
+
+ZOOM_MINIMO = 0.05
+ZOOM_MAXIMO = 3.0
+# Fator aplicado a cada passo de zoom (roda do mouse, + e -)
+PASSO_ZOOM = 1.25
+
+# Níveis de detalhe do desenho, do mais completo ao mais simples
+DETALHE_COMPLETO = 2     # nós com número e arestas pontilhadas
+DETALHE_SIMPLES = 1      # nós sem número e arestas como linhas finas
+DETALHE_MINIMO = 0       # só pontos nos nós; arestas comuns omitidas
+
+ZOOM_DETALHE_COMPLETO = 0.6
+ZOOM_DETALHE_SIMPLES = 0.25
+
+class Camera:
+    def __init__(self, area, x=0, y=0, zoom=1.0):
+        # area: (x, y, largura, altura) da região da tela onde o mapa aparece.
+        # (x, y) é o ponto do mundo mostrado no canto superior esquerdo da tela
+        # (não da área), então a câmera padrão desenha o mapa como sem câmera
+        self.area = tuple(area)
+        self.x = x
+        self.y = y
+        self.zoom = zoom
+
+    def eh_identidade(self):
+        # Sem deslocamento nem zoom: o mundo coincide com a tela
+        return self.x == 0 and self.y == 0 and self.zoom == 1.0
+
+    def estado(self):
+        # Resumo usado nas assinaturas de desenho do Jogo
+        return (self.x, self.y, self.zoom)
+
+    def nivel_detalhe(self):
+        if self.zoom >= ZOOM_DETALHE_COMPLETO:
+            return DETALHE_COMPLETO
+        if self.zoom >= ZOOM_DETALHE_SIMPLES:
+            return DETALHE_SIMPLES
+        return DETALHE_MINIMO
+
+    def para_tela(self, x, y):
+        return (int((x - self.x) * self.zoom), int((y - self.y) * self.zoom))
+
+    def para_mundo(self, x, y):
+        return (x / self.zoom + self.x, y / self.zoom + self.y)
+
+    def retangulo_visivel(self):
+        # (x_min, y_min, x_max, y_max) do mundo que cabe na área
+        area_x, area_y, largura, altura = self.area
+        x_min, y_min = self.para_mundo(area_x, area_y)
+        x_max, y_max = self.para_mundo(area_x + largura, area_y + altura)
+        return x_min, y_min, x_max, y_max
+
+    def mover(self, dx, dy):
+        # Desloca a vista em pixels da tela
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+
+    def aplicar_zoom(self, fator, ancora=None):
+        # Multiplica o zoom mantendo fixo o ponto da tela em ancora (por
+        # padrão, o centro da área)
+        if ancora is None:
+            area_x, area_y, largura, altura = self.area
+            ancora = (area_x + largura / 2, area_y + altura / 2)
+        mundo_x, mundo_y = self.para_mundo(*ancora)
+        self.zoom = min(max(self.zoom * fator, ZOOM_MINIMO), ZOOM_MAXIMO)
+        self.x = mundo_x - ancora[0] / self.zoom
+        self.y = mundo_y - ancora[1] / self.zoom
+
+    def centralizar(self, x, y):
+        area_x, area_y, largura, altura = self.area
+        self.x = x - (area_x + largura / 2) / self.zoom
+        self.y = y - (area_y + altura / 2) / self.zoom
+
+    def enquadrar(self, x_min, y_min, x_max, y_max, margem=40):
+        # Zoom e posição para que o retângulo do mundo caiba inteiro na área
+        area_x, area_y, largura, altura = self.area
+        largura_mundo = max(x_max - x_min, 1) + 2 * margem
+        altura_mundo = max(y_max - y_min, 1) + 2 * margem
+        self.zoom = min(max(min(largura / largura_mundo, altura / altura_mundo), ZOOM_MINIMO), ZOOM_MAXIMO)
+        self.centralizar((x_min + x_max) / 2, (y_min + y_max) / 2)
+
+    def redefinir(self):
+        self.x = 0
+        self.y = 0
+        self.zoom = 1.0
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# Cliente do servidor de caminhos (servidor_caminhos.py) e teste de carga.
+#
+# ClienteCaminhos usa uma única conexão para vários pedidos ao mesmo tempo:
+# cada pedido recebe um "id" e a resposta é entregue a quem a pediu, na ordem
+# em que o servidor terminar.
+#
+# Como teste de carga, abre algumas conexões e mantém vários pedidos em
+# andamento em cada uma até completar --pedidos. As consultas vêm de um
+# arquivo no formato de buscas_em_lote.py (início "*" não é aceito) ou, sem
+# arquivo, são todas do início do mapa até o tesouro mais próximo, o caso em
+# que o servidor mais agrupa pedidos iguais. No fim mostra a latência (p50,
+# p99 e máxima), os pedidos por segundo e quantas buscas o servidor fez de
+# fato.
+#
+# Uso: python cliente_caminhos.py [--porta 8765 | --unix /tmp/caca.sock] [--consultas consultas.txt]
+#          [--pedidos 10000] [--conexoes 4] [--concorrencia 32] [--algoritmo bfs]
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+
+from buscas_em_lote import ALGORITMOS, TODOS, ler_consultas
+from servidor_caminhos import ENDERECO, PORTA_PADRAO
+
+# Tamanho máximo de uma resposta (caminhos longos em mapas grandes)
+LIMITE_LINHA = 64 * 1024 * 1024
+
+class ClienteCaminhos:
+    def __init__(self, leitor, escritor):
+        self.leitor = leitor
+        self.escritor = escritor
+        # id -> Future da resposta
+        self.pendentes = {}
+        self.ids = itertools.count(1)
+        self.leitura = asyncio.create_task(self.ler_respostas())
+
+    @classmethod
+    async def conectar(cls, porta=PORTA_PADRAO, caminho_unix=None):
+        if caminho_unix is not None:
+            leitor, escritor = await asyncio.open_unix_connection(caminho_unix, limit=LIMITE_LINHA)
+        else:
+            leitor, escritor = await asyncio.open_connection(ENDERECO, porta, limit=LIMITE_LINHA)
+        return cls(leitor, escritor)
+
+    async def ler_respostas(self):
+        try:
+            while True:
+                linha = await self.leitor.readline()
+                if not linha:
+                    break
+                resposta = json.loads(linha)
+                futuro = self.pendentes.pop(resposta.get("id"), None)
+                if futuro is not None and not futuro.done():
+                    futuro.set_result(resposta)
+        finally:
+            # Conexão encerrada: quem ainda espera recebe o erro
+            for futuro in self.pendentes.values():
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError("conexão com o servidor encerrada"))
+            self.pendentes.clear()
+
+    async def pedir(self, pedido):
+        # Envia o pedido e espera a resposta dele; erros do servidor viram ValueError
+        if self.leitura.done():
+            raise ConnectionError("conexão com o servidor encerrada")
+        id_pedido = next(self.ids)
+        futuro = asyncio.get_running_loop().create_future()
+        self.pendentes[id_pedido] = futuro
+        self.escritor.write(json.dumps({"id": id_pedido, **pedido}).encode() + b"\n")
+        await self.escritor.drain()
+        resposta = await futuro
+        if "erro" in resposta:
+            raise ValueError(resposta["erro"])
+        return resposta
+
+    async def caminho(self, inicio_id, destino_id, algoritmo="bfs", sem_caminho=False):
+        return await self.pedir({"tipo": "caminho", "inicio": inicio_id, "destino": destino_id,
+                                 "algoritmo": algoritmo, "sem_caminho": sem_caminho})
+
+    async def movimento(self, de_id, para_id):
+        return await self.pedir({"tipo": "movimento", "de": de_id, "para": para_id})
+
+    async def mapa(self):
+        return await self.pedir({"tipo": "mapa"})
+
+    async def estatisticas(self):
+        return await self.pedir({"tipo": "estatisticas"})
+
+    async def fechar(self):
+        self.escritor.close()
+        await self.escritor.wait_closed()
+        await self.leitura
+
+def percentil(valores_ordenados, fracao):
+    # Percentil pelo posto mais próximo
+    indice = min(len(valores_ordenados) - 1, max(0, round(fracao * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+async def testar_carga(porta, caminho_unix, consultas, pedidos, conexoes, concorrencia, algoritmo):
+    clientes = [await ClienteCaminhos.conectar(porta, caminho_unix) for _ in range(conexoes)]
+    antes = await clientes[0].estatisticas()
+    # As consultas se repetem até completar o número de pedidos
+    fila = itertools.islice(itertools.cycle(consultas), pedidos)
+    latencias = []
+    erros = 0
+
+    async def trabalhar(cliente):
+        nonlocal erros
+        for inicio_id, destino_id in fila:
+            inicio = time.perf_counter()
+            try:
+                await cliente.caminho(inicio_id, destino_id, algoritmo, sem_caminho=True)
+            except ValueError:
+                erros += 1
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhar(cliente) for cliente in clientes for _ in range(concorrencia)))
+    segundos = time.perf_counter() - inicio
+
+    depois = await clientes[0].estatisticas()
+    for cliente in clientes:
+        await cliente.fechar()
+    return latencias, erros, segundos, {campo: depois[campo] - antes[campo] for campo in ("buscas", "agrupados", "recusados")}
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor de caminhos")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help=f"porta TCP em {ENDERECO}")
+    parser.add_argument("--unix", default=None, help="caminho do socket Unix do servidor, em vez da porta TCP")
+    parser.add_argument("--consultas", default=None, help="arquivo de consultas, uma 'inicio destino' por linha")
+    parser.add_argument("--pedidos", type=int, default=10000, help="total de pedidos")
+    parser.add_argument("--conexoes", type=int, default=4, help="conexões abertas com o servidor")
+    parser.add_argument("--concorrencia", type=int, default=32, help="pedidos em andamento por conexão")
+    parser.add_argument("--algoritmo", choices=sorted(ALGORITMOS), default="bfs", help="busca pedida")
+    args = parser.parse_args()
+
+    if args.consultas is not None:
+        consultas = [(inicio_id, destino_id) for _, inicio_id, destino_id in ler_consultas(args.consultas)
+                     if inicio_id != TODOS]
+        if not consultas:
+            parser.error(f"{args.consultas}: nenhuma consulta com início definido")
+    else:
+        consultas = None
+
+    async def executar():
+        nonlocal consultas
+        if consultas is None:
+            cliente = await ClienteCaminhos.conectar(args.porta, args.unix)
+            consultas = [((await cliente.mapa())["inicio"], TODOS)]
+            await cliente.fechar()
+        return await testar_carga(args.porta, args.unix, consultas, args.pedidos, args.conexoes,
+                                  args.concorrencia, args.algoritmo)
+
+    try:
+        latencias, erros, segundos, servidor = asyncio.run(executar())
+    except ConnectionError as erro:
+        print(f"sem conexão com o servidor: {erro}", file=sys.stderr)
+        sys.exit(1)
+    latencias.sort()
+    print(f"{len(latencias)} pedidos em {segundos:.2f} s: {len(latencias) / segundos:.0f} pedidos/s, {erros} erros")
+    print(f"latência p50 {percentil(latencias, 0.50) * 1000:.2f} ms   p99 {percentil(latencias, 0.99) * 1000:.2f} ms   "
+          f"máxima {latencias[-1] * 1000:.2f} ms")
+    print(f"servidor: {servidor['buscas']} buscas, {servidor['agrupados']} pedidos agrupados com uma busca em andamento, "
+          f"{servidor['recusados']} sem caminho respondidos na hora")
+
+if __name__ == "__main__":
+    main()
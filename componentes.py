@@ -0,0 +1,248 @@
+# Componentes conexas do mapa sem as armadilhas, para saber na hora se um
+# destino pode ser alcançado. As buscas nunca atravessam armadilhas; quando
+# elas isolam o tesouro, busca_bfs e busca_dfs exploram toda a região do
+# jogador antes de devolver None, o que em mapas grandes leva segundos. Com
+# este índice a resposta "sem caminho" custa duas consultas a uma estrutura
+# union-find (conjuntos disjuntos com compressão de caminho e união por
+# tamanho), O(α(n)).
+#
+# O índice é montado uma vez (GrafoBase.obter_componentes) e depois mantido
+# pelo próprio grafo:
+#   - armadilha removida, nó novo e aresta nova só unem componentes, o que
+#     o union-find faz na hora
+#   - uma armadilha nova pode dividir a componente do nó, se ele tinha ao
+#     menos duas vizinhas livres nela. Union-find não separa conjuntos, então
+#     cada nó aponta para um elemento do union-find (elementos) e os nós de
+#     um pedaço separado passam a apontar para um elemento novo. Para achar
+#     os pedaços, uma BFS parte de cada vizinha, alternando um nó de cada
+#     busca; buscas que se encontram estão no mesmo pedaço, e quando só
+#     resta uma ainda explorando, as que terminaram são pedaços separados.
+#     O custo fica proporcional aos pedaços menores, não à componente (veja
+#     separar)
+#   - só as mudanças de estrutura feitas ao montar mapas (nó substituído,
+#     vizinhos redefinidos) não são tratadas na hora: o índice passa a ser
+#     uma aproximação por cima, em que componentes diferentes continuam
+#     provando que não há caminho, e a consulta que cair na mesma componente
+#     o remonta
+#
+# raiz também é usada pelo gerador de mapas (gerador_mapas.py).
+
+from array import array
+from collections import deque
+
+from grafo_compacto import MARCA_ARMADILHA, GrafoCSR
+
+def raiz(pais, elemento):
+    # Raiz do conjunto do elemento no union-find guardado em pais, com
+    # compressão de caminho pela metade: cada elemento visitado passa a
+    # apontar para o avô
+    while pais[elemento] != elemento:
+        pais[elemento] = pais[pais[elemento]]
+        elemento = pais[elemento]
+    return elemento
+
+class ComponentesLivres:
+    def __init__(self, grafo):
+        self.grafo = grafo
+        self.montar()
+
+    def montar(self):
+        # Um elemento por nó, na ordem de grafo.nos: elemento do nó no
+        # union-find, pai do elemento, tamanho do conjunto (válido nas
+        # raízes) e se o nó é livre
+        grafo = self.grafo
+        if isinstance(grafo, GrafoCSR):
+            # GrafoCSR já numera os nós (indice_de)
+            self.indice_por_id = None
+            self.livres = bytearray(not marca & MARCA_ARMADILHA for marca in grafo.marcadores)
+        else:
+            self.indice_por_id = {no_id: indice for indice, no_id in enumerate(grafo.nos)}
+            self.livres = bytearray(not no.eh_armadilha for no in grafo.nos.values())
+        self.elementos = array('q', range(len(self.livres)))
+        self.pais = array('q', range(len(self.livres)))
+        self.tamanhos = array('q', [1]) * len(self.livres)
+        # Houve mudanças de estrutura que podem ter dividido componentes
+        self.aproximado = False
+
+        indice_de = self.indice
+        livres = self.livres
+        unir = self.unir
+        for indice, vizinhos in enumerate(self.listas_de_vizinhos()):
+            if not livres[indice]:
+                continue
+            for vizinho in vizinhos:
+                vizinho = indice_de(vizinho)
+                # Cada aresta é unida uma vez, pelo nó de menor índice
+                if vizinho > indice and livres[vizinho]:
+                    unir(indice, vizinho)
+
+    def listas_de_vizinhos(self):
+        # Vizinhos (ids) de cada nó, na ordem de grafo.nos
+        grafo = self.grafo
+        if self.indice_por_id is None:
+            # Fatias dos arrays CSR, sem passar pela visão grafo.arestas
+            offsets = grafo.offsets
+            alvos = grafo.alvos
+            return (alvos[offsets[indice]:offsets[indice + 1]] for indice in range(len(self.livres)))
+        return grafo.arestas.values()
+
+    def indice(self, no_id):
+        if self.indice_por_id is None:
+            return self.grafo.indice_de(no_id)
+        return self.indice_por_id[no_id]
+
+    def componente(self, indice):
+        # Raiz do conjunto do nó de índice dado
+        return raiz(self.pais, self.elementos[indice])
+
+    def novo_elemento(self, tamanho=1):
+        # Elemento novo do union-find, sozinho no próprio conjunto
+        novo = len(self.pais)
+        self.pais.append(novo)
+        self.tamanhos.append(tamanho)
+        return novo
+
+    def unir(self, indice1, indice2):
+        raiz1 = self.componente(indice1)
+        raiz2 = self.componente(indice2)
+        if raiz1 == raiz2:
+            return
+        if self.tamanhos[raiz1] < self.tamanhos[raiz2]:
+            raiz1, raiz2 = raiz2, raiz1
+        self.pais[raiz2] = raiz1
+        self.tamanhos[raiz1] += self.tamanhos[raiz2]
+
+    def vizinhos_livres(self, no_id):
+        # Ids dos vizinhos livres, sem repetição
+        livres = self.livres
+        indice_de = self.indice
+        return list(dict.fromkeys(vizinho for vizinho in self.grafo.arestas[no_id] if livres[indice_de(vizinho)]))
+
+    def alcancavel(self, inicio_id, destino_id):
+        # Se as buscas (BFS, DFS, Dijkstra, A*) acham um caminho do início ao
+        # destino. Como nelas, uma armadilha pode ser o ponto de partida mas
+        # nunca é atravessada, e um destino que é armadilha só é alcançado
+        # dele mesmo
+        grafo = self.grafo
+        if inicio_id not in grafo.nos or destino_id not in grafo.nos:
+            return False
+        if inicio_id == destino_id:
+            return True
+        destino = self.indice(destino_id)
+        if not self.livres[destino]:
+            return False
+        inicio = self.indice(inicio_id)
+        # De uma armadilha, o caminho sai por uma das vizinhas livres
+        origens = (inicio_id,) if self.livres[inicio] else self.vizinhos_livres(inicio_id)
+
+        raiz_destino = self.componente(destino)
+        if not any(self.componente(self.indice(origem)) == raiz_destino for origem in origens):
+            return False
+        if self.aproximado:
+            # A mesma componente pode ter sido dividida por uma mudança de
+            # estrutura
+            self.montar()
+            return self.alcancavel(inicio_id, destino_id)
+        return True
+
+    def separar(self, no_id):
+        # no_id acabou de virar armadilha: as vizinhas livres que estavam na
+        # mesma componente podem ter ficado em pedaços separados
+        por_componente = {}
+        for vizinho in self.vizinhos_livres(no_id):
+            por_componente.setdefault(self.componente(self.indice(vizinho)), []).append(vizinho)
+        for raiz_antiga, origens in por_componente.items():
+            if len(origens) > 1:
+                self.separar_componente(raiz_antiga, origens)
+
+    def separar_componente(self, raiz_antiga, origens):
+        # Uma BFS por origem, um nó de cada por rodada. dono[no] é a busca
+        # que alcançou o nó; buscas que alcançam nós umas das outras estão
+        # no mesmo pedaço e são juntadas em grupos (um union-find pequeno,
+        # sobre as buscas). Um grupo sem nada na fila explorou o pedaço
+        # inteiro: nenhuma outra busca chega a ele
+        arestas = self.grafo.arestas
+        livres = self.livres
+        indice_de = self.indice
+        dono = {origem: busca for busca, origem in enumerate(origens)}
+        filas = [deque([origem]) for origem in origens]
+        grupos = list(range(len(origens)))
+
+        while True:
+            pendentes = {raiz(grupos, busca) for busca, fila in enumerate(filas) if fila}
+            if len(pendentes) <= 1:
+                break
+            for busca, fila in enumerate(filas):
+                if not fila:
+                    continue
+                for vizinho in arestas[fila.popleft()]:
+                    if not livres[indice_de(vizinho)]:
+                        continue
+                    outra = dono.get(vizinho)
+                    if outra is None:
+                        dono[vizinho] = busca
+                        fila.append(vizinho)
+                    else:
+                        grupos[raiz(grupos, outra)] = raiz(grupos, busca)
+
+        pedacos = {}
+        for no_id, busca in dono.items():
+            pedacos.setdefault(raiz(grupos, busca), []).append(no_id)
+        if len(pedacos) == 1:
+            return
+        if pendentes:
+            # O grupo que ainda explorava fica com a componente antiga
+            del pedacos[pendentes.pop()]
+        else:
+            # Todos terminaram: o maior pedaço fica com a componente antiga
+            del pedacos[max(pedacos, key=lambda grupo: len(pedacos[grupo]))]
+
+        for pedaco in pedacos.values():
+            novo = self.novo_elemento(len(pedaco))
+            self.tamanhos[raiz_antiga] -= len(pedaco)
+            for no_id in pedaco:
+                self.elementos[indice_de(no_id)] = novo
+
+    # --- Atualizações, chamadas pelo grafo ---
+
+    def no_alterado(self, no):
+        # Tesouro ou armadilha definidos; só a armadilha muda as componentes
+        indice = self.indice(no.id)
+        livre = not no.eh_armadilha
+        if livre == bool(self.livres[indice]):
+            return
+        self.livres[indice] = livre
+        if livre:
+            # O elemento da antiga armadilha ainda está no conjunto de onde
+            # ela saiu, que pode ter sido dividido depois
+            self.elementos[indice] = self.novo_elemento()
+            for vizinho in self.vizinhos_livres(no.id):
+                self.unir(indice, self.indice(vizinho))
+        else:
+            self.separar(no.id)
+        # Os elementos abandonados só ocupam memória; quando passam do
+        # número de nós, a montagem do zero os descarta
+        if len(self.pais) > 2 * len(self.livres):
+            self.montar()
+
+    def no_adicionado(self, no):
+        # Grafo.adicionar_no: um nó novo começa sozinho, sem vizinhos; um
+        # nó substituído perde as arestas, o que pode separar componentes
+        if no.id in self.indice_por_id:
+            self.livres[self.indice_por_id[no.id]] = not no.eh_armadilha
+            self.aproximado = True
+            return
+        self.indice_por_id[no.id] = len(self.livres)
+        self.elementos.append(self.novo_elemento())
+        self.livres.append(not no.eh_armadilha)
+
+    def arestas_adicionadas(self, no_id, vizinhos):
+        indice = self.indice(no_id)
+        if not self.livres[indice]:
+            return
+        for vizinho in map(self.indice, vizinhos):
+            if self.livres[vizinho]:
+                self.unir(indice, vizinho)
+
+    def arestas_removidas(self):
+        self.aproximado = True
@@ -0,0 +1,21 @@
+# Configurações compartilhadas entre o núcleo (grafo e buscas) e a interface.
+# Não depende do pygame.
+
+# Configurações da tela
+LARGURA, ALTURA = 1400, 900
+TITULO_JANELA = "Caça ao Tesouro - Versão Tabuleiro"
+
+# Cores
+BRANCO = (255, 255, 255)
+PRETO = (0, 0, 0)
+CINZA = (200, 200, 200)
+CINZA_ESCURO = (100, 100, 100)
+AZUL = (0, 120, 255)
+VERDE = (0, 255, 0)
+VERMELHO = (255, 0, 0)
+AMARELO = (255, 255, 0)
+LARANJA = (255, 165, 0)
+ROXO = (128, 0, 128)
+MARROM = (139, 69, 19)
+MARROM_CLARO = (210, 180, 140)
+AZUL_ESCURO = (25, 25, 112)
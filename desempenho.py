@@ -0,0 +1,172 @@
+# Medição de desempenho do jogo: quanto tempo cada fase do quadro ocupa
+# (eventos, animação, desenho do tabuleiro, painel, atualização da janela e
+# espera do relógio) e as métricas de cada busca (nós expandidos, blocos de
+# memória alocados, tamanho do histórico e tempo). Os números alimentam o
+# painel de desempenho do jogo (tecla F3) e podem ser gravados num rastro
+# JSON ou CSV para análise depois da sessão. Não depende do pygame.
+#
+# As alocações são a variação de sys.getallocatedblocks() enquanto a busca
+# roda: um saldo de blocos do alocador do Python, barato o bastante para ser
+# medido sempre (ao contrário do tracemalloc).
+
+import csv
+import json
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Fases de um quadro, na ordem em que acontecem no laço principal. "painel"
+# inclui a caixa de mensagem e o aviso de fim de jogo; "tela" é o envio das
+# regiões alteradas para a janela (pygame.display.update)
+FASES_QUADRO = ("eventos", "animacao", "tabuleiro", "painel", "hud", "tela", "espera")
+
+# Quadros usados nas médias mostradas no painel
+QUADROS_MEDIA = 60
+
+class MetricasBusca:
+    def __init__(self, algoritmo, inicio_id, destino_id, quadro):
+        self.algoritmo = algoritmo
+        self.inicio_id = inicio_id
+        self.destino_id = destino_id
+        self.quadro = quadro                # quadro em que a busca começou
+        self.inicio = time.perf_counter()
+        self.tempo = 0.0                    # segundos rodando a busca
+        self.duracao = None                 # segundos do início ao resultado
+        self.quadros = 0                    # quadros em que a busca rodou
+        self.passos = 0                     # passos gravados (yields do gerador)
+        self.blocos_alocados = 0
+        self.nos_expandidos = None
+        self.historico_bytes = None
+        self.tamanho_caminho = None
+
+    def concluida(self):
+        return self.duracao is not None
+
+    def como_dicionario(self):
+        return {
+            "algoritmo": self.algoritmo,
+            "inicio": self.inicio_id,
+            "destino": self.destino_id,
+            "quadro": self.quadro,
+            "tempo_ms": round(self.tempo * 1000, 3),
+            "duracao_ms": None if self.duracao is None else round(self.duracao * 1000, 3),
+            "quadros": self.quadros,
+            "passos": self.passos,
+            "blocos_alocados": self.blocos_alocados,
+            "nos_expandidos": self.nos_expandidos,
+            "historico_bytes": self.historico_bytes,
+            "tamanho_caminho": self.tamanho_caminho,
+        }
+
+class MedidorDesempenho:
+    def __init__(self, gravar_rastro=False):
+        # Sem rastro, só os últimos QUADROS_MEDIA quadros e a última busca
+        # ficam guardados
+        self.gravar_rastro = gravar_rastro
+        self.inicio_sessao = time.perf_counter()
+        self.numero_quadro = 0
+        self.inicio_quadro = self.inicio_sessao
+        self.fases = dict.fromkeys(FASES_QUADRO, 0.0)
+        # (total, *fases) em segundos
+        self.recentes = deque(maxlen=QUADROS_MEDIA)
+        self.busca = None
+        # Rastro: (quadro, início, total, *fases) e MetricasBusca concluídas
+        self.quadros = []
+        self.buscas = []
+
+    # --- Quadros ---
+
+    def iniciar_quadro(self):
+        self.inicio_quadro = time.perf_counter()
+        for fase in FASES_QUADRO:
+            self.fases[fase] = 0.0
+
+    @contextmanager
+    def medir(self, fase):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases[fase] += time.perf_counter() - inicio
+
+    def finalizar_quadro(self):
+        total = time.perf_counter() - self.inicio_quadro
+        tempos = tuple(self.fases[fase] for fase in FASES_QUADRO)
+        self.recentes.append((total,) + tempos)
+        if self.gravar_rastro:
+            self.quadros.append((self.numero_quadro, self.inicio_quadro - self.inicio_sessao, total) + tempos)
+        self.numero_quadro += 1
+
+    def medias_ms(self):
+        # Médias dos últimos quadros em milissegundos: 'total', cada fase,
+        # 'outros' (o que não está em nenhuma fase) e 'pior' (maior total)
+        if not self.recentes:
+            return None
+        quantidade = len(self.recentes)
+        somas = [sum(coluna) for coluna in zip(*self.recentes)]
+        medias = {"total": somas[0] * 1000 / quantidade}
+        for fase, soma in zip(FASES_QUADRO, somas[1:]):
+            medias[fase] = soma * 1000 / quantidade
+        medias["outros"] = max(0.0, medias["total"] - sum(medias[fase] for fase in FASES_QUADRO))
+        medias["pior"] = max(quadro[0] for quadro in self.recentes) * 1000
+        return medias
+
+    # --- Buscas ---
+
+    def iniciar_busca(self, algoritmo, inicio_id, destino_id):
+        self.busca = MetricasBusca(algoritmo, inicio_id, destino_id, self.numero_quadro)
+
+    @contextmanager
+    def medir_busca(self):
+        # Envolve cada trecho em que a busca roda (um por quadro)
+        busca = self.busca
+        inicio = time.perf_counter()
+        blocos = sys.getallocatedblocks()
+        try:
+            yield busca
+        finally:
+            busca.tempo += time.perf_counter() - inicio
+            busca.blocos_alocados += sys.getallocatedblocks() - blocos
+            busca.quadros += 1
+
+    def finalizar_busca(self, resultado, historico_busca):
+        # resultado é a tupla devolvida pela busca (caminho, histórico,
+        # visitados, fronteira, armadilhas evitadas)
+        busca = self.busca
+        busca.duracao = time.perf_counter() - busca.inicio
+        caminho, _, visitados, _, _ = resultado
+        busca.nos_expandidos = len(visitados)
+        busca.historico_bytes = historico_busca.memoria_bytes()
+        busca.tamanho_caminho = len(caminho) if caminho else None
+        if self.gravar_rastro:
+            self.buscas.append(busca)
+
+    # --- Rastro ---
+
+    def quadros_como_dicionarios(self):
+        for numero, inicio, total, *tempos in self.quadros:
+            quadro = {"quadro": numero, "inicio_ms": round(inicio * 1000, 3), "total_ms": round(total * 1000, 3)}
+            for fase, tempo in zip(FASES_QUADRO, tempos):
+                quadro[f"{fase}_ms"] = round(tempo * 1000, 3)
+            yield quadro
+
+    def exportar(self, caminho_arquivo):
+        # .csv grava uma linha por quadro e por busca, com a coluna "tipo"
+        # distinguindo as duas; qualquer outra extensão grava JSON
+        buscas = [busca.como_dicionario() for busca in self.buscas]
+        if caminho_arquivo.lower().endswith(".csv"):
+            colunas = (["tipo", "quadro", "inicio_ms", "total_ms"] + [f"{fase}_ms" for fase in FASES_QUADRO]
+                       + ["algoritmo", "inicio", "destino", "tempo_ms", "duracao_ms", "quadros", "passos",
+                          "blocos_alocados", "nos_expandidos", "historico_bytes", "tamanho_caminho"])
+            with open(caminho_arquivo, "w", newline="", encoding="utf-8") as arquivo:
+                escritor = csv.DictWriter(arquivo, colunas, restval="")
+                escritor.writeheader()
+                for quadro in self.quadros_como_dicionarios():
+                    escritor.writerow({"tipo": "quadro", **quadro})
+                for busca in buscas:
+                    escritor.writerow({"tipo": "busca", **busca})
+            return
+        with open(caminho_arquivo, "w", encoding="utf-8") as arquivo:
+            json.dump({"fases": list(FASES_QUADRO), "quadros": list(self.quadros_como_dicionarios()),
+                       "buscas": buscas}, arquivo)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# Gerador procedural de mapas de caverna de qualquer tamanho.
+#
+# Os locais ficam numa grade com as posições levemente perturbadas. As
+# passagens candidatas ligam cada local aos vizinhos da direita e de baixo e
+# a uma das duas diagonais de cada célula, então nenhuma passagem cruza outra
+# (o grafo é planar). Uma árvore geradora aleatória (Kruskal com as
+# candidatas embaralhadas) garante que todos os locais sejam alcançáveis, e
+# candidatas extras são acrescentadas até chegar ao grau médio pedido,
+# formando os ciclos da caverna. As armadilhas são sorteadas fora do caminho
+# da árvore entre o início e o tesouro, para que o tesouro sempre tenha
+# solução. Tesouros extras (num_tesouros > 1) são sorteados entre os locais
+# sem armadilha; só o do último local tem solução garantida.
+#
+# A mesma semente gera sempre o mesmo mapa.
+#
+# Uso: python gerador_mapas.py --nos 10000 --semente 42 saida.ctmapa
+
+import argparse
+import math
+import random
+from array import array
+from collections import deque
+
+from componentes import raiz
+from grafo import Grafo, NoGrafo
+from grafo_compacto import MARCA_ARMADILHA, MARCA_TESOURO, GrafoCSR, nome_padrao
+from mapas import Mapa, salvar_mapa
+
+ESPACAMENTO = 80
+# Deslocamento máximo de cada local em relação à grade, em fração do
+# espaçamento; abaixo de 0.25 as passagens continuam sem se cruzar
+PERTURBACAO = 0.2
+
+GRAU_MEDIO = 3.0
+DENSIDADE_ARMADILHAS = 0.1
+
+def passagens_candidatas(num_nos, colunas, aleatorio):
+    # Pares de índices (não ids) que podem ser ligados sem cruzamentos
+    candidatas = []
+    for indice in range(num_nos):
+        linha, coluna = divmod(indice, colunas)
+        direita = indice + 1 if coluna + 1 < colunas and indice + 1 < num_nos else None
+        abaixo = indice + colunas if indice + colunas < num_nos else None
+        if direita is not None:
+            candidatas.append((indice, direita))
+        if abaixo is not None:
+            candidatas.append((indice, abaixo))
+            # Só uma das diagonais da célula, sorteada
+            if direita is not None and abaixo + 1 < num_nos:
+                if aleatorio.random() < 0.5:
+                    candidatas.append((indice, abaixo + 1))
+                else:
+                    candidatas.append((direita, abaixo))
+    return candidatas
+
+def caminho_na_arvore(vizinhos_arvore, origem, destino):
+    # Índices no caminho da árvore entre origem e destino
+    anterior = {origem: None}
+    fila = deque([origem])
+    while fila:
+        atual = fila.popleft()
+        if atual == destino:
+            break
+        for vizinho in vizinhos_arvore[atual]:
+            if vizinho not in anterior:
+                anterior[vizinho] = atual
+                fila.append(vizinho)
+    caminho = set()
+    indice = destino
+    while indice is not None:
+        caminho.add(indice)
+        indice = anterior[indice]
+    return caminho
+
+def gerar_caverna(num_nos, grau_medio=GRAU_MEDIO, densidade_armadilhas=DENSIDADE_ARMADILHAS,
+                  semente=None, compacto=False, num_tesouros=1):
+    # Devolve um Mapa com num_nos locais (ids 1..num_nos), início no canto
+    # superior esquerdo e tesouro no último local (mais num_tesouros - 1
+    # sorteados). Com compacto=True o grafo é um GrafoCSR, sem criar um
+    # NoGrafo por local (útil acima de ~10⁶ nós)
+    if num_nos < 2:
+        raise ValueError("o mapa precisa de pelo menos 2 locais")
+    if not 0 <= densidade_armadilhas < 1:
+        raise ValueError("densidade_armadilhas deve estar em [0, 1)")
+    if not 1 <= num_tesouros < num_nos:
+        raise ValueError("num_tesouros deve estar entre 1 e num_nos - 1")
+
+    aleatorio = random.Random(semente)
+    colunas = math.ceil(math.sqrt(num_nos))
+    desvio = ESPACAMENTO * PERTURBACAO
+
+    pos_x = array('i')
+    pos_y = array('i')
+    for indice in range(num_nos):
+        linha, coluna = divmod(indice, colunas)
+        # random() é bem mais barato que randint() em milhões de chamadas
+        pos_x.append(ESPACAMENTO + coluna * ESPACAMENTO + int((aleatorio.random() * 2 - 1) * desvio))
+        pos_y.append(ESPACAMENTO + linha * ESPACAMENTO + int((aleatorio.random() * 2 - 1) * desvio))
+
+    candidatas = passagens_candidatas(num_nos, colunas, aleatorio)
+    aleatorio.shuffle(candidatas)
+
+    # Árvore geradora: as primeiras candidatas que unem componentes distintos
+    # (o union-find de componentes.py)
+    pais = array('q', range(num_nos))
+    arvore = []
+    extras = []
+    for a, b in candidatas:
+        raiz_a = raiz(pais, a)
+        raiz_b = raiz(pais, b)
+        if raiz_a == raiz_b:
+            extras.append((a, b))
+        else:
+            pais[raiz_a] = raiz_b
+            arvore.append((a, b))
+
+    # Cada passagem soma 2 ao total de graus
+    num_extras = max(0, min(len(extras), round(grau_medio * num_nos / 2) - len(arvore)))
+    passagens = arvore + extras[:num_extras]
+
+    vizinhos = [[] for _ in range(num_nos)]
+    for a, b in passagens:
+        vizinhos[a].append(b)
+        vizinhos[b].append(a)
+    for lista in vizinhos:
+        lista.sort()
+
+    inicio, tesouro = 0, num_nos - 1
+    vizinhos_arvore = [[] for _ in range(num_nos)]
+    for a, b in arvore:
+        vizinhos_arvore[a].append(b)
+        vizinhos_arvore[b].append(a)
+    protegidos = caminho_na_arvore(vizinhos_arvore, inicio, tesouro)
+    armadilhas = [indice for indice in range(num_nos)
+                  if indice not in protegidos and aleatorio.random() < densidade_armadilhas]
+
+    # Tesouros extras só são sorteados quando pedidos, para que os mapas de
+    # um único tesouro continuem iguais para a mesma semente
+    tesouros = [tesouro]
+    if num_tesouros > 1:
+        livres = sorted(set(range(1, num_nos - 1)) - set(armadilhas))
+        tesouros += aleatorio.sample(livres, min(num_tesouros - 1, len(livres)))
+
+    if compacto:
+        grafo = grafo_compacto(num_nos, pos_x, pos_y, vizinhos, tesouros, armadilhas)
+    else:
+        grafo = Grafo()
+        for indice in range(num_nos):
+            grafo.adicionar_no(NoGrafo(indice + 1, nome_padrao(indice + 1), pos_x[indice], pos_y[indice]))
+        for indice, lista in enumerate(vizinhos):
+            grafo.definir_vizinhos(indice + 1, [vizinho + 1 for vizinho in lista])
+        for indice in tesouros:
+            grafo.nos[indice + 1].definir_tesouro()
+        for indice in armadilhas:
+            grafo.nos[indice + 1].definir_armadilha()
+
+    return Mapa(grafo, inicio + 1, [indice + 1 for indice in tesouros])
+
+def grafo_compacto(num_nos, pos_x, pos_y, vizinhos, tesouros, armadilhas):
+    offsets = array('q', [0])
+    alvos = array('q')
+    for lista in vizinhos:
+        alvos.extend(vizinho + 1 for vizinho in lista)
+        offsets.append(len(alvos))
+    marcadores = array('B', bytes(num_nos))
+    for indice in tesouros:
+        marcadores[indice] = MARCA_TESOURO
+    for indice in armadilhas:
+        marcadores[indice] |= MARCA_ARMADILHA
+    return GrafoCSR(range(1, num_nos + 1), pos_x, pos_y, offsets, alvos, marcadores,
+                    ids_consecutivos=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um mapa de caverna aleatório")
+    parser.add_argument("saida", help="arquivo de saída (.json ou .ctmapa)")
+    parser.add_argument("--nos", type=int, default=1000, help="número de locais")
+    parser.add_argument("--grau", type=float, default=GRAU_MEDIO, help="grau médio desejado (de 2 a 6)")
+    parser.add_argument("--armadilhas", type=float, default=DENSIDADE_ARMADILHAS,
+                        help="fração dos locais com armadilha")
+    parser.add_argument("--semente", type=int, default=None, help="semente do gerador")
+    parser.add_argument("--tesouros", type=int, default=1, help="número de tesouros")
+    args = parser.parse_args()
+
+    mapa = gerar_caverna(args.nos, args.grau, args.armadilhas, args.semente,
+                         compacto=args.saida.endswith(".ctmapa"), num_tesouros=args.tesouros)
+    salvar_mapa(mapa, args.saida)
+    grafo = mapa.grafo
+    num_passagens = sum(len(grafo.arestas[no_id]) for no_id in grafo.nos) // 2
+    print(f"{args.saida}: {len(grafo.nos)} locais, {num_passagens} passagens, "
+          f"grau médio {2 * num_passagens / len(grafo.nos):.2f}")
+
+if __name__ == "__main__":
+    main()
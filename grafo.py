@@ -0,0 +1,923 @@
+# Núcleo do jogo de Caça ao Tesouro: modelo do grafo, buscas (BFS, DFS,
+# Dijkstra e A*) e o mapa.
+# Este módulo não depende do pygame e pode ser importado por ferramentas de
+# linha de comando e testes sem abrir janela; o desenho fica em renderizacao.py.
+
+import heapq
+import math
+from collections import ChainMap, deque
+
+from configuracoes import CINZA, VERDE, VERMELHO
+from historico_busca import HistoricoBusca
+from indice_espacial import GradeEspacial
+
+# Motores de GrafoBase.niveis_bfs
+MOTOR_PYTHON = "python"
+MOTOR_NUMPY = "numpy"
+
+class NoGrafo:
+    def __init__(self, id, nome, pos_x, pos_y):
+        self.id = id
+        self.nome = nome
+        self.pos_x = pos_x
+        self.pos_y = pos_y
+        self.eh_tesouro = False
+        self.eh_armadilha = False
+        self.cor = CINZA
+        self.raio = 25
+        self.descricao = "Um lugar comum no mapa."
+        # Grafo ao qual o nó pertence, avisado quando tesouro/armadilha mudam
+        self.grafo = None
+    
+    def definir_tesouro(self):
+        if self.grafo is not None:
+            self.grafo.verificar_alteravel()
+        self.eh_tesouro = True
+        self.cor = VERDE
+        self.descricao = "Este lugar contém o tesouro!"
+        if self.grafo is not None:
+            self.grafo.no_alterado(self)
+    
+    def definir_armadilha(self):
+        if self.grafo is not None:
+            self.grafo.verificar_alteravel()
+        self.eh_armadilha = True
+        self.cor = VERMELHO
+        self.descricao = "Cuidado! Este lugar contém uma armadilha!"
+        if self.grafo is not None:
+            self.grafo.no_alterado(self)
+    
+    def desenhar(self, tela, atual=False, caminho=False):
+        # Importado aqui para que o núcleo não dependa do pygame
+        from renderizacao import desenhar_no
+        desenhar_no(tela, self, atual, caminho)
+    
+    def contem_ponto(self, pos):
+        return ((pos[0] - self.pos_x) ** 2 + (pos[1] - self.pos_y) ** 2) <= self.raio ** 2
+    
+    def __str__(self):
+        return self.nome
+
+class GrafoBase:
+    # Desenho e buscas dependem apenas de self.nos (id -> nó) e
+    # self.arestas (id -> vizinhos), então são compartilhados pela
+    # representação em dicionários (Grafo) e pela compacta (GrafoCSR).
+    # self.versao muda sempre que o grafo muda, para invalidar caches.
+    # self.pesos guarda só os pesos definidos explicitamente, por
+    # (menor id, maior id); as demais arestas pesam o comprimento euclidiano.
+    # Um grafo congelado (congelar) é um modelo compartilhado por várias
+    # partidas e recusa qualquer alteração
+    
+    def congelar(self):
+        self.congelado = True
+    
+    def verificar_alteravel(self):
+        if self.congelado:
+            raise ValueError("o mapa é um modelo compartilhado e não pode ser alterado")
+    
+    def no_alterado(self, no):
+        self.versao += 1
+        if self.componentes is not None:
+            self.componentes.no_alterado(no)
+    
+    def peso(self, no1_id, no2_id):
+        if self.pesos:
+            chave = (no1_id, no2_id) if no1_id < no2_id else (no2_id, no1_id)
+            if chave in self.pesos:
+                return self.pesos[chave]
+        no1 = self.nos[no1_id]
+        no2 = self.nos[no2_id]
+        return math.hypot(no2.pos_x - no1.pos_x, no2.pos_y - no1.pos_y)
+    
+    def definir_peso(self, no1_id, no2_id, peso):
+        self.verificar_alteravel()
+        if peso < 0:
+            raise ValueError("o peso de uma aresta não pode ser negativo")
+        self.pesos[(no1_id, no2_id) if no1_id < no2_id else (no2_id, no1_id)] = peso
+        self.versao += 1
+    
+    def custo_caminho(self, caminho):
+        return sum(self.peso(no1_id, no2_id) for no1_id, no2_id in zip(caminho, caminho[1:]))
+    
+    def fator_heuristica(self):
+        # A distância euclidiana só é uma heurística admissível para o A* se
+        # nenhuma aresta pesar menos que o próprio comprimento; pesos
+        # explícitos menores reduzem a heurística na mesma proporção
+        fator = 1.0
+        for (no1_id, no2_id), peso in self.pesos.items():
+            no1 = self.nos[no1_id]
+            no2 = self.nos[no2_id]
+            comprimento = math.hypot(no2.pos_x - no1.pos_x, no2.pos_y - no1.pos_y)
+            if comprimento > 0:
+                fator = min(fator, peso / comprimento)
+        return fator
+    
+    def obter_indice_espacial(self):
+        # Construído na primeira consulta; depois adicionar_no o mantém atualizado
+        if self.indice_espacial is None:
+            indice = GradeEspacial()
+            for no_id, no in self.nos.items():
+                indice.inserir(no_id, no.pos_x, no.pos_y, no.raio)
+            self.indice_espacial = indice
+        return self.indice_espacial
+    
+    def obter_componentes(self):
+        # Componentes conexas sem as armadilhas (veja componentes.py),
+        # montadas na primeira consulta e depois atualizadas pelo grafo.
+        # Importado aqui porque componentes depende de grafo_compacto, que
+        # depende deste módulo
+        if self.componentes is None:
+            from componentes import ComponentesLivres
+            self.componentes = ComponentesLivres(self)
+        return self.componentes
+    
+    def alcancavel(self, inicio_id, destino_id):
+        # Se as buscas acham algum caminho do início ao destino, sem buscar
+        return self.obter_componentes().alcancavel(inicio_id, destino_id)
+    
+    def arvore_ate(self, *destinos):
+        # Árvore de caminhos mais curtos até o destino (ou até o mais próximo
+        # de vários destinos), calculada uma vez e reaproveitada até o grafo
+        # ou as armadilhas mudarem (self.versao)
+        versao, arvore = self.arvores.get(destinos, (None, None))
+        if arvore is None or versao != self.versao:
+            arvore = ArvoreCaminhos(self, destinos)
+            self.arvores[destinos] = (self.versao, arvore)
+        return arvore
+    
+    def obter_geometria(self):
+        # (x_min, y_min, x_max, y_max, maior aresta) do mapa, usada pela
+        # câmera para enquadrar o mapa e para não perder arestas que cruzam
+        # a tela com as duas pontas fora dela ("maior aresta" é a maior
+        # extensão de uma aresta em x ou em y); refeita quando o grafo muda
+        if self.geometria is None or self.geometria[0] != self.versao:
+            x_min = y_min = x_max = y_max = 0
+            maior_aresta = 0
+            for indice, (no_id, no) in enumerate(self.nos.items()):
+                if indice == 0:
+                    x_min = x_max = no.pos_x
+                    y_min = y_max = no.pos_y
+                x_min = min(x_min, no.pos_x)
+                x_max = max(x_max, no.pos_x)
+                y_min = min(y_min, no.pos_y)
+                y_max = max(y_max, no.pos_y)
+                for vizinho_id in self.arestas[no_id]:
+                    vizinho = self.nos[vizinho_id]
+                    maior_aresta = max(maior_aresta, abs(vizinho.pos_x - no.pos_x), abs(vizinho.pos_y - no.pos_y))
+            self.geometria = (self.versao, (x_min, y_min, x_max, y_max, maior_aresta))
+        return self.geometria[1]
+    
+    def no_em_ponto(self, pos):
+        # Id do nó clicado em pos (o mais próximo, se houver sobreposição) ou None
+        indice = self.obter_indice_espacial()
+        for no_id in indice.proximos(pos[0], pos[1], indice.raio_maximo):
+            if self.nos[no_id].contem_ponto(pos):
+                return no_id
+        return None
+    
+    def nos_no_retangulo(self, x_min, y_min, x_max, y_max, margem=0):
+        # Ids dos nós cujo centro está no retângulo ampliado por margem pixels
+        return self.obter_indice_espacial().consultar_retangulo(x_min - margem, y_min - margem,
+                                                               x_max + margem, y_max + margem)
+    
+    def desenhar(self, tela, no_atual=None, caminho=None, visitados=None, fronteira=None, caminho_atual=None, armadilhas_evitadas=None, camera=None):
+        # Importado aqui para que o núcleo não dependa do pygame
+        from renderizacao import desenhar_grafo
+        desenhar_grafo(tela, self, no_atual, caminho, visitados, fronteira, caminho_atual, armadilhas_evitadas, camera)
+    
+    def busca_bfs(self, inicio_id, destino_id, registrar_historico=True):
+        return consumir_passos(self.passos_bfs(inicio_id, destino_id, registrar_historico))
+    
+    def passos_bfs(self, inicio_id, destino_id, registrar_historico=True, historico_busca=None):
+        # A mesma BFS como gerador: pausa (yield) depois de cada passo gravado
+        # no histórico e, ao terminar, devolve o resultado de busca_bfs em
+        # StopIteration.value. Assim a animação pode começar antes do fim da
+        # busca; busca_bfs só consome o gerador até o fim.
+        # Para visualização, retornamos histórico da busca
+        if historico_busca is None:
+            historico_busca = HistoricoBusca()
+        
+        if inicio_id not in self.nos or destino_id not in self.nos:
+            return None, historico_busca, set(), set(), set()
+        
+        visitados = set()
+        fronteira = set([inicio_id])
+        # A fila guarda apenas ids; o caminho é reconstruído pelos predecessores
+        fila = deque([inicio_id])
+        predecessores = {inicio_id: None}
+        armadilhas_evitadas = set()
+        
+        # Registra o estado inicial para visualização
+        if registrar_historico:
+            historico_busca.acompanhar(predecessores)
+            historico_busca.empilhar(inicio_id)
+            historico_busca.registrar_passo(inicio_id, None)
+            yield
+        
+        while fila:
+            atual = fila.popleft()
+            fronteira.discard(atual)  # Remove da fronteira mesmo se não existir
+            if registrar_historico:
+                historico_busca.desempilhar(atual)
+            
+            if atual == destino_id:
+                # Só agora o caminho é montado, uma única vez
+                caminho = reconstruir_caminho(predecessores, atual)
+                # Inclui o estado final no histórico
+                if registrar_historico:
+                    historico_busca.registrar_passo(atual, predecessores[atual])
+                    historico_busca.finalizar(predecessores)
+                return caminho, historico_busca, visitados, fronteira, armadilhas_evitadas
+            
+            if atual not in visitados:
+                visitados.add(atual)
+                if registrar_historico:
+                    historico_busca.visitar(atual)
+                
+                for vizinho in self.arestas[atual]:
+                    # Registra armadilhas evitadas para visualização
+                    if self.nos[vizinho].eh_armadilha:
+                        armadilhas_evitadas.add(vizinho)
+                        if registrar_historico:
+                            historico_busca.evitar_armadilha(vizinho)
+                        continue
+                        
+                    # Verifica se o vizinho é uma armadilha antes de adicioná-lo à fronteira
+                    if vizinho not in visitados and vizinho not in fronteira:
+                        predecessores[vizinho] = atual
+                        fronteira.add(vizinho)
+                        fila.append(vizinho)
+                        
+                        # Registra o estado para visualização
+                        if registrar_historico:
+                            historico_busca.empilhar(vizinho)
+                            historico_busca.registrar_passo(vizinho, atual)
+                            yield
+        
+        if registrar_historico:
+            historico_busca.finalizar(predecessores)
+        return None, historico_busca, visitados, fronteira, armadilhas_evitadas
+    
+    def busca_bfs_bidirecional(self, inicio_id, destino_id, registrar_historico=True):
+        return consumir_passos(self.passos_bfs_bidirecional(inicio_id, destino_id, registrar_historico))
+    
+    def passos_bfs_bidirecional(self, inicio_id, destino_id, registrar_historico=True, historico_busca=None):
+        # BFS a partir das duas pontas ao mesmo tempo. A cada rodada expande
+        # um nível inteiro do lado com a fila menor; quando um lado descobre
+        # um nó já alcançado pelo outro, termina o nível e fica com o menor
+        # encontro, então o caminho tem o mesmo tamanho que o da BFS comum
+        # expandindo bem menos nós. Armadilhas são evitadas dos dois lados.
+        # Gerador como passos_bfs.
+        if historico_busca is None:
+            historico_busca = HistoricoBusca()
+        
+        if inicio_id not in self.nos or destino_id not in self.nos:
+            return None, historico_busca, set(), set(), set()
+        
+        visitados = set()
+        fronteira = set([inicio_id])
+        armadilhas_evitadas = set()
+        
+        if registrar_historico:
+            historico_busca.empilhar(inicio_id)
+            historico_busca.registrar_passo(inicio_id, None)
+            yield
+        
+        if inicio_id == destino_id:
+            if registrar_historico:
+                historico_busca.finalizar({inicio_id: None})
+            return [inicio_id], historico_busca, visitados, fronteira, armadilhas_evitadas
+        
+        # A BFS comum nunca entra no destino se ele for armadilha
+        if self.nos[destino_id].eh_armadilha:
+            if registrar_historico:
+                historico_busca.finalizar({inicio_id: None})
+            return None, historico_busca, visitados, fronteira, armadilhas_evitadas
+        
+        # Distância e predecessor de cada nó alcançado, por lado; do lado do
+        # destino o "predecessor" é o próximo nó em direção ao destino
+        distancias = ({inicio_id: 0}, {destino_id: 0})
+        predecessores = ({inicio_id: None}, {destino_id: None})
+        
+        fronteira.add(destino_id)
+        if registrar_historico:
+            # Durante a busca os passos são reproduzidos com os dois lados
+            # juntos, como no mapa combinado de finalizar
+            historico_busca.acompanhar(ChainMap(*predecessores))
+            historico_busca.empilhar(destino_id)
+            historico_busca.registrar_passo(destino_id, None)
+            yield
+        filas = (deque([inicio_id]), deque([destino_id]))
+        encontro = None
+        
+        while filas[0] and filas[1] and encontro is None:
+            lado = 0 if len(filas[0]) <= len(filas[1]) else 1
+            fila = filas[lado]
+            distancia, distancia_outro = distancias[lado], distancias[1 - lado]
+            predecessor = predecessores[lado]
+            melhor = None
+            
+            for _ in range(len(fila)):
+                atual = fila.popleft()
+                fronteira.discard(atual)
+                visitados.add(atual)
+                if registrar_historico:
+                    historico_busca.desempilhar(atual)
+                    historico_busca.visitar(atual)
+                
+                for vizinho in self.arestas[atual]:
+                    if self.nos[vizinho].eh_armadilha:
+                        armadilhas_evitadas.add(vizinho)
+                        if registrar_historico:
+                            historico_busca.evitar_armadilha(vizinho)
+                        continue
+                    
+                    if vizinho in distancia_outro:
+                        total = distancia[atual] + 1 + distancia_outro[vizinho]
+                        if melhor is None or total < melhor[0]:
+                            melhor = (total, atual, vizinho)
+                    
+                    if vizinho not in distancia:
+                        distancia[vizinho] = distancia[atual] + 1
+                        predecessor[vizinho] = atual
+                        fronteira.add(vizinho)
+                        fila.append(vizinho)
+                        if registrar_historico:
+                            historico_busca.empilhar(vizinho)
+                            historico_busca.registrar_passo(vizinho, atual)
+                            yield
+            
+            if melhor is not None:
+                _, atual, vizinho = melhor
+                encontro = (atual, vizinho) if lado == 0 else (vizinho, atual)
+        
+        if encontro is None:
+            if registrar_historico:
+                historico_busca.finalizar(predecessores[0])
+            return None, historico_busca, visitados, fronteira, armadilhas_evitadas
+        
+        # Junta as duas metades: início ... ultimo_inicio, primeiro_destino ... destino
+        ultimo_inicio, primeiro_destino = encontro
+        caminho = reconstruir_caminho(predecessores[0], ultimo_inicio)
+        no_id = primeiro_destino
+        while no_id is not None:
+            caminho.append(no_id)
+            no_id = predecessores[1][no_id]
+        
+        if registrar_historico:
+            # Na reprodução os nós do lado do destino mostram o caminho desde o
+            # destino; o último passo mostra o caminho completo, que não é uma
+            # única cadeia de predecessores
+            combinados = dict(predecessores[1])
+            combinados.update(predecessores[0])
+            historico_busca.registrar_passo(destino_id, caminho[-2])
+            historico_busca.finalizar(combinados, caminho_final=caminho)
+        return caminho, historico_busca, visitados, fronteira, armadilhas_evitadas
+    
+    def busca_dijkstra(self, inicio_id, destino_id, registrar_historico=True):
+        return self.busca_por_custo(inicio_id, destino_id, False, registrar_historico)
+    
+    def busca_a_estrela(self, inicio_id, destino_id, registrar_historico=True):
+        return self.busca_por_custo(inicio_id, destino_id, True, registrar_historico)
+    
+    def busca_por_custo(self, inicio_id, destino_id, usar_heuristica, registrar_historico=True):
+        return consumir_passos(self.passos_por_custo(inicio_id, destino_id, usar_heuristica, registrar_historico))
+    
+    def passos_dijkstra(self, inicio_id, destino_id, registrar_historico=True, historico_busca=None):
+        return self.passos_por_custo(inicio_id, destino_id, False, registrar_historico, historico_busca)
+    
+    def passos_a_estrela(self, inicio_id, destino_id, registrar_historico=True, historico_busca=None):
+        return self.passos_por_custo(inicio_id, destino_id, True, registrar_historico, historico_busca)
+    
+    def passos_por_custo(self, inicio_id, destino_id, usar_heuristica, registrar_historico=True, historico_busca=None):
+        # Dijkstra com heap binária (heapq); com usar_heuristica, A* guiado
+        # pela distância euclidiana até o destino. Devolve o caminho de menor
+        # custo somando self.peso, evitando armadilhas como a BFS. Gerador
+        # como passos_bfs.
+        if historico_busca is None:
+            historico_busca = HistoricoBusca()
+        
+        if inicio_id not in self.nos or destino_id not in self.nos:
+            return None, historico_busca, set(), set(), set()
+        
+        visitados = set()
+        fronteira = set([inicio_id])
+        custos = {inicio_id: 0}
+        predecessores = {inicio_id: None}
+        armadilhas_evitadas = set()
+        
+        destino = self.nos[destino_id]
+        fator = self.fator_heuristica() if usar_heuristica else 0
+        
+        def estimativa(no_id):
+            if not fator:
+                return 0
+            no = self.nos[no_id]
+            return fator * math.hypot(destino.pos_x - no.pos_x, destino.pos_y - no.pos_y)
+        
+        # Entradas (prioridade, ordem de inserção, id); a ordem desempata
+        # prioridades iguais de forma estável. Entradas cujo nó já foi
+        # visitado (por um custo menor encontrado depois) são descartadas
+        contador = 0
+        heap = [(estimativa(inicio_id), contador, inicio_id)]
+        
+        if registrar_historico:
+            historico_busca.acompanhar(predecessores)
+            historico_busca.empilhar(inicio_id)
+            historico_busca.registrar_passo(inicio_id, None)
+            yield
+        
+        while heap:
+            _, _, atual = heapq.heappop(heap)
+            if atual in visitados:
+                continue
+            fronteira.discard(atual)
+            if registrar_historico:
+                historico_busca.desempilhar(atual)
+            
+            if atual == destino_id:
+                caminho = reconstruir_caminho(predecessores, atual)
+                if registrar_historico:
+                    historico_busca.registrar_passo(atual, predecessores[atual])
+                    historico_busca.finalizar(predecessores)
+                return caminho, historico_busca, visitados, fronteira, armadilhas_evitadas
+            
+            visitados.add(atual)
+            if registrar_historico:
+                historico_busca.visitar(atual)
+            
+            custo_atual = custos[atual]
+            for vizinho in self.arestas[atual]:
+                if self.nos[vizinho].eh_armadilha:
+                    armadilhas_evitadas.add(vizinho)
+                    if registrar_historico:
+                        historico_busca.evitar_armadilha(vizinho)
+                    continue
+                
+                if vizinho in visitados:
+                    continue
+                custo = custo_atual + self.peso(atual, vizinho)
+                if vizinho not in custos or custo < custos[vizinho]:
+                    custos[vizinho] = custo
+                    predecessores[vizinho] = atual
+                    fronteira.add(vizinho)
+                    contador += 1
+                    heapq.heappush(heap, (custo + estimativa(vizinho), contador, vizinho))
+                    
+                    if registrar_historico:
+                        historico_busca.empilhar(vizinho)
+                        historico_busca.registrar_passo(vizinho, atual)
+                        yield
+        
+        if registrar_historico:
+            historico_busca.finalizar(predecessores)
+        return None, historico_busca, visitados, fronteira, armadilhas_evitadas
+    
+    def busca_dfs(self, inicio_id, destino_id, registrar_historico=True):
+        return consumir_passos(self.passos_dfs(inicio_id, destino_id, registrar_historico))
+    
+    def passos_dfs(self, inicio_id, destino_id, registrar_historico=True, historico_busca=None):
+        # Gerador como passos_bfs.
+        # Para visualização, retornamos histórico da busca
+        if historico_busca is None:
+            historico_busca = HistoricoBusca()
+        
+        if inicio_id not in self.nos or destino_id not in self.nos:
+            return None, historico_busca, set(), set(), set()
+        
+        visitados = set()
+        fronteira = set([inicio_id])
+        # Cada entrada da pilha guarda (nó, nó de onde veio); o predecessor
+        # só é fixado quando o nó é de fato visitado, pois um mesmo nó pode
+        # ser empilhado mais de uma vez a partir de pais diferentes
+        pilha = [(inicio_id, None)]
+        predecessores = {}
+        armadilhas_evitadas = set()
+        
+        # Registra o estado inicial para visualização
+        if registrar_historico:
+            historico_busca.acompanhar(predecessores)
+            historico_busca.empilhar(inicio_id)
+            historico_busca.registrar_passo(inicio_id, None)
+            yield
+        
+        while pilha:
+            atual, pai = pilha.pop()
+            fronteira.discard(atual)  # Remove da fronteira
+            if registrar_historico:
+                historico_busca.desempilhar(atual)
+            
+            if atual == destino_id:
+                predecessores[atual] = pai
+                caminho = reconstruir_caminho(predecessores, atual)
+                # Inclui o estado final no histórico
+                if registrar_historico:
+                    historico_busca.registrar_passo(atual, pai)
+                    historico_busca.finalizar(predecessores)
+                return caminho, historico_busca, visitados, fronteira, armadilhas_evitadas
+            
+            if atual not in visitados:
+                visitados.add(atual)
+                predecessores[atual] = pai
+                if registrar_historico:
+                    historico_busca.visitar(atual)
+                
+                # Em DFS, processa os vizinhos em ordem inversa para manter comportamento visual tradicional
+                vizinhos = list(self.arestas[atual])
+                vizinhos.reverse()
+                
+                for vizinho in vizinhos:
+                    # Registra armadilhas evitadas para visualização
+                    if self.nos[vizinho].eh_armadilha:
+                        armadilhas_evitadas.add(vizinho)
+                        if registrar_historico:
+                            historico_busca.evitar_armadilha(vizinho)
+                        continue
+                    
+                    # Verifica se o vizinho é válido para exploração
+                    if vizinho not in visitados:
+                        fronteira.add(vizinho)
+                        pilha.append((vizinho, atual))
+                        
+                        # Registra o estado para visualização
+                        if registrar_historico:
+                            historico_busca.empilhar(vizinho)
+                            historico_busca.registrar_passo(vizinho, atual)
+                            yield
+        
+        if registrar_historico:
+            historico_busca.finalizar(predecessores)
+        return None, historico_busca, visitados, fronteira, armadilhas_evitadas
+
+    def busca_mais_proximo(self, inicio_id, destinos, por_custo=False):
+        # Destino mais próximo do início entre vários (como os tesouros de um
+        # mapa) numa única busca multifonte: todos os destinos partem juntos,
+        # com distância 0, e a busca para assim que chega ao início, em vez
+        # de rodar uma busca por destino. Com por_custo usa Dijkstra com os
+        # pesos das arestas; senão, BFS (número de passos). Armadilhas são
+        # evitadas como nas outras buscas. Devolve (destino_id, caminho do
+        # início até ele) ou (None, None).
+        if inicio_id not in self.nos:
+            return None, None
+        destinos = [destino_id for destino_id in destinos if destino_id in self.nos]
+        if inicio_id in destinos:
+            return inicio_id, [inicio_id]
+        
+        # O "predecessor" de cada nó é o próximo passo rumo ao destino
+        proximos = {}
+        custos = {}
+        heap = []
+        for ordem, destino_id in enumerate(destinos):
+            if destino_id in custos or self.nos[destino_id].eh_armadilha:
+                continue
+            proximos[destino_id] = None
+            custos[destino_id] = 0
+            heap.append((0, ordem, destino_id))
+        fila = deque(destino_id for _, _, destino_id in heap)
+        contador = len(heap)
+        visitados = set()
+        
+        while heap if por_custo else fila:
+            if por_custo:
+                _, _, atual = heapq.heappop(heap)
+                if atual in visitados:
+                    continue
+                visitados.add(atual)
+                if atual == inicio_id:
+                    break
+            else:
+                atual = fila.popleft()
+            
+            for vizinho in self.arestas[atual]:
+                if por_custo:
+                    if vizinho in visitados:
+                        continue
+                    custo = custos[atual] + self.peso(atual, vizinho)
+                    if vizinho in custos and custo >= custos[vizinho]:
+                        continue
+                    custos[vizinho] = custo
+                    proximos[vizinho] = atual
+                    # O início pode ser uma armadilha; as demais nunca são atravessadas
+                    if vizinho == inicio_id or not self.nos[vizinho].eh_armadilha:
+                        contador += 1
+                        heapq.heappush(heap, (custo, contador, vizinho))
+                elif vizinho not in custos:
+                    custos[vizinho] = custos[atual] + 1
+                    proximos[vizinho] = atual
+                    # Na BFS a primeira descoberta do início já é a mais curta
+                    if vizinho == inicio_id:
+                        fila.clear()
+                        break
+                    if not self.nos[vizinho].eh_armadilha:
+                        fila.append(vizinho)
+        
+        if inicio_id not in proximos:
+            return None, None
+        caminho = [inicio_id]
+        while proximos[caminho[-1]] is not None:
+            caminho.append(proximos[caminho[-1]])
+        return caminho[-1], caminho
+    
+    def niveis_bfs(self, inicio_id, destino_id=None, motor=MOTOR_PYTHON):
+        # BFS só de distâncias, sem histórico nem animação: devolve as
+        # distâncias (em passos) e os pais dos nós alcançados a partir do
+        # início, evitando armadilhas como busca_bfs. Com destino_id a busca
+        # para no nível em que ele é alcançado, e caminho(destino_id) é o
+        # mesmo caminho de busca_bfs.
+        # MOTOR_NUMPY expande cada nível de uma vez com NumPy (veja
+        # bfs_vetorizada.py), o que compensa em mapas grandes. Distância e
+        # pai de cada nó alcançado são os mesmos nos dois motores; com
+        # destino_id, só o conjunto de nós alcançados no último nível pode
+        # variar.
+        if motor == MOTOR_NUMPY:
+            # Importado aqui para que NumPy continue opcional
+            from bfs_vetorizada import niveis_bfs_numpy
+            return niveis_bfs_numpy(self, inicio_id, destino_id)
+        if motor != MOTOR_PYTHON:
+            raise ValueError(f"motor de BFS desconhecido: {motor}")
+        
+        niveis = NiveisBFS()
+        if inicio_id not in self.nos:
+            return niveis
+        distancias = niveis.distancias
+        pais = niveis.pais
+        distancias[inicio_id] = 0
+        pais[inicio_id] = None
+        if inicio_id == destino_id:
+            return niveis
+        
+        fila = deque([inicio_id])
+        while fila:
+            atual = fila.popleft()
+            distancia = distancias[atual] + 1
+            for vizinho in self.arestas[atual]:
+                if vizinho in distancias or self.nos[vizinho].eh_armadilha:
+                    continue
+                distancias[vizinho] = distancia
+                pais[vizinho] = atual
+                if vizinho == destino_id:
+                    return niveis
+                fila.append(vizinho)
+        return niveis
+
+class Grafo(GrafoBase):
+    def __init__(self):
+        self.nos = {}
+        self.arestas = {}
+        self.versao = 0
+        self.congelado = False
+        self.indice_espacial = None
+        # ComponentesLivres, veja obter_componentes
+        self.componentes = None
+        self.pesos = {}
+        # destino -> (versao, ArvoreCaminhos), veja arvore_ate
+        self.arvores = {}
+        self.geometria = None
+    
+    def adicionar_no(self, no):
+        self.verificar_alteravel()
+        if self.indice_espacial is not None and no.id in self.nos:
+            antigo = self.nos[no.id]
+            self.indice_espacial.remover(antigo.id, antigo.pos_x, antigo.pos_y)
+        self.nos[no.id] = no
+        self.arestas[no.id] = []
+        no.grafo = self
+        self.versao += 1
+        if self.indice_espacial is not None:
+            self.indice_espacial.inserir(no.id, no.pos_x, no.pos_y, no.raio)
+        if self.componentes is not None:
+            self.componentes.no_adicionado(no)
+    
+    def definir_vizinhos(self, no_id, vizinhos):
+        # Substitui a lista de vizinhos do nó, mantendo a ordem dada (usado ao
+        # carregar mapas, em que a ordem dos vizinhos vem do arquivo)
+        self.verificar_alteravel()
+        antigos = self.arestas[no_id]
+        self.arestas[no_id] = list(vizinhos)
+        self.versao += 1
+        if self.componentes is not None:
+            if not set(antigos) <= set(self.arestas[no_id]):
+                self.componentes.arestas_removidas()
+            self.componentes.arestas_adicionadas(no_id, self.arestas[no_id])
+    
+    def adicionar_aresta(self, no1_id, no2_id, peso=None):
+        # Sem peso, a aresta pesa a distância entre os dois nós
+        self.verificar_alteravel()
+        if no1_id in self.arestas and no2_id in self.nos:
+            if peso is not None:
+                self.definir_peso(no1_id, no2_id, peso)
+            if no2_id not in self.arestas[no1_id]:
+                self.arestas[no1_id].append(no2_id)
+                self.versao += 1
+                # Grafo não direcionado
+                if no2_id in self.arestas and no1_id not in self.arestas[no2_id]:
+                    self.arestas[no2_id].append(no1_id)
+                if self.componentes is not None:
+                    self.componentes.arestas_adicionadas(no1_id, [no2_id])
+
+def consumir_passos(passos):
+    # Roda um gerador de passos (passos_bfs, passos_dfs...) até o fim e
+    # devolve o resultado da busca
+    while True:
+        try:
+            next(passos)
+        except StopIteration as fim:
+            return fim.value
+
+def reconstruir_caminho(predecessores, destino_id):
+    # Percorre os predecessores do destino até a origem e inverte o resultado
+    caminho = []
+    no_id = destino_id
+    while no_id is not None:
+        caminho.append(no_id)
+        no_id = predecessores[no_id]
+    caminho.reverse()
+    return caminho
+
+class ArvoreCaminhos:
+    # Uma única BFS reversa a partir dos destinos, sem passar por armadilhas,
+    # guarda para cada nó que alcança algum destino o próximo passo e a
+    # distância (em arestas) até o mais próximo deles. O caminho de qualquer
+    # nó até o destino vira uma sequência de consultas a dicionário, sem
+    # nova busca. Como na BFS comum, uma armadilha pode ser o ponto de
+    # partida mas nunca é atravessada, e um destino que é armadilha só é
+    # alcançado dele mesmo.
+    def __init__(self, grafo, destinos):
+        self.proximos = {}
+        self.distancias = {}
+        
+        # Todos os destinos entram na fila com distância 0 (BFS multifonte)
+        fila = deque()
+        for destino_id in destinos:
+            if destino_id in self.distancias:
+                continue
+            self.proximos[destino_id] = None
+            self.distancias[destino_id] = 0
+            if destino_id in grafo.nos and not grafo.nos[destino_id].eh_armadilha:
+                fila.append(destino_id)
+        
+        while fila:
+            atual = fila.popleft()
+            distancia = self.distancias[atual] + 1
+            for vizinho in grafo.arestas[atual]:
+                if vizinho in self.distancias:
+                    continue
+                self.proximos[vizinho] = atual
+                self.distancias[vizinho] = distancia
+                # Armadilhas podem ser ponto de partida, mas nunca intermediárias
+                if not grafo.nos[vizinho].eh_armadilha:
+                    fila.append(vizinho)
+    
+    def __contains__(self, no_id):
+        return no_id in self.distancias
+    
+    def proximo(self, no_id):
+        # Próximo nó rumo ao destino (None no próprio destino ou sem caminho)
+        return self.proximos.get(no_id)
+    
+    def distancia(self, no_id):
+        return self.distancias.get(no_id)
+    
+    def caminho(self, no_id):
+        if no_id not in self.distancias:
+            return None
+        caminho = [no_id]
+        while self.proximos[caminho[-1]] is not None:
+            caminho.append(self.proximos[caminho[-1]])
+        return caminho
+    
+    def destino(self, no_id):
+        # Destino mais próximo do nó (None sem caminho)
+        caminho = self.caminho(no_id)
+        return caminho[-1] if caminho else None
+
+class NiveisBFS:
+    # Resultado de niveis_bfs com o motor Python: distância e pai de cada nó
+    # alcançado, em dicionários
+    def __init__(self):
+        self.distancias = {}
+        self.pais = {}
+    
+    def __contains__(self, no_id):
+        return no_id in self.distancias
+    
+    def __len__(self):
+        return len(self.distancias)
+    
+    def distancia(self, no_id):
+        return self.distancias.get(no_id)
+    
+    def pai(self, no_id):
+        return self.pais.get(no_id)
+    
+    def caminho(self, no_id):
+        if no_id not in self.distancias:
+            return None
+        return reconstruir_caminho(self.pais, no_id)
+
+class IndiceCaminho:
+    # Nós e arestas de um caminho em conjuntos, montados uma única vez quando
+    # o caminho muda, para que o desenho teste pertinência em O(1) em vez de
+    # usar "in" e .index() na lista a cada quadro
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.nos = set(caminho)
+        # Posição de cada nó no caminho (a primeira, se repetir)
+        self.posicoes = {}
+        for posicao, no_id in enumerate(caminho):
+            self.posicoes.setdefault(no_id, posicao)
+        # Arestas guardadas como (menor id, maior id)
+        self.arestas = set()
+        for no1_id, no2_id in zip(caminho, caminho[1:]):
+            self.arestas.add((no1_id, no2_id) if no1_id < no2_id else (no2_id, no1_id))
+    
+    def __len__(self):
+        return len(self.caminho)
+    
+    def __contains__(self, no_id):
+        return no_id in self.nos
+    
+    def contem_aresta(self, no1_id, no2_id):
+        return ((no1_id, no2_id) if no1_id < no2_id else (no2_id, no1_id)) in self.arestas
+
+def indexar_caminho(caminho):
+    # Aceita uma lista ou um IndiceCaminho já montado; caminho vazio vira None
+    if not caminho:
+        return None
+    if isinstance(caminho, IndiceCaminho):
+        return caminho
+    return IndiceCaminho(caminho)
+
+def criar_mapa():
+    grafo = Grafo()
+    
+    # Posições dos nós ajustadas para o tabuleiro maior
+    posicoes = {
+        1: (200, 130),    # Entrada da Caverna
+        2: (400, 190),    # Salão Principal
+        3: (200, 300),    # Corredor Escuro
+        4: (600, 130),    # Câmara Misteriosa
+        5: (400, 350),    # Ponto de Bifurcação
+        6: (200, 500),    # Passagem Estreita
+        7: (900, 130),    # Sala dos Cristais
+        8: (600, 350),    # Túnel Úmido
+        9: (400, 500),    # Abismo Profundo
+        10: (200, 730),   # Sala do Tesouro
+        11: (800, 250),   # Câmara Secreta
+        12: (900, 350),   # Gruta Profunda
+        13: (600, 550),   # Salão dos Espelhos
+        14: (400, 650),   # Rio Subterrâneo
+        15: (750, 650),   # Altar Antigo
+    }
+    
+    # Criando os nós
+    locais = [
+        (1, "Entrada da Caverna"),
+        (2, "Salão Principal"),
+        (3, "Corredor Escuro"),
+        (4, "Câmara Misteriosa"),
+        (5, "Ponto de Bifurcação"),
+        (6, "Passagem Estreita"),
+        (7, "Sala dos Cristais"),
+        (8, "Túnel Úmido"),
+        (9, "Abismo Profundo"),
+        (10, "Sala do Tesouro"),
+        (11, "Câmara Secreta"),
+        (12, "Gruta Profunda"),
+        (13, "Salão dos Espelhos"),
+        (14, "Rio Subterrâneo"),
+        (15, "Altar Antigo")
+    ]
+    
+    for id, nome in locais:
+        pos_x, pos_y = posicoes[id]
+        grafo.adicionar_no(NoGrafo(id, nome, pos_x, pos_y))
+    
+    # Adicionando arestas (caminhos entre locais)
+    conexoes = [
+        (1, 2), (1, 3),
+        (2, 4), (2, 5),
+        (3, 5), (3, 6),
+        (4, 7), (4, 8),
+        (5, 8), (5, 9),
+        (6, 9), (6, 10),
+        (7, 11), (7, 12),
+        (8, 12), (8, 13),
+        (9, 13), (9, 14),
+        (10, 14), (10, 15),
+        (11, 15), (12, 13),
+        (13, 14), (14, 15)
+    ]
+    
+    for no1, no2 in conexoes:
+        grafo.adicionar_aresta(no1, no2)
+    
+    # Definindo o tesouro
+    grafo.nos[15].definir_tesouro()  # Altar Antigo
+    
+    # Definindo armadilhas
+    armadilhas = [4, 10, 13]  # Câmara Misteriosa, Abismo Profundo, Gruta Profunda
+    for arm_id in armadilhas:
+        grafo.nos[arm_id].definir_armadilha()
+    
+    return grafo
@@ -0,0 +1,226 @@
+# Representação compacta do grafo para mapas muito grandes.
+#
+# Em vez de um NoGrafo (com __dict__) por local e uma lista Python de
+# vizinhos por nó, GrafoCSR guarda tudo em arrays tipados:
+#   - offsets/alvos: adjacência em formato CSR (compressed sparse row); os
+#     vizinhos do nó de índice i são alvos[offsets[i]:offsets[i + 1]]
+#   - ids, pos_x, pos_y: posição de cada nó
+#   - marcadores: bits de tesouro/armadilha
+# Os nós só viram objetos quando acessados, como visões leves (NoCompacto,
+# com __slots__). Como GrafoCSR expõe self.nos e self.arestas com a mesma
+# interface de Grafo, as buscas e o desenho de GrafoBase funcionam sem mudança.
+
+from array import array
+from collections.abc import Mapping
+
+from configuracoes import CINZA, VERDE, VERMELHO
+from grafo import GrafoBase
+
+# Bits de marcadores
+MARCA_TESOURO = 1
+MARCA_ARMADILHA = 2
+
+RAIO_NO = 25
+
+def como_array(valores, tipo):
+    if isinstance(valores, memoryview) or (isinstance(valores, array) and valores.typecode == tipo):
+        return valores
+    return array(tipo, valores)
+
+def nome_padrao(no_id):
+    # Nome dos locais sem nome próprio (nos arquivos de mapa, o nome omitido)
+    return f"Local {no_id}"
+
+class NoCompacto:
+    # Visão de um nó de GrafoCSR; não guarda dados próprios além do índice
+    __slots__ = ('grafo', 'indice')
+
+    raio = RAIO_NO
+
+    def __init__(self, grafo, indice):
+        self.grafo = grafo
+        self.indice = indice
+
+    @property
+    def id(self):
+        return self.grafo.ids[self.indice]
+
+    @property
+    def nome(self):
+        if self.grafo.nomes is not None:
+            return self.grafo.nomes[self.indice]
+        return nome_padrao(self.id)
+
+    @property
+    def pos_x(self):
+        return self.grafo.pos_x[self.indice]
+
+    @property
+    def pos_y(self):
+        return self.grafo.pos_y[self.indice]
+
+    @property
+    def eh_tesouro(self):
+        return bool(self.grafo.marcadores[self.indice] & MARCA_TESOURO)
+
+    @property
+    def eh_armadilha(self):
+        return bool(self.grafo.marcadores[self.indice] & MARCA_ARMADILHA)
+
+    @property
+    def cor(self):
+        if self.eh_armadilha:
+            return VERMELHO
+        if self.eh_tesouro:
+            return VERDE
+        return CINZA
+
+    @property
+    def descricao(self):
+        if self.eh_armadilha:
+            return "Cuidado! Este lugar contém uma armadilha!"
+        if self.eh_tesouro:
+            return "Este lugar contém o tesouro!"
+        return "Um lugar comum no mapa."
+
+    def definir_tesouro(self):
+        self.grafo.verificar_alteravel()
+        self.grafo.marcadores[self.indice] |= MARCA_TESOURO
+        self.grafo.no_alterado(self)
+
+    def definir_armadilha(self):
+        self.grafo.verificar_alteravel()
+        self.grafo.marcadores[self.indice] |= MARCA_ARMADILHA
+        self.grafo.no_alterado(self)
+
+    def desenhar(self, tela, atual=False, caminho=False):
+        # Importado aqui para que o núcleo não dependa do pygame
+        from renderizacao import desenhar_no
+        desenhar_no(tela, self, atual, caminho)
+
+    def contem_ponto(self, pos):
+        return ((pos[0] - self.pos_x) ** 2 + (pos[1] - self.pos_y) ** 2) <= self.raio ** 2
+
+    def __str__(self):
+        return self.nome
+
+class VisaoNos(Mapping):
+    # id -> NoCompacto, criado sob demanda
+    __slots__ = ('grafo',)
+
+    def __init__(self, grafo):
+        self.grafo = grafo
+
+    def __getitem__(self, no_id):
+        return NoCompacto(self.grafo, self.grafo.indice_de(no_id))
+
+    def __contains__(self, no_id):
+        return self.grafo.contem_id(no_id)
+
+    def __iter__(self):
+        return iter(self.grafo.ids)
+
+    def __len__(self):
+        return len(self.grafo.ids)
+
+class VisaoArestas(Mapping):
+    # id -> array com os ids dos vizinhos (fatia de alvos)
+    __slots__ = ('grafo',)
+
+    def __init__(self, grafo):
+        self.grafo = grafo
+
+    def __getitem__(self, no_id):
+        grafo = self.grafo
+        indice = grafo.indice_de(no_id)
+        return grafo.alvos[grafo.offsets[indice]:grafo.offsets[indice + 1]]
+
+    def __contains__(self, no_id):
+        return self.grafo.contem_id(no_id)
+
+    def __iter__(self):
+        return iter(self.grafo.ids)
+
+    def __len__(self):
+        return len(self.grafo.ids)
+
+class GrafoCSR(GrafoBase):
+    def __init__(self, ids, pos_x, pos_y, offsets, alvos, marcadores=None, nomes=None, ids_consecutivos=None):
+        # ids, pos_x, pos_y e marcadores têm um elemento por nó; offsets tem
+        # len(ids) + 1 elementos; alvos guarda os ids (não índices) dos vizinhos.
+        # Arrays do tipo certo e memoryviews (por exemplo, de um arquivo
+        # mapeado com mmap) são usados diretamente, sem cópia.
+        self.ids = como_array(ids, 'q')
+        self.pos_x = como_array(pos_x, 'i')
+        self.pos_y = como_array(pos_y, 'i')
+        self.offsets = como_array(offsets, 'q')
+        self.alvos = como_array(alvos, 'q')
+        self.marcadores = como_array(marcadores, 'B') if marcadores is not None else array('B', bytes(len(self.ids)))
+        self.nomes = nomes
+
+        if len(self.offsets) != len(self.ids) + 1:
+            raise ValueError("offsets deve ter um elemento a mais que ids")
+
+        # Ids consecutivos (o caso comum) dispensam o dicionário id -> índice;
+        # quem já sabe a resposta (como o carregador binário) evita a verificação
+        self.primeiro_id = self.ids[0] if len(self.ids) else 0
+        if ids_consecutivos is None:
+            ids_consecutivos = all(no_id == self.primeiro_id + i for i, no_id in enumerate(self.ids))
+        if ids_consecutivos:
+            self.indice_por_id = None
+        else:
+            self.indice_por_id = {no_id: i for i, no_id in enumerate(self.ids)}
+
+        self.nos = VisaoNos(self)
+        self.arestas = VisaoArestas(self)
+        self.versao = 0
+        self.congelado = False
+        self.indice_espacial = None
+        self.componentes = None
+        self.pesos = {}
+        self.arvores = {}
+        self.geometria = None
+
+    @classmethod
+    def de_grafo(cls, grafo, manter_nomes=True):
+        # Converte um Grafo em dicionários preservando a ordem dos nós e dos
+        # vizinhos, para que as buscas percorram o grafo na mesma ordem
+        ids = array('q')
+        pos_x = array('i')
+        pos_y = array('i')
+        marcadores = array('B')
+        offsets = array('q', [0])
+        alvos = array('q')
+        nomes = [] if manter_nomes else None
+
+        for no_id, no in grafo.nos.items():
+            ids.append(no_id)
+            pos_x.append(no.pos_x)
+            pos_y.append(no.pos_y)
+            marcadores.append((MARCA_TESOURO if no.eh_tesouro else 0) | (MARCA_ARMADILHA if no.eh_armadilha else 0))
+            alvos.extend(grafo.arestas[no_id])
+            offsets.append(len(alvos))
+            if manter_nomes:
+                nomes.append(no.nome)
+
+        compacto = cls(ids, pos_x, pos_y, offsets, alvos, marcadores, nomes)
+        compacto.pesos = dict(grafo.pesos)
+        return compacto
+
+    def indice_de(self, no_id):
+        if self.indice_por_id is not None:
+            return self.indice_por_id[no_id]
+        indice = no_id - self.primeiro_id
+        if not 0 <= indice < len(self.ids):
+            raise KeyError(no_id)
+        return indice
+
+    def contem_id(self, no_id):
+        if self.indice_por_id is not None:
+            return no_id in self.indice_por_id
+        return isinstance(no_id, int) and 0 <= no_id - self.primeiro_id < len(self.ids)
+
+    def memoria_bytes(self):
+        # Tamanho dos buffers dos arrays (sem contar os nomes)
+        return sum(a.itemsize * len(a) for a in (self.ids, self.pos_x, self.pos_y,
+                                                 self.offsets, self.alvos, self.marcadores))
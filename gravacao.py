@@ -0,0 +1,402 @@
+# Gravação de sessões do jogo em arquivo binário compacto (.ctgrav): início
+# de cada partida, movimentos, buscas pedidas e o log de eventos de cada
+# busca (o mesmo de HistoricoBusca), gravados aos poucos durante o jogo. A
+# reprodução (reproducao.py) lê o arquivo em fluxo, sem carregá-lo inteiro,
+# e pode conferir se as buscas de hoje repetem os eventos gravados.
+#
+# Formato, little-endian:
+#
+#   cabeçalho (CABECALHO_GRAVACAO): assinatura b"CTGRAV\0\0", versão
+#   registros, cada um com:
+#       tipo        uint8 (REGISTRO_*)
+#       tempo       varint, ms desde o início da gravação (na versão 1, desde
+#                   o registro anterior)
+#       tamanho     varint, bytes dos dados
+#       dados
+#   ao fechar, um REGISTRO_INDICE e o rodapé (RODAPE_GRAVACAO): offset do
+#   registro de índice int64, assinatura b"CTGRIDX\0"
+#
+#   REGISTRO_PARTIDA    varint número de nós, varint início, arquivo do mapa
+#                       em utf-8 (vazio = mapa original)
+#   REGISTRO_MOVIMENTO  varint id do nó
+#   REGISTRO_BUSCA      varint início, varint destino, algoritmo em utf-8
+#                       (os nomes de Jogo.calcular_caminho)
+#   REGISTRO_EVENTOS    varint n, zlib(tipos uint8[n] + nós int64[n])
+#   REGISTRO_PASSOS     varint n, zlib(fim_passo int64[n] + passo_no int64[n]
+#                       + passo_pai int64[n])
+#   REGISTRO_FIM_BUSCA  varint n, zlib(caminho int64[n]); n = 0 sem caminho
+#   REGISTRO_INDICE     varint n, zlib(tempo int64[n] + offset int64[n]
+#                       + partida uint8[n]): o primeiro registro de cada
+#                       INTERVALO_INDICE_MS e todo REGISTRO_PARTIDA
+#
+# Eventos e passos são os trechos novos do histórico desde o registro
+# anterior da mesma busca e vão comprimidos com zlib no nível mais rápido,
+# então gravar custa uma cópia de array e uma compressão em C por quadro. Os
+# registros ficam num buffer que vai para o disco a cada TAMANHO_BUFFER bytes
+# ou INTERVALO_DESCARGA segundos; se o jogo for interrompido, um registro
+# cortado no fim do arquivo é simplesmente ignorado na leitura.
+#
+# Como cada registro diz o próprio tamanho, a leitura pode pular os dados
+# que não interessam (os eventos, por exemplo) sem decodificá-los. Para ir a
+# um instante de uma sessão de horas, o leitor nem percorre os registros: o
+# índice do fim do arquivo diz onde começa cada segundo e cada partida, e a
+# reprodução a partir de um instante só lê da última partida antes dele
+# (LeitorGravacao.posicao_da_partida). Um arquivo sem rodapé (jogo
+# interrompido, ou versão 1) é percorrido uma única vez, só pelos
+# cabeçalhos, para montar o mesmo índice.
+
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+
+ASSINATURA_GRAVACAO = b"CTGRAV\0\0"
+VERSAO_GRAVACAO = 2
+CABECALHO_GRAVACAO = struct.Struct("<8sI")
+ASSINATURA_INDICE = b"CTGRIDX\0"
+RODAPE_GRAVACAO = struct.Struct("<q8s")
+
+REGISTRO_PARTIDA = 1
+REGISTRO_MOVIMENTO = 2
+REGISTRO_BUSCA = 3
+REGISTRO_EVENTOS = 4
+REGISTRO_PASSOS = 5
+REGISTRO_FIM_BUSCA = 6
+REGISTRO_INDICE = 7
+
+TAMANHO_BUFFER = 64 * 1024
+INTERVALO_DESCARGA = 1.0
+INTERVALO_INDICE_MS = 1000
+# Maior cabeçalho de registro: tipo e dois varints de até 10 bytes
+MAXIMO_CABECALHO_REGISTRO = 21
+
+# --- Codificação ---
+
+def escrever_varint(destino, valor):
+    # Inteiro não negativo em base 128, 7 bits por byte
+    while valor >= 0x80:
+        destino.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    destino.append(valor)
+
+def ler_varint(dados, posicao):
+    # Devolve (valor, posição seguinte)
+    valor = 0
+    deslocamento = 0
+    while True:
+        byte = dados[posicao]
+        posicao += 1
+        valor |= (byte & 0x7F) << deslocamento
+        if byte < 0x80:
+            return valor, posicao
+        deslocamento += 7
+
+def comprimir_arrays(*arrays):
+    pedacos = []
+    for dados in arrays:
+        if sys.byteorder != 'little' and dados.itemsize > 1:
+            dados = array(dados.typecode, dados)
+            dados.byteswap()
+        pedacos.append(dados.tobytes())
+    return zlib.compress(b"".join(pedacos), 1)
+
+def descomprimir_arrays(dados, quantidade, *tipos):
+    # Inverso de comprimir_arrays para arrays de mesmo tamanho
+    bruto = zlib.decompress(dados)
+    arrays = []
+    inicio = 0
+    for tipo in tipos:
+        resultado = array(tipo)
+        fim = inicio + quantidade * resultado.itemsize
+        resultado.frombytes(bruto[inicio:fim])
+        if sys.byteorder != 'little' and resultado.itemsize > 1:
+            resultado.byteswap()
+        arrays.append(resultado)
+        inicio = fim
+    return arrays
+
+def decodificar_registro(tipo, dados):
+    # Dados de um registro como tupla, conforme o tipo (veja o formato acima)
+    if tipo == REGISTRO_MOVIMENTO:
+        return (ler_varint(dados, 0)[0],)
+    if tipo == REGISTRO_PARTIDA:
+        num_nos, posicao = ler_varint(dados, 0)
+        inicio_id, posicao = ler_varint(dados, posicao)
+        arquivo_mapa = bytes(dados[posicao:]).decode('utf-8') or None
+        return num_nos, inicio_id, arquivo_mapa
+    if tipo == REGISTRO_BUSCA:
+        inicio_id, posicao = ler_varint(dados, 0)
+        destino_id, posicao = ler_varint(dados, posicao)
+        return bytes(dados[posicao:]).decode('utf-8'), inicio_id, destino_id
+    quantidade, posicao = ler_varint(dados, 0)
+    if tipo == REGISTRO_EVENTOS:
+        return tuple(descomprimir_arrays(dados[posicao:], quantidade, 'B', 'q'))
+    if tipo == REGISTRO_PASSOS:
+        return tuple(descomprimir_arrays(dados[posicao:], quantidade, 'q', 'q', 'q'))
+    if tipo == REGISTRO_FIM_BUSCA:
+        if quantidade == 0:
+            return (None,)
+        return (list(descomprimir_arrays(dados[posicao:], quantidade, 'q')[0]),)
+    if tipo == REGISTRO_INDICE:
+        return tuple(descomprimir_arrays(dados[posicao:], quantidade, 'q', 'q', 'B'))
+    raise ValueError(f"tipo de registro desconhecido: {tipo}")
+
+# --- Gravação ---
+
+class GravadorSessao:
+    def __init__(self, caminho_arquivo, relogio=time.monotonic):
+        self.arquivo = open(caminho_arquivo, 'wb')
+        self.buffer = bytearray(CABECALHO_GRAVACAO.pack(ASSINATURA_GRAVACAO, VERSAO_GRAVACAO))
+        # Bytes já escritos no arquivo; com o buffer, dá o offset do próximo registro
+        self.escritos = 0
+        self.relogio = relogio
+        self.inicio = relogio()
+        self.ultima_descarga = self.inicio
+        # Índice gravado ao fechar (veja REGISTRO_INDICE)
+        self.indice_tempos = array('q')
+        self.indice_offsets = array('q')
+        self.indice_partidas = array('B')
+        self.proxima_entrada = 0
+        # Busca em andamento e quanto do seu histórico já foi gravado
+        self.historico = None
+        self.eventos_gravados = 0
+        self.passos_gravados = 0
+
+    def registrar(self, tipo, dados):
+        agora = self.relogio()
+        tempo = int((agora - self.inicio) * 1000)
+        if tipo == REGISTRO_PARTIDA or tempo >= self.proxima_entrada:
+            self.indice_tempos.append(tempo)
+            self.indice_offsets.append(self.escritos + len(self.buffer))
+            self.indice_partidas.append(tipo == REGISTRO_PARTIDA)
+            self.proxima_entrada = (tempo // INTERVALO_INDICE_MS + 1) * INTERVALO_INDICE_MS
+        self.anexar(tipo, tempo, dados)
+        if len(self.buffer) >= TAMANHO_BUFFER or agora - self.ultima_descarga >= INTERVALO_DESCARGA:
+            self.descarregar()
+
+    def anexar(self, tipo, tempo, dados):
+        self.buffer.append(tipo)
+        escrever_varint(self.buffer, tempo)
+        escrever_varint(self.buffer, len(dados))
+        self.buffer += dados
+
+    def descarregar(self):
+        self.arquivo.write(self.buffer)
+        self.arquivo.flush()
+        self.escritos += len(self.buffer)
+        self.buffer.clear()
+        self.ultima_descarga = self.relogio()
+
+    def partida(self, num_nos, inicio_id, arquivo_mapa=None):
+        # Nova partida (ou reinício): a busca em andamento, se houver, fica
+        # gravada só até aqui
+        self.acompanhar_busca()
+        self.historico = None
+        dados = bytearray()
+        escrever_varint(dados, num_nos)
+        escrever_varint(dados, inicio_id)
+        dados += (arquivo_mapa or "").encode('utf-8')
+        self.registrar(REGISTRO_PARTIDA, dados)
+
+    def movimento(self, no_id):
+        dados = bytearray()
+        escrever_varint(dados, no_id)
+        self.registrar(REGISTRO_MOVIMENTO, dados)
+
+    def busca(self, algoritmo, inicio_id, destino_id, historico_busca):
+        # Os eventos do historico_busca são gravados por acompanhar_busca
+        # conforme a busca avança
+        self.acompanhar_busca()
+        dados = bytearray()
+        escrever_varint(dados, inicio_id)
+        escrever_varint(dados, destino_id)
+        dados += algoritmo.encode('utf-8')
+        self.registrar(REGISTRO_BUSCA, dados)
+        self.historico = historico_busca
+        self.eventos_gravados = 0
+        self.passos_gravados = 0
+
+    def acompanhar_busca(self):
+        # Grava os eventos e passos que a busca em andamento produziu desde
+        # a última chamada
+        historico = self.historico
+        if historico is None:
+            return
+        eventos = len(historico.tipos)
+        if eventos > self.eventos_gravados:
+            inicio = self.eventos_gravados
+            dados = bytearray()
+            escrever_varint(dados, eventos - inicio)
+            dados += comprimir_arrays(historico.tipos[inicio:eventos], historico.nos[inicio:eventos])
+            self.registrar(REGISTRO_EVENTOS, dados)
+            self.eventos_gravados = eventos
+        passos = len(historico.fim_passo)
+        if passos > self.passos_gravados:
+            inicio = self.passos_gravados
+            dados = bytearray()
+            escrever_varint(dados, passos - inicio)
+            dados += comprimir_arrays(historico.fim_passo[inicio:passos], historico.passo_no[inicio:passos],
+                                      historico.passo_pai[inicio:passos])
+            self.registrar(REGISTRO_PASSOS, dados)
+            self.passos_gravados = passos
+
+    def fim_busca(self, caminho):
+        self.acompanhar_busca()
+        self.historico = None
+        dados = bytearray()
+        escrever_varint(dados, len(caminho) if caminho else 0)
+        if caminho:
+            dados += comprimir_arrays(array('q', caminho))
+        self.registrar(REGISTRO_FIM_BUSCA, dados)
+
+    def fechar(self):
+        # O índice e o rodapé só existem em gravações encerradas normalmente
+        self.acompanhar_busca()
+        offset_indice = self.escritos + len(self.buffer)
+        dados = bytearray()
+        escrever_varint(dados, len(self.indice_tempos))
+        dados += comprimir_arrays(self.indice_tempos, self.indice_offsets, self.indice_partidas)
+        self.anexar(REGISTRO_INDICE, int((self.relogio() - self.inicio) * 1000), dados)
+        self.buffer += RODAPE_GRAVACAO.pack(offset_indice, ASSINATURA_INDICE)
+        self.descarregar()
+        self.arquivo.close()
+
+# --- Leitura ---
+
+class Registro:
+    __slots__ = ('tipo', 'tempo_ms', 'posicao', 'dados')
+
+    def __init__(self, tipo, tempo_ms, posicao, dados):
+        self.tipo = tipo
+        self.tempo_ms = tempo_ms    # desde o início da gravação
+        self.posicao = posicao      # (offset no arquivo, tempo antes do registro)
+        self.dados = dados          # tupla de decodificar_registro, ou None se pulado
+
+class LeitorGravacao:
+    def __init__(self, caminho_arquivo):
+        self.caminho_arquivo = caminho_arquivo
+        with open(caminho_arquivo, 'rb') as arquivo:
+            cabecalho = arquivo.read(CABECALHO_GRAVACAO.size)
+            if len(cabecalho) < CABECALHO_GRAVACAO.size:
+                raise ValueError(f"{caminho_arquivo}: arquivo de gravação incompleto")
+            assinatura, versao = CABECALHO_GRAVACAO.unpack(cabecalho)
+            if assinatura != ASSINATURA_GRAVACAO:
+                raise ValueError(f"{caminho_arquivo}: não é uma gravação do jogo")
+            if versao not in (1, VERSAO_GRAVACAO):
+                raise ValueError(f"{caminho_arquivo}: versão de gravação {versao} não suportada")
+            self.versao = versao
+            # Os registros terminam no registro de índice, se houver rodapé
+            self.fim_registros = os.fstat(arquivo.fileno()).st_size
+            # (tempos, offsets, partidas) do índice; veja entradas_indice
+            self.entradas = None
+            if versao >= 2:
+                self.ler_indice(arquivo)
+
+    def ler_indice(self, arquivo):
+        # Índice gravado no fim do arquivo, se o rodapé estiver inteiro
+        inicio_rodape = self.fim_registros - RODAPE_GRAVACAO.size
+        if inicio_rodape < CABECALHO_GRAVACAO.size:
+            return
+        arquivo.seek(inicio_rodape)
+        offset_indice, assinatura = RODAPE_GRAVACAO.unpack(arquivo.read(RODAPE_GRAVACAO.size))
+        if assinatura != ASSINATURA_INDICE or not CABECALHO_GRAVACAO.size <= offset_indice < inicio_rodape:
+            return
+        arquivo.seek(offset_indice)
+        bruto = arquivo.read(inicio_rodape - offset_indice)
+        try:
+            tipo, _, tamanho, posicao = ler_cabecalho_registro(bruto)
+            if tipo != REGISTRO_INDICE or posicao + tamanho != len(bruto):
+                return
+            self.entradas = decodificar_registro(tipo, bruto[posicao:])
+        except (IndexError, zlib.error):
+            # Índice danificado: vale a varredura de entradas_indice
+            return
+        self.fim_registros = offset_indice
+
+    def registros(self, tipos=None, posicao=None):
+        # Gera os registros em ordem, lendo o arquivo aos poucos. Só os dados
+        # dos tipos pedidos (todos, se tipos for None) são lidos e
+        # decodificados; os demais são pulados. posicao (de Registro.posicao,
+        # indice ou posicao_da_partida) recomeça a leitura naquele registro
+        offset, tempo = posicao or (CABECALHO_GRAVACAO.size, 0)
+        tempo_relativo = self.versao == 1
+        fim_registros = self.fim_registros
+        with open(self.caminho_arquivo, 'rb') as arquivo:
+            while offset < fim_registros:
+                arquivo.seek(offset)
+                cabecalho = arquivo.read(min(MAXIMO_CABECALHO_REGISTRO, fim_registros - offset))
+                try:
+                    tipo, tempo_registro, tamanho, lidos = ler_cabecalho_registro(cabecalho)
+                except IndexError:
+                    # Cabeçalho cortado no fim do arquivo
+                    return
+                inicio_dados = offset + lidos
+                fim = inicio_dados + tamanho
+                # Um registro cortado no fim do arquivo não conta
+                if fim > fim_registros:
+                    return
+                anterior = tempo
+                tempo = tempo + tempo_registro if tempo_relativo else tempo_registro
+                registro = Registro(tipo, tempo, (offset, anterior), None)
+                offset = fim
+                if tipo == REGISTRO_INDICE:
+                    # Último registro; depois dele só há o rodapé, talvez cortado
+                    return
+                if tipos is None or tipo in tipos:
+                    arquivo.seek(inicio_dados)
+                    registro.dados = decodificar_registro(tipo, arquivo.read(tamanho))
+                yield registro
+
+    def entradas_indice(self):
+        # (tempos, offsets, partidas) do índice: o do fim do arquivo ou,
+        # sem ele, montado uma vez percorrendo só os cabeçalhos
+        if self.entradas is None:
+            tempos = array('q')
+            posicoes = []
+            partidas = array('B')
+            proxima = 0
+            for registro in self.registros(tipos=()):
+                if registro.tipo == REGISTRO_PARTIDA or registro.tempo_ms >= proxima:
+                    tempos.append(registro.tempo_ms)
+                    posicoes.append(registro.posicao if self.versao == 1 else registro.posicao[0])
+                    partidas.append(registro.tipo == REGISTRO_PARTIDA)
+                    proxima = (registro.tempo_ms // INTERVALO_INDICE_MS + 1) * INTERVALO_INDICE_MS
+            self.entradas = (tempos, posicoes, partidas)
+        return self.entradas
+
+    def posicao_de(self, entrada):
+        # Posição para registros() da entrada do índice; na versão 1 a
+        # posição leva o tempo antes do registro, guardado pela varredura
+        posicao = self.entradas_indice()[1][entrada]
+        return posicao if self.versao == 1 else (posicao, 0)
+
+    def indice(self, intervalo_ms=INTERVALO_INDICE_MS):
+        # (tempo_ms, posicao) de um registro a cada intervalo_ms (no mínimo
+        # INTERVALO_INDICE_MS); a posição serve para registros(posicao=...)
+        tempos = self.entradas_indice()[0]
+        indice = []
+        for entrada, tempo in enumerate(tempos):
+            if not indice or tempo - indice[-1][0] >= intervalo_ms:
+                indice.append((tempo, self.posicao_de(entrada)))
+        return indice
+
+    def posicao_da_partida(self, tempo_ms):
+        # Posição do último REGISTRO_PARTIDA antes de tempo_ms, ou None se
+        # não houver: o estado do jogo naquele instante só depende dos
+        # registros a partir dela
+        tempos, _, partidas = self.entradas_indice()
+        entrada = bisect_left(tempos, tempo_ms) - 1
+        while entrada >= 0 and not partidas[entrada]:
+            entrada -= 1
+        return self.posicao_de(entrada) if entrada >= 0 else None
+
+def ler_cabecalho_registro(dados):
+    # (tipo, tempo, tamanho, bytes lidos) do registro no início de dados;
+    # IndexError se o cabeçalho estiver incompleto
+    tipo = dados[0]
+    tempo, posicao = ler_varint(dados, 1)
+    tamanho, posicao = ler_varint(dados, posicao)
+    return tipo, tempo, tamanho, posicao
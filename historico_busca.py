@@ -0,0 +1,244 @@
+# Histórico compacto das buscas BFS/DFS
+#
+# Em vez de guardar cópias completas dos conjuntos (visitados, fronteira,
+# armadilhas evitadas) a cada passo, o histórico é um log de eventos
+# ("visita n", "empilha n", "desempilha n", "evita armadilha n") com
+# checkpoints completos de tempos em tempos. Qualquer passo pode ser
+# reconstruído partindo do checkpoint anterior e reaplicando os eventos
+# seguintes; como só são gravados eventos que mudam o estado, cada um também
+# pode ser desfeito, então recuar poucos passos não precisa de checkpoint.
+#
+# O intervalo entre checkpoints cresce com o estado: um novo checkpoint só é
+# feito depois de pelo menos INTERVALO_CHECKPOINT eventos e de tantos eventos
+# quanto elementos no estado atual. Assim a memória dos checkpoints fica
+# proporcional ao número de eventos (e não ao quadrado dele, como com um
+# intervalo fixo em buscas de milhões de nós).
+#
+# Os ids dos nós precisam ser inteiros não negativos (-1 indica "sem pai").
+
+import sys
+from array import array
+from bisect import bisect_right
+
+# Tipos de evento
+EVENTO_VISITAR = 0
+EVENTO_EMPILHAR = 1
+EVENTO_DESEMPILHAR = 2
+EVENTO_EVITAR_ARMADILHA = 3
+
+INTERVALO_CHECKPOINT = 1024
+
+class HistoricoBusca:
+    def __init__(self, intervalo_checkpoint=INTERVALO_CHECKPOINT):
+        self.intervalo_checkpoint = intervalo_checkpoint
+
+        # Log de eventos
+        self.tipos = array('B')
+        self.nos = array('q')
+
+        # Cada passo da animação: quantos eventos já tinham ocorrido e qual
+        # nó (e pai) forma o caminho sendo explorado naquele momento
+        self.fim_passo = array('q')
+        self.passo_no = array('q')
+        self.passo_pai = array('q')
+
+        # checkpoints[c] é o estado após eventos_checkpoint[c] eventos
+        self.eventos_checkpoint = array('q', [0])
+        self.checkpoints = [(frozenset(), frozenset(), frozenset())]
+        self.predecessores = {}
+        self.caminho_final = None
+
+        # Estado corrente durante a gravação, usado para descartar eventos
+        # que não alteram nada e para montar os checkpoints
+        self._visitados = set()
+        self._fronteira = set()
+        self._armadilhas_evitadas = set()
+
+    # --- Gravação ---
+
+    def registrar_evento(self, tipo, no_id):
+        if not aplicar_evento(tipo, no_id, self._visitados, self._fronteira, self._armadilhas_evitadas):
+            return
+
+        self.tipos.append(tipo)
+        self.nos.append(no_id)
+
+        desde_checkpoint = len(self.tipos) - self.eventos_checkpoint[-1]
+        if desde_checkpoint >= self.intervalo_checkpoint and desde_checkpoint >= self.tamanho_estado():
+            self.eventos_checkpoint.append(len(self.tipos))
+            self.checkpoints.append((frozenset(self._visitados),
+                                     frozenset(self._fronteira),
+                                     frozenset(self._armadilhas_evitadas)))
+
+    def tamanho_estado(self):
+        return len(self._visitados) + len(self._fronteira) + len(self._armadilhas_evitadas)
+
+    def visitar(self, no_id):
+        self.registrar_evento(EVENTO_VISITAR, no_id)
+
+    def empilhar(self, no_id):
+        self.registrar_evento(EVENTO_EMPILHAR, no_id)
+
+    def desempilhar(self, no_id):
+        self.registrar_evento(EVENTO_DESEMPILHAR, no_id)
+
+    def evitar_armadilha(self, no_id):
+        self.registrar_evento(EVENTO_EVITAR_ARMADILHA, no_id)
+
+    def registrar_passo(self, no_id, pai_id):
+        self.fim_passo.append(len(self.tipos))
+        self.passo_no.append(no_id)
+        self.passo_pai.append(-1 if pai_id is None else pai_id)
+
+    def acompanhar(self, predecessores):
+        # Predecessores ainda em construção pela busca: como os de nós já
+        # visitados não mudam mais, os passos gravados podem ser reproduzidos
+        # antes de a busca terminar (buscas passo a passo, como passos_bfs)
+        self.predecessores = predecessores
+
+    def finalizar(self, predecessores, caminho_final=None):
+        # Os predecessores dos nós visitados não mudam depois de fixados,
+        # então o mapa final basta para reconstruir o caminho de qualquer passo.
+        # caminho_final, se dado, é o caminho mostrado no último passo (para
+        # buscas em que ele não sai de uma única cadeia de predecessores)
+        self.predecessores = predecessores
+        self.caminho_final = caminho_final
+        self._visitados = set()
+        self._fronteira = set()
+        self._armadilhas_evitadas = set()
+
+    # --- Reprodução ---
+
+    def __len__(self):
+        return len(self.fim_passo)
+
+    def __getitem__(self, indice):
+        # Compatível com o formato antigo (lista de dicionários)
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de histórico fora do intervalo")
+        return self.estado_em(indice)
+
+    def caminho_do_passo(self, indice):
+        if self.caminho_final is not None and indice == len(self) - 1:
+            return list(self.caminho_final)
+        caminho = []
+        no_id = self.passo_pai[indice]
+        while no_id != -1 and no_id is not None:
+            caminho.append(no_id)
+            no_id = self.predecessores.get(no_id)
+        caminho.reverse()
+        caminho.append(self.passo_no[indice])
+        return caminho
+
+    def estado_em(self, indice):
+        cursor = self.cursor()
+        caminho = cursor.ir_para(indice)
+        return {
+            'visitados': cursor.visitados,
+            'fronteira': cursor.fronteira,
+            'caminho_atual': caminho,
+            'armadilhas_evitadas': cursor.armadilhas_evitadas
+        }
+
+    def cursor(self):
+        return CursorHistorico(self)
+
+    def memoria_bytes(self):
+        # Buffers do log e dos passos mais os conjuntos dos checkpoints (sem
+        # contar os inteiros, que são compartilhados com o grafo)
+        arrays = (self.tipos, self.nos, self.fim_passo, self.passo_no, self.passo_pai, self.eventos_checkpoint)
+        return (sum(a.itemsize * len(a) for a in arrays)
+                + sum(sys.getsizeof(conjunto) for checkpoint in self.checkpoints for conjunto in checkpoint))
+
+class CursorHistorico:
+    # Mantém um estado reconstruído que pode avançar ou recuar pelo histórico.
+    # Os conjuntos são alterados no lugar, então quem guardar referências a
+    # eles (como o Jogo) sempre vê o passo atual.
+    def __init__(self, historico):
+        self.historico = historico
+        self.visitados = set()
+        self.fronteira = set()
+        self.armadilhas_evitadas = set()
+        self.evento_atual = 0
+        self.indice = -1
+
+    def _restaurar_checkpoint(self, numero):
+        visitados, fronteira, armadilhas_evitadas = self.historico.checkpoints[numero]
+        self.visitados.clear()
+        self.visitados.update(visitados)
+        self.fronteira.clear()
+        self.fronteira.update(fronteira)
+        self.armadilhas_evitadas.clear()
+        self.armadilhas_evitadas.update(armadilhas_evitadas)
+        self.evento_atual = self.historico.eventos_checkpoint[numero]
+
+    def _ir_para_evento(self, alvo):
+        historico = self.historico
+        tipos = historico.tipos
+        nos = historico.nos
+
+        # Checkpoint mais próximo antes do alvo
+        numero = bisect_right(historico.eventos_checkpoint, alvo) - 1
+        evento_checkpoint = historico.eventos_checkpoint[numero]
+
+        if alvo < self.evento_atual:
+            # Recuar: desfaz os eventos, a não ser que partir do checkpoint
+            # custe menos
+            if self.evento_atual - alvo <= alvo - evento_checkpoint:
+                for i in range(self.evento_atual - 1, alvo - 1, -1):
+                    desfazer_evento(tipos[i], nos[i], self.visitados, self.fronteira, self.armadilhas_evitadas)
+                self.evento_atual = alvo
+                return
+            self._restaurar_checkpoint(numero)
+        elif evento_checkpoint > self.evento_atual:
+            # Avançar além de um checkpoint: pula direto para ele
+            self._restaurar_checkpoint(numero)
+
+        for i in range(self.evento_atual, alvo):
+            aplicar_evento(tipos[i], nos[i], self.visitados, self.fronteira, self.armadilhas_evitadas)
+        self.evento_atual = alvo
+
+    def ir_para(self, indice):
+        # Reconstrói o estado do passo indicado e devolve o caminho sendo explorado
+        self._ir_para_evento(self.historico.fim_passo[indice])
+        self.indice = indice
+        return self.historico.caminho_do_passo(indice)
+
+    def avancar(self):
+        return self.ir_para(min(self.indice + 1, len(self.historico) - 1))
+
+    def recuar(self):
+        return self.ir_para(max(self.indice - 1, 0))
+
+def aplicar_evento(tipo, no_id, visitados, fronteira, armadilhas_evitadas):
+    # Aplica um evento aos conjuntos e indica se algo mudou
+    if tipo == EVENTO_VISITAR:
+        alvo = visitados
+    elif tipo == EVENTO_EMPILHAR:
+        alvo = fronteira
+    elif tipo == EVENTO_EVITAR_ARMADILHA:
+        alvo = armadilhas_evitadas
+    else:
+        if no_id in fronteira:
+            fronteira.discard(no_id)
+            return True
+        return False
+
+    if no_id in alvo:
+        return False
+    alvo.add(no_id)
+    return True
+
+def desfazer_evento(tipo, no_id, visitados, fronteira, armadilhas_evitadas):
+    # Inverso de aplicar_evento; vale porque o log só guarda eventos que
+    # mudaram o estado
+    if tipo == EVENTO_VISITAR:
+        visitados.discard(no_id)
+    elif tipo == EVENTO_EMPILHAR:
+        fronteira.discard(no_id)
+    elif tipo == EVENTO_EVITAR_ARMADILHA:
+        armadilhas_evitadas.discard(no_id)
+    else:
+        fronteira.add(no_id)
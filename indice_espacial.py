@@ -0,0 +1,59 @@
+# Índice espacial em grade uniforme para localizar nós pela posição.
+#
+# O plano é dividido em células quadradas de tamanho_celula pixels; cada
+# célula guarda os nós cujo centro cai nela. Uma consulta só examina as
+# células que cruzam a área pedida, em vez de percorrer todos os nós.
+
+TAMANHO_CELULA = 100
+
+class GradeEspacial:
+    def __init__(self, tamanho_celula=TAMANHO_CELULA):
+        self.tamanho_celula = tamanho_celula
+        self.celulas = {}
+        # Maior raio inserido, para que consultas por ponto alcancem nós
+        # cujo centro está em células vizinhas
+        self.raio_maximo = 0
+
+    def celula(self, x, y):
+        return (int(x // self.tamanho_celula), int(y // self.tamanho_celula))
+
+    def inserir(self, no_id, x, y, raio=0):
+        self.celulas.setdefault(self.celula(x, y), []).append((no_id, x, y))
+        if raio > self.raio_maximo:
+            self.raio_maximo = raio
+
+    def remover(self, no_id, x, y):
+        chave = self.celula(x, y)
+        entradas = self.celulas.get(chave, [])
+        self.celulas[chave] = [entrada for entrada in entradas if entrada[0] != no_id]
+        if not self.celulas[chave]:
+            del self.celulas[chave]
+
+    def consultar_retangulo(self, x_min, y_min, x_max, y_max):
+        # Ids dos nós cujo centro está dentro do retângulo (bordas inclusas)
+        cx_min, cy_min = self.celula(x_min, y_min)
+        cx_max, cy_max = self.celula(x_max, y_max)
+
+        # Em retângulos maiores que o mapa é mais barato varrer as células existentes
+        if (cx_max - cx_min + 1) * (cy_max - cy_min + 1) > len(self.celulas):
+            chaves = [chave for chave in self.celulas
+                      if cx_min <= chave[0] <= cx_max and cy_min <= chave[1] <= cy_max]
+        else:
+            chaves = [(cx, cy) for cx in range(cx_min, cx_max + 1) for cy in range(cy_min, cy_max + 1)]
+
+        for chave in chaves:
+            for no_id, x, y in self.celulas.get(chave, ()):
+                if x_min <= x <= x_max and y_min <= y <= y_max:
+                    yield no_id
+
+    def proximos(self, x, y, raio):
+        # Ids dos nós a no máximo raio pixels de (x, y), do mais próximo ao mais distante
+        encontrados = []
+        for chave_x in range(int((x - raio) // self.tamanho_celula), int((x + raio) // self.tamanho_celula) + 1):
+            for chave_y in range(int((y - raio) // self.tamanho_celula), int((y + raio) // self.tamanho_celula) + 1):
+                for no_id, nx, ny in self.celulas.get((chave_x, chave_y), ()):
+                    distancia2 = (nx - x) ** 2 + (ny - y) ** 2
+                    if distancia2 <= raio ** 2:
+                        encontrados.append((distancia2, no_id))
+        encontrados.sort(key=lambda item: item[0])
+        return [no_id for _, no_id in encontrados]
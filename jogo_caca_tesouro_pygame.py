@@ -1,456 +1,43 @@
 #!/usr/bin/env python3
 # Jogo de Caça ao Tesouro - Implementação com Grafos e interface Pygame
-# Usando BFS e DFS para encontrar caminhos
+# Usando BFS, BFS bidirecional, DFS, Dijkstra e A* para encontrar caminhos
+#
+# O modelo do grafo e as buscas ficam em grafo.py (sem pygame); este módulo
+# só inicializa o pygame e abre a janela quando main() é chamado.
 
+import argparse
 import pygame
 import sys
-import random
 import time
-from collections import deque
 
-# Inicializa pygame
-pygame.init()
+from camera import PASSO_ZOOM, Camera
+from configuracoes import (LARGURA, ALTURA, TITULO_JANELA, BRANCO, PRETO, CINZA,
+                           CINZA_ESCURO, AZUL, VERDE, VERMELHO, AMARELO, LARANJA,
+                           ROXO, AZUL_ESCURO)
+from desempenho import FASES_QUADRO, MedidorDesempenho
+from gravacao import GravadorSessao
+# NoGrafo, Grafo e reconstruir_caminho continuam disponíveis por aqui por compatibilidade
+from grafo import NoGrafo, Grafo, criar_mapa, indexar_caminho, reconstruir_caminho  # noqa: F401
+from historico_busca import HistoricoBusca
+from mapas import carregar_modelo
+from renderizacao import CACHE_TEXTO, obter_fontes, renderizar_texto
 
-# Configurações da tela
-LARGURA, ALTURA = 1400, 900
-tela = pygame.display.set_mode((LARGURA, ALTURA))
-pygame.display.set_caption("Caça ao Tesouro - Versão Tabuleiro")
+# Estados em que uma busca está sendo animada
+ESTADOS_ANIMACAO = ("ANIMANDO_BFS", "ANIMANDO_DFS", "ANIMANDO_BIDIRECIONAL",
+                    "ANIMANDO_DIJKSTRA", "ANIMANDO_A_ESTRELA")
 
-# Cores
-BRANCO = (255, 255, 255)
-PRETO = (0, 0, 0)
-CINZA = (200, 200, 200)
-CINZA_ESCURO = (100, 100, 100)
-AZUL = (0, 120, 255)
-VERDE = (0, 255, 0)
-VERMELHO = (255, 0, 0)
-AMARELO = (255, 255, 0)
-LARANJA = (255, 165, 0)
-ROXO = (128, 0, 128)
-MARROM = (139, 69, 19)
-MARROM_CLARO = (210, 180, 140)
-AZUL_ESCURO = (25, 25, 112)
+# Tempo máximo (ms) que a busca em andamento pode ocupar em cada quadro; no
+# avanço rápido o orçamento é maior, mas a janela continua respondendo
+ORCAMENTO_BUSCA_MS = 8
+ORCAMENTO_AVANCO_RAPIDO_MS = 50
 
-# Configurações de fonte
-pygame.font.init()
-fonte_pequena = pygame.font.SysFont('Arial', 14)
-fonte_media = pygame.font.SysFont('Arial', 18)
-fonte_grande = pygame.font.SysFont('Arial', 26)
-fonte_titulo = pygame.font.SysFont('Arial', 36, bold=True)
+# Intervalo (ms) entre atualizações dos números do painel de desempenho (F3)
+INTERVALO_HUD_MS = 250
 
-# Carrega imagens do jogo
-def carregar_imagens():
-    imagens = {}
-    try:
-        # Imagem de fundo
-        imagens['fundo'] = pygame.Surface((LARGURA, ALTURA))
-        imagens['fundo'].fill(MARROM_CLARO)  # Cor base para o fundo
-        
-        # Imagens para os locais - Círculos mais sofisticados por enquanto
-        imagens['local_normal'] = pygame.Surface((60, 60), pygame.SRCALPHA)
-        pygame.draw.circle(imagens['local_normal'], CINZA, (30, 30), 25)
-        pygame.draw.circle(imagens['local_normal'], PRETO, (30, 30), 25, 2)
-        
-        imagens['local_atual'] = pygame.Surface((70, 70), pygame.SRCALPHA)
-        pygame.draw.circle(imagens['local_atual'], AZUL, (35, 35), 30)
-        pygame.draw.circle(imagens['local_atual'], PRETO, (35, 35), 30, 2)
-        
-        imagens['local_tesouro'] = pygame.Surface((60, 60), pygame.SRCALPHA)
-        pygame.draw.circle(imagens['local_tesouro'], VERDE, (30, 30), 25)
-        pygame.draw.circle(imagens['local_tesouro'], PRETO, (30, 30), 25, 2)
-        
-        imagens['local_armadilha'] = pygame.Surface((60, 60), pygame.SRCALPHA)
-        pygame.draw.circle(imagens['local_armadilha'], VERMELHO, (30, 30), 25)
-        pygame.draw.circle(imagens['local_armadilha'], PRETO, (30, 30), 25, 2)
-        
-        imagens['local_visitado'] = pygame.Surface((70, 70), pygame.SRCALPHA)
-        pygame.draw.circle(imagens['local_visitado'], (147, 112, 219), (35, 35), 30)
-        pygame.draw.circle(imagens['local_visitado'], PRETO, (35, 35), 30, 2)
-        
-        imagens['local_fronteira'] = pygame.Surface((70, 70), pygame.SRCALPHA)
-        pygame.draw.circle(imagens['local_fronteira'], (173, 216, 230), (35, 35), 30)
-        pygame.draw.circle(imagens['local_fronteira'], PRETO, (35, 35), 30, 2)
-        
-        imagens['local_caminho'] = pygame.Surface((70, 70), pygame.SRCALPHA)
-        pygame.draw.circle(imagens['local_caminho'], AMARELO, (35, 35), 30)
-        pygame.draw.circle(imagens['local_caminho'], PRETO, (35, 35), 30, 2)
-        
-        imagens['local_explorando'] = pygame.Surface((70, 70), pygame.SRCALPHA)
-        pygame.draw.circle(imagens['local_explorando'], (255, 140, 0), (35, 35), 30)
-        pygame.draw.circle(imagens['local_explorando'], PRETO, (35, 35), 30, 2)
-        
-        # Desenha textura no fundo
-        for i in range(0, LARGURA, 40):
-            for j in range(0, ALTURA, 40):
-                if (i // 40 + j // 40) % 2 == 0:
-                    pygame.draw.rect(imagens['fundo'], (190, 160, 120), (i, j, 40, 40))
-        
-        # Adiciona bordas ao tabuleiro
-        pygame.draw.rect(imagens['fundo'], MARROM, (0, 0, LARGURA, ALTURA), 20)
-        
-        return imagens
-    except Exception as e:
-        print(f"Erro ao carregar imagens: {e}")
-        return {}
-
-# Imagens do jogo
-IMAGENS = carregar_imagens()
-
-class NoGrafo:
-    def __init__(self, id, nome, pos_x, pos_y):
-        self.id = id
-        self.nome = nome
-        self.pos_x = pos_x
-        self.pos_y = pos_y
-        self.eh_tesouro = False
-        self.eh_armadilha = False
-        self.cor = CINZA
-        self.raio = 25
-        self.descricao = "Um lugar comum no mapa."
-    
-    def definir_tesouro(self):
-        self.eh_tesouro = True
-        self.cor = VERDE
-        self.descricao = "Este lugar contém o tesouro!"
-    
-    def definir_armadilha(self):
-        self.eh_armadilha = True
-        self.cor = VERMELHO
-        self.descricao = "Cuidado! Este lugar contém uma armadilha!"
-    
-    def desenhar(self, tela, atual=False, caminho=False):
-        # Escolhe a imagem correta baseado no estado
-        if atual:
-            img = IMAGENS['local_atual']
-            pos_x = self.pos_x - 35
-            pos_y = self.pos_y - 35
-        elif self.eh_tesouro:
-            img = IMAGENS['local_tesouro']
-            pos_x = self.pos_x - 30
-            pos_y = self.pos_y - 30
-        elif self.eh_armadilha:
-            img = IMAGENS['local_armadilha']
-            pos_x = self.pos_x - 30
-            pos_y = self.pos_y - 30
-        elif caminho:
-            img = IMAGENS['local_caminho']
-            pos_x = self.pos_x - 35
-            pos_y = self.pos_y - 35
-        else:
-            img = IMAGENS['local_normal']
-            pos_x = self.pos_x - 30
-            pos_y = self.pos_y - 30
-        
-        # Desenha a imagem
-        tela.blit(img, (pos_x, pos_y))
-        
-        # Desenha o número do local
-        texto = fonte_media.render(str(self.id), True, PRETO)
-        tela.blit(texto, (self.pos_x - texto.get_width()//2, self.pos_y - texto.get_height()//2))
-    
-    def contem_ponto(self, pos):
-        return ((pos[0] - self.pos_x) ** 2 + (pos[1] - self.pos_y) ** 2) <= self.raio ** 2
-    
-    def __str__(self):
-        return self.nome
-
-class Grafo:
-    def __init__(self):
-        self.nos = {}
-        self.arestas = {}
-    
-    def adicionar_no(self, no):
-        self.nos[no.id] = no
-        self.arestas[no.id] = []
-    
-    def adicionar_aresta(self, no1_id, no2_id):
-        if no1_id in self.arestas and no2_id in self.nos:
-            if no2_id not in self.arestas[no1_id]:
-                self.arestas[no1_id].append(no2_id)
-                # Grafo não direcionado
-                if no2_id in self.arestas and no1_id not in self.arestas[no2_id]:
-                    self.arestas[no2_id].append(no1_id)
-    
-    def desenhar(self, tela, no_atual=None, caminho=None, visitados=None, fronteira=None, caminho_atual=None, armadilhas_evitadas=None):
-        # Desenha o fundo do tabuleiro
-        tela.blit(IMAGENS['fundo'], (0, 0))
-        
-        # Desenha as arestas primeiro (caminhos do tabuleiro)
-        for no_id, vizinhos in self.arestas.items():
-            no = self.nos[no_id]
-            for vizinho_id in vizinhos:
-                if vizinho_id > no_id:  # Evita desenhar a mesma aresta duas vezes
-                    vizinho = self.nos[vizinho_id]
-                    
-                    # Definir cor da aresta com base em diferentes condições
-                    cor_aresta = MARROM
-                    espessura = 6
-                    
-                    # Aresta em caminho sendo explorado atualmente
-                    if caminho_atual and no_id in caminho_atual and vizinho_id in caminho_atual and abs(caminho_atual.index(no_id) - caminho_atual.index(vizinho_id)) == 1:
-                        cor_aresta = (255, 140, 0)  # Laranja para caminho atual
-                        espessura = 10
-                    # Aresta no caminho final
-                    elif caminho and no_id in caminho and vizinho_id in caminho and abs(caminho.index(no_id) - caminho.index(vizinho_id)) == 1:
-                        cor_aresta = AMARELO
-                        espessura = 8
-                    
-                    # Desenha caminho mais elaborado - linha pontilhada com marcas
-                    if espessura > 6:  # Se for um caminho destacado
-                        # Linha principal
-                        pygame.draw.line(tela, cor_aresta, (no.pos_x, no.pos_y), 
-                                        (vizinho.pos_x, vizinho.pos_y), espessura)
-                    else:
-                        # Linha pontilhada para caminhos normais
-                        dx = vizinho.pos_x - no.pos_x
-                        dy = vizinho.pos_y - no.pos_y
-                        dist = (dx**2 + dy**2)**0.5
-                        
-                        if dist > 0:
-                            dx, dy = dx / dist, dy / dist
-                            
-                            # Número de pontos na linha pontilhada
-                            num_pontos = int(dist / 20)
-                            
-                            for i in range(num_pontos):
-                                p = i / (num_pontos - 1)
-                                x = no.pos_x + dx * dist * p
-                                y = no.pos_y + dy * dist * p
-                                pygame.draw.circle(tela, cor_aresta, (int(x), int(y)), 3)
-        
-        # Desenha os nós por cima
-        for no_id, no in self.nos.items():
-            # Define estados diferentes para visualização
-            eh_atual = no_atual == no_id
-            eh_caminho = caminho and no_id in caminho
-            eh_visitado = visitados and no_id in visitados
-            eh_fronteira = fronteira and no_id in fronteira
-            eh_caminho_atual = caminho_atual and no_id in caminho_atual
-            eh_armadilha_evitada = armadilhas_evitadas and no_id in armadilhas_evitadas
-            
-            # Desenha círculos extras para visualização dos estados
-            if eh_fronteira and not eh_visitado:
-                tela.blit(IMAGENS['local_fronteira'], (no.pos_x - 35, no.pos_y - 35))
-            
-            if eh_visitado:
-                tela.blit(IMAGENS['local_visitado'], (no.pos_x - 35, no.pos_y - 35))
-            
-            if eh_caminho_atual:
-                tela.blit(IMAGENS['local_explorando'], (no.pos_x - 35, no.pos_y - 35))
-            
-            # Desenha um X para armadilhas evitadas
-            if eh_armadilha_evitada:
-                pygame.draw.circle(tela, (255, 192, 203), (no.pos_x, no.pos_y), no.raio + 12)  # Rosa claro para armadilhas evitadas
-                espessura = 3
-                pygame.draw.line(tela, (139, 0, 0), 
-                                (no.pos_x - no.raio - 5, no.pos_y - no.raio - 5),
-                                (no.pos_x + no.raio + 5, no.pos_y + no.raio + 5), 
-                                espessura)
-                pygame.draw.line(tela, (139, 0, 0), 
-                                (no.pos_x - no.raio - 5, no.pos_y + no.raio + 5),
-                                (no.pos_x + no.raio + 5, no.pos_y - no.raio - 5), 
-                                espessura)
-            
-            # Desenha o nó normalmente
-            no.desenhar(tela, eh_atual, eh_caminho)
-    
-    def busca_bfs(self, inicio_id, destino_id):
-        if inicio_id not in self.nos or destino_id not in self.nos:
-            return None, [], [], [], []
-        
-        # Para visualização, retornamos histórico da busca
-        historico_busca = []
-        
-        visitados = set()
-        fronteira = set([inicio_id])
-        fila = deque([(inicio_id, [inicio_id])])
-        armadilhas_evitadas = set()
-        
-        # Registra o estado inicial para visualização
-        historico_busca.append({
-            'visitados': set(),
-            'fronteira': set([inicio_id]),
-            'caminho_atual': [inicio_id],
-            'armadilhas_evitadas': set()
-        })
-        
-        while fila:
-            atual, caminho = fila.popleft()
-            fronteira.discard(atual)  # Remove da fronteira mesmo se não existir
-            
-            if atual == destino_id:
-                # Inclui o estado final no histórico
-                historico_busca.append({
-                    'visitados': visitados.copy(),
-                    'fronteira': fronteira.copy(),
-                    'caminho_atual': caminho,
-                    'armadilhas_evitadas': armadilhas_evitadas.copy()
-                })
-                return caminho, historico_busca, visitados, fronteira, armadilhas_evitadas
-            
-            if atual not in visitados:
-                visitados.add(atual)
-                
-                for vizinho in self.arestas[atual]:
-                    # Registra armadilhas evitadas para visualização
-                    if self.nos[vizinho].eh_armadilha:
-                        armadilhas_evitadas.add(vizinho)
-                        continue
-                        
-                    # Verifica se o vizinho é uma armadilha antes de adicioná-lo à fronteira
-                    if vizinho not in visitados and vizinho not in fronteira:
-                        novo_caminho = caminho.copy()
-                        novo_caminho.append(vizinho)
-                        fronteira.add(vizinho)
-                        fila.append((vizinho, novo_caminho))
-                        
-                        # Registra o estado para visualização
-                        historico_busca.append({
-                            'visitados': visitados.copy(),
-                            'fronteira': fronteira.copy(),
-                            'caminho_atual': novo_caminho,
-                            'armadilhas_evitadas': armadilhas_evitadas.copy()
-                        })
-        
-        return None, historico_busca, visitados, fronteira, armadilhas_evitadas
-    
-    def busca_dfs(self, inicio_id, destino_id):
-        if inicio_id not in self.nos or destino_id not in self.nos:
-            return None, [], [], [], []
-        
-        # Para visualização, retornamos histórico da busca
-        historico_busca = []
-        
-        visitados = set()
-        fronteira = set([inicio_id])
-        pilha = [(inicio_id, [inicio_id])]
-        armadilhas_evitadas = set()
-        
-        # Registra o estado inicial para visualização
-        historico_busca.append({
-            'visitados': set(),
-            'fronteira': set([inicio_id]),
-            'caminho_atual': [inicio_id],
-            'armadilhas_evitadas': set()
-        })
-        
-        while pilha:
-            atual, caminho = pilha.pop()
-            fronteira.discard(atual)  # Remove da fronteira
-            
-            if atual == destino_id:
-                # Inclui o estado final no histórico
-                historico_busca.append({
-                    'visitados': visitados.copy(),
-                    'fronteira': fronteira.copy(),
-                    'caminho_atual': caminho,
-                    'armadilhas_evitadas': armadilhas_evitadas.copy()
-                })
-                return caminho, historico_busca, visitados, fronteira, armadilhas_evitadas
-            
-            if atual not in visitados:
-                visitados.add(atual)
-                
-                # Em DFS, processa os vizinhos em ordem inversa para manter comportamento visual tradicional
-                vizinhos = list(self.arestas[atual])
-                vizinhos.reverse()
-                
-                for vizinho in vizinhos:
-                    # Registra armadilhas evitadas para visualização
-                    if self.nos[vizinho].eh_armadilha:
-                        armadilhas_evitadas.add(vizinho)
-                        continue
-                    
-                    # Verifica se o vizinho é válido para exploração
-                    if vizinho not in visitados:
-                        novo_caminho = caminho.copy()
-                        novo_caminho.append(vizinho)
-                        fronteira.add(vizinho)
-                        pilha.append((vizinho, novo_caminho))
-                        
-                        # Registra o estado para visualização
-                        historico_busca.append({
-                            'visitados': visitados.copy(),
-                            'fronteira': fronteira.copy(),
-                            'caminho_atual': novo_caminho,
-                            'armadilhas_evitadas': armadilhas_evitadas.copy()
-                        })
-        
-        return None, historico_busca, visitados, fronteira, armadilhas_evitadas
-
-def criar_mapa():
-    grafo = Grafo()
-    
-    # Posições dos nós ajustadas para o tabuleiro maior
-    posicoes = {
-        1: (200, 130),    # Entrada da Caverna
-        2: (400, 190),    # Salão Principal
-        3: (200, 300),    # Corredor Escuro
-        4: (600, 130),    # Câmara Misteriosa
-        5: (400, 350),    # Ponto de Bifurcação
-        6: (200, 500),    # Passagem Estreita
-        7: (900, 130),    # Sala dos Cristais
-        8: (600, 350),    # Túnel Úmido
-        9: (400, 500),    # Abismo Profundo
-        10: (200, 730),   # Sala do Tesouro
-        11: (800, 250),   # Câmara Secreta
-        12: (900, 350),   # Gruta Profunda
-        13: (600, 550),   # Salão dos Espelhos
-        14: (400, 650),   # Rio Subterrâneo
-        15: (750, 650),   # Altar Antigo
-    }
-    
-    # Criando os nós
-    locais = [
-        (1, "Entrada da Caverna"),
-        (2, "Salão Principal"),
-        (3, "Corredor Escuro"),
-        (4, "Câmara Misteriosa"),
-        (5, "Ponto de Bifurcação"),
-        (6, "Passagem Estreita"),
-        (7, "Sala dos Cristais"),
-        (8, "Túnel Úmido"),
-        (9, "Abismo Profundo"),
-        (10, "Sala do Tesouro"),
-        (11, "Câmara Secreta"),
-        (12, "Gruta Profunda"),
-        (13, "Salão dos Espelhos"),
-        (14, "Rio Subterrâneo"),
-        (15, "Altar Antigo")
-    ]
-    
-    for id, nome in locais:
-        pos_x, pos_y = posicoes[id]
-        grafo.adicionar_no(NoGrafo(id, nome, pos_x, pos_y))
-    
-    # Adicionando arestas (caminhos entre locais)
-    conexoes = [
-        (1, 2), (1, 3),
-        (2, 4), (2, 5),
-        (3, 5), (3, 6),
-        (4, 7), (4, 8),
-        (5, 8), (5, 9),
-        (6, 9), (6, 10),
-        (7, 11), (7, 12),
-        (8, 12), (8, 13),
-        (9, 13), (9, 14),
-        (10, 14), (10, 15),
-        (11, 15), (12, 13),
-        (13, 14), (14, 15)
-    ]
-    
-    for no1, no2 in conexoes:
-        grafo.adicionar_aresta(no1, no2)
-    
-    # Definindo o tesouro
-    grafo.nos[15].definir_tesouro()  # Altar Antigo
-    
-    # Definindo armadilhas
-    armadilhas = [4, 10, 13]  # Câmara Misteriosa, Abismo Profundo, Gruta Profunda
-    for arm_id in armadilhas:
-        grafo.nos[arm_id].definir_armadilha()
-    
-    return grafo
+# Limite de quadros por segundo enquanto algo está acontecendo e a maior
+# espera (ms) do laço principal sem nenhum evento quando o jogo está parado
+QUADROS_POR_SEGUNDO = 60
+ESPERA_OCIOSA_MS = 1000
 
 class Botao:
     def __init__(self, x, y, largura, altura, texto, cor=CINZA, cor_hover=CINZA_ESCURO, cor_texto=PRETO):
@@ -467,7 +54,7 @@ class Botao:
             # Desenha botão desativado
             pygame.draw.rect(tela, CINZA_ESCURO, self.rect)
             pygame.draw.rect(tela, PRETO, self.rect, 2)
-            texto_superficie = fonte_media.render(self.texto, True, (150, 150, 150))
+            texto_superficie = renderizar_texto('media', self.texto, (150, 150, 150))
         else:
             # Verifica se o mouse está sobre o botão
             pos_mouse = pygame.mouse.get_pos()
@@ -480,7 +67,7 @@ class Botao:
             pygame.draw.rect(tela, PRETO, self.rect, 2)
             
             # Texto do botão
-            texto_superficie = fonte_media.render(self.texto, True, self.cor_texto)
+            texto_superficie = renderizar_texto('media', self.texto, self.cor_texto)
         
         # Centraliza o texto no botão
         texto_rect = texto_superficie.get_rect(center=self.rect.center)
@@ -490,24 +77,61 @@ class Botao:
         return self.ativo and self.rect.collidepoint(pos)
 
 class Jogo:
-    def __init__(self):
-        self.grafo = criar_mapa()
-        self.no_atual_id = 1  # Começa na Entrada da Caverna
-        self.no_tesouro_id = 15  # Altar Antigo
+    def __init__(self, arquivo_mapa=None, gravar_rastro=False):
+        # Sem arquivo, usa o mapa original (criar_mapa). Com gravar_rastro,
+        # os tempos de todos os quadros e buscas são guardados para
+        # self.desempenho.exportar
+        self.arquivo_mapa = arquivo_mapa
+        mapa = self.carregar_mapa()
+        self.grafo = mapa.grafo
+        self.no_inicio_id = mapa.inicio_id  # Entrada da Caverna no mapa original
+        self.no_atual_id = self.no_inicio_id
+        self.tesouros = list(mapa.tesouros)
+        # Destino das buscas: o tesouro mais próximo quando há vários (veja
+        # tesouro_mais_proximo); no mapa original, o Altar Antigo
+        self.no_tesouro_id = self.tesouros[0]
         self.caminho_atual = None
-        self.historico_movimentos = [1]  # Começa na entrada
-        self.estado = "JOGANDO"  # JOGANDO, VITORIA, DERROTA, ANIMANDO_BFS, ANIMANDO_DFS
+        self.historico_movimentos = [self.no_inicio_id]  # Começa na entrada
+        self.estado = "JOGANDO"  # JOGANDO, VITORIA, DERROTA ou um dos ESTADOS_ANIMACAO
         self.mensagem = "Bem-vindo à caça ao tesouro! Encontre o tesouro e evite as armadilhas."
         
         # Área de informações (painel direito)
         self.painel_info = pygame.Rect(1050, 0, 350, ALTURA)
+        self.area_tabuleiro = pygame.Rect(0, 0, 1050, ALTURA)
+        self.area_mensagem = pygame.Rect(10, 800, 1030, 90)
+        
+        # Câmera do tabuleiro; fica parada (sem deslocamento nem zoom) em
+        # mapas que cabem na tela, como o original
+        self.camera = Camera(self.area_tabuleiro)
+        self.arrastando_camera = False
+        self.ajustar_camera()
+        
+        # Assinaturas das regiões no último quadro desenhado (None = tudo)
+        self.assinaturas_desenhadas = None
+        
+        # Tempos dos quadros e métricas das buscas, mostrados no painel de
+        # desempenho (F3) sobre o tabuleiro
+        self.desempenho = MedidorDesempenho(gravar_rastro)
+        self.mostrar_desempenho = False
+        self.superficie_desempenho = None
+        self.desempenho_atualizado_em = 0
+        
+        # GravadorSessao da sessão, se ela estiver sendo gravada (veja
+        # iniciar_gravacao e reproducao.py)
+        self.gravador = None
+        
+        # IndiceCaminho do caminho final e do caminho sendo explorado
+        self.indices_caminho = {}
         
         # Botões - Ajuste para o novo tamanho de tela
         self.botoes = {
             "mover": Botao(1070, 390, 310, 50, "Mover para o Local Selecionado", CINZA),
             "bfs": Botao(1070, 450, 310, 50, "Encontrar caminho (BFS)", AZUL),
-            "dfs": Botao(1070, 510, 310, 50, "Explorar caminho (DFS)", ROXO),
-            "seguir": Botao(1070, 570, 310, 50, "Seguir Caminho Automaticamente", VERDE),
+            "bidirecional": Botao(1070, 510, 310, 50, "Caminho bidirecional (BFS)", AZUL),
+            "dfs": Botao(1070, 570, 310, 50, "Explorar caminho (DFS)", ROXO),
+            "dijkstra": Botao(1070, 630, 310, 50, "Menor distância (Dijkstra)", AMARELO),
+            "a_estrela": Botao(1070, 690, 310, 50, "Menor distância (A*)", AMARELO),
+            "seguir": Botao(1070, 750, 310, 50, "Seguir Caminho Automaticamente", VERDE),
             "reiniciar": Botao(1070, 840, 310, 50, "Reiniciar Jogo", LARANJA)
         }
         
@@ -515,10 +139,14 @@ class Jogo:
         self.botoes["seguir"].ativo = False
         
         self.no_selecionado = None
+        self.no_sob_mouse = None
         self.algoritmo_usado = None
         
         # Variáveis para animação 
-        self.historico_busca = []
+        self.passos_busca = None  # gerador da busca em andamento (grafo.passos_bfs etc.)
+        self.avanco_rapido = False
+        self.historico_busca = HistoricoBusca()
+        self.cursor_historico = None
         self.indice_historico = 0
         self.visitados = set()
         self.fronteira = set()
@@ -527,29 +155,87 @@ class Jogo:
         self.tempo_ultimo_passo = 0
         self.intervalo_animacao = 700  # milissegundos (aumentado para melhor visualização)
     
+    def iniciar_gravacao(self, caminho_arquivo):
+        # Grava a partir daqui as partidas, movimentos e buscas em caminho_arquivo
+        self.gravador = GravadorSessao(caminho_arquivo)
+        self.gravar_partida()
+    
+    def gravar_partida(self):
+        if self.gravador is not None:
+            self.gravador.partida(len(self.grafo.nos), self.no_inicio_id, self.arquivo_mapa)
+    
+    def encerrar_gravacao(self):
+        if self.gravador is not None:
+            self.gravador.fechar()
+            self.gravador = None
+    
+    def carregar_mapa(self):
+        # O grafo é o modelo compartilhado do mapa (carregar_modelo), que a
+        # partida nunca altera: posição, caminhos e o estado da busca ficam
+        # no Jogo, e reiniciar só os redefine
+        mapa = carregar_modelo(self.arquivo_mapa)
+        # Componentes sem armadilhas montadas já no carregamento, para que a
+        # primeira busca não pague por elas (veja calcular_caminho); no
+        # modelo, só na primeira partida
+        mapa.grafo.obter_componentes()
+        return mapa
+    
+    def ajustar_camera(self):
+        # Mapas que cabem acima da caixa de mensagem dispensam a câmera;
+        # nos maiores ela começa centralizada no jogador
+        x_min, y_min, x_max, y_max, _ = self.grafo.obter_geometria()
+        self.camera.redefinir()
+        if x_min < 0 or y_min < 0 or x_max > self.area_tabuleiro.right - 40 or y_max > self.area_mensagem.top - 40:
+            no = self.grafo.nos[self.no_atual_id]
+            self.camera.centralizar(no.pos_x, no.pos_y)
+    
+    def manter_no_visivel(self, no_id):
+        # Recentraliza a câmera se o nó saiu da área visível
+        if self.camera.eh_identidade():
+            return
+        no = self.grafo.nos[no_id]
+        x_min, y_min, x_max, y_max = self.camera.retangulo_visivel()
+        if not (x_min <= no.pos_x <= x_max and y_min <= no.pos_y <= y_max):
+            self.camera.centralizar(no.pos_x, no.pos_y)
+    
     def reiniciar(self):
-        self.grafo = criar_mapa()
-        self.no_atual_id = 1
+        # O modelo já está carregado: só o estado da partida volta ao início
+        mapa = self.carregar_mapa()
+        self.grafo = mapa.grafo
+        self.no_inicio_id = mapa.inicio_id
+        self.tesouros = list(mapa.tesouros)
+        self.no_tesouro_id = self.tesouros[0]
+        self.no_atual_id = self.no_inicio_id
         self.caminho_atual = None
-        self.historico_movimentos = [1]
+        self.historico_movimentos = [self.no_inicio_id]
         self.estado = "JOGANDO"
         self.mensagem = "Jogo reiniciado! Boa sorte!"
         self.no_selecionado = None
+        self.no_sob_mouse = None
         self.algoritmo_usado = None
         self.botoes["seguir"].ativo = False
         
         # Limpa variáveis de animação
-        self.historico_busca = []
+        self.passos_busca = None
+        self.avanco_rapido = False
+        self.historico_busca = HistoricoBusca()
+        self.cursor_historico = None
         self.indice_historico = 0
         self.visitados = set()
         self.fronteira = set()
         self.caminho_atual_bfs = None
         self.armadilhas_evitadas = set()
+        self.ajustar_camera()
+        self.invalidar_desenho()
+        self.gravar_partida()
     
     def mover_para(self, no_id):
         if no_id in self.grafo.arestas[self.no_atual_id]:
             self.no_atual_id = no_id
             self.historico_movimentos.append(no_id)
+            if self.gravador is not None:
+                self.gravador.movimento(no_id)
+            self.manter_no_visivel(no_id)
             
             # Verifica se caiu em armadilha
             if self.grafo.nos[no_id].eh_armadilha:
@@ -568,40 +254,173 @@ class Jogo:
         return False
     
     def calcular_caminho(self, algoritmo):
+        # A busca não roda inteira aqui: só é criado o gerador de passos, que
+        # avancar_busca consome aos poucos a cada quadro. A animação começa
+        # com os primeiros passos gravados, sem travar a janela em mapas grandes
+        if not any(self.grafo.alcancavel(self.no_atual_id, tesouro_id) for tesouro_id in self.tesouros):
+            # Armadilhas isolam todos os tesouros: o índice de componentes
+            # responde na hora, em vez de a busca explorar toda a região do
+            # jogador até falhar
+            self.caminho_atual = None
+            self.botoes["seguir"].ativo = False
+            self.mensagem = "Não há caminho daqui até o tesouro: as armadilhas bloqueiam todas as passagens!"
+            return
+        self.historico_busca = HistoricoBusca()
+        self.no_tesouro_id = self.tesouro_mais_proximo(por_custo=algoritmo in ("DIJKSTRA", "A*"))
         if algoritmo == "BFS":
             self.estado = "ANIMANDO_BFS"
-            self.caminho_atual, self.historico_busca, self.visitados, self.fronteira, self.armadilhas_evitadas = self.grafo.busca_bfs(self.no_atual_id, self.no_tesouro_id)
+            passos = self.grafo.passos_bfs(self.no_atual_id, self.no_tesouro_id, historico_busca=self.historico_busca)
             self.algoritmo_usado = "BFS"
-            self.indice_historico = 0
             self.mensagem = "Iniciando busca com BFS. Observe a exploração dos caminhos..."
-            self.tempo_ultimo_passo = pygame.time.get_ticks()
+        elif algoritmo == "BIDIRECIONAL":
+            self.estado = "ANIMANDO_BIDIRECIONAL"
+            passos = self.grafo.passos_bfs_bidirecional(self.no_atual_id, self.no_tesouro_id, historico_busca=self.historico_busca)
+            self.algoritmo_usado = "BFS bidirecional"
+            self.mensagem = "Iniciando BFS bidirecional: a busca parte da posição atual e do tesouro ao mesmo tempo..."
+        elif algoritmo in ("DIJKSTRA", "A*"):
+            # Buscas pelo menor comprimento total, não pelo menor número de passos
+            if algoritmo == "DIJKSTRA":
+                self.estado = "ANIMANDO_DIJKSTRA"
+                passos = self.grafo.passos_dijkstra(self.no_atual_id, self.no_tesouro_id, historico_busca=self.historico_busca)
+                self.algoritmo_usado = "Dijkstra"
+            else:
+                self.estado = "ANIMANDO_A_ESTRELA"
+                passos = self.grafo.passos_a_estrela(self.no_atual_id, self.no_tesouro_id, historico_busca=self.historico_busca)
+                self.algoritmo_usado = "A*"
+            self.mensagem = f"Iniciando busca com {self.algoritmo_usado}. Os locais mais próximos em distância são explorados primeiro..."
         else:  # DFS
             self.estado = "ANIMANDO_DFS"
-            self.caminho_atual, self.historico_busca, self.visitados, self.fronteira, self.armadilhas_evitadas = self.grafo.busca_dfs(self.no_atual_id, self.no_tesouro_id)
+            passos = self.grafo.passos_dfs(self.no_atual_id, self.no_tesouro_id, historico_busca=self.historico_busca)
             self.algoritmo_usado = "DFS"
-            self.indice_historico = 0
             self.mensagem = "Iniciando busca com DFS. Observe a exploração dos caminhos..."
-            self.tempo_ultimo_passo = pygame.time.get_ticks()
-        
-        if self.caminho_atual:
-            self.botoes["seguir"].ativo = True
+        if len(self.tesouros) > 1:
+            self.mensagem += f" Destino: {self.grafo.nos[self.no_tesouro_id].nome}, o tesouro mais próximo."
+        
+        self.passos_busca = passos
+        self.avanco_rapido = False
+        self.desempenho.iniciar_busca(self.algoritmo_usado, self.no_atual_id, self.no_tesouro_id)
+        if self.gravador is not None:
+            self.gravador.busca(algoritmo, self.no_atual_id, self.no_tesouro_id, self.historico_busca)
+        self.caminho_atual = None
+        self.botoes["seguir"].ativo = False
+        self.cursor_historico = self.historico_busca.cursor()
+        self.visitados = self.cursor_historico.visitados
+        self.fronteira = self.cursor_historico.fronteira
+        self.armadilhas_evitadas = self.cursor_historico.armadilhas_evitadas
+        self.indice_historico = 0
+        self.tempo_ultimo_passo = pygame.time.get_ticks()
+    
+    def tesouro_mais_proximo(self, por_custo=False):
+        # Com vários tesouros, uma única busca multifonte a partir de todos
+        # escolhe o mais próximo do jogador, em passos (árvore em cache) ou
+        # em distância, em vez de uma busca por tesouro
+        if len(self.tesouros) == 1:
+            return self.tesouros[0]
+        if por_custo:
+            tesouro_id, _ = self.grafo.busca_mais_proximo(self.no_atual_id, self.tesouros, por_custo=True)
         else:
-            self.mensagem = "Não foi possível encontrar um caminho até o tesouro!"
-
-    def atualizar_animacao_bfs(self):
-        tempo_atual = pygame.time.get_ticks()
+            tesouro_id = self.grafo.arvore_ate(*self.tesouros).destino(self.no_atual_id)
+        # Nenhum tesouro alcançável: a busca mostra a exploração e falha
+        return self.tesouros[0] if tesouro_id is None else tesouro_id
+    
+    def avancar_busca(self):
+        # Roda a busca em andamento até esgotar o orçamento do quadro. Ela
+        # segue à frente da animação para que o caminho final apareça (e o
+        # botão de seguir seja liberado) assim que for encontrado
+        if self.passos_busca is None:
+            return
+        orcamento = ORCAMENTO_AVANCO_RAPIDO_MS if self.avanco_rapido else ORCAMENTO_BUSCA_MS
+        limite = time.perf_counter() + orcamento / 1000
+        resultado = None
+        with self.desempenho.medir_busca() as metricas:
+            try:
+                while time.perf_counter() < limite:
+                    next(self.passos_busca)
+                    metricas.passos += 1
+            except StopIteration as fim:
+                resultado = fim.value
+        if self.gravador is not None:
+            if resultado is None:
+                self.gravador.acompanhar_busca()
+            else:
+                self.gravador.fim_busca(resultado[0])
+        if resultado is not None:
+            # Mesmo resultado da busca completa (busca_bfs etc.)
+            self.desempenho.finalizar_busca(resultado, self.historico_busca)
+            self.passos_busca = None
+            self.caminho_atual = resultado[0]
+            if self.caminho_atual:
+                self.botoes["seguir"].ativo = True
+            else:
+                self.mensagem = "Não foi possível encontrar um caminho até o tesouro!"
+    
+    def hora_do_proximo_passo(self):
+        # Avança a busca e indica se a animação deve mostrar o passo
+        # indice_historico agora (ou concluir, se não houver mais passos)
+        self.avancar_busca()
+        
+        if self.avanco_rapido:
+            # Os passos intermediários não são mostrados: quando a busca
+            # termina, a animação pula direto para o último
+            if self.passos_busca is not None:
+                return False
+            if len(self.historico_busca):
+                self.aplicar_passo_historico(len(self.historico_busca) - 1)
+            self.indice_historico = len(self.historico_busca)
+            return True
         
-        # Se passou o intervalo de tempo para o próximo passo
+        tempo_atual = pygame.time.get_ticks()
+        if tempo_atual - self.tempo_ultimo_passo < self.intervalo_animacao:
+            return False
+        # O próximo passo ainda não foi gravado pela busca
+        if self.passos_busca is not None and self.indice_historico >= len(self.historico_busca):
+            return False
+        # Passo fixo: o próximo prazo conta do prazo anterior, e não do
+        # quadro em que este passo apareceu, para o ritmo não atrasar; depois
+        # de uma pausa longa (esperando a busca) volta a contar de agora
+        self.tempo_ultimo_passo += self.intervalo_animacao
         if tempo_atual - self.tempo_ultimo_passo >= self.intervalo_animacao:
             self.tempo_ultimo_passo = tempo_atual
+        return True
+    
+    def ms_ate_proxima_atualizacao(self):
+        # Quanto tempo o laço principal pode esperar por eventos antes que a
+        # tela mude sozinha: 0 com uma busca rodando ou no avanço rápido, o
+        # tempo até o próximo passo da animação ou até a próxima atualização
+        # do painel de desempenho, ou None se nada muda sem o usuário
+        animando = self.estado in ESTADOS_ANIMACAO
+        if animando and (self.passos_busca is not None or self.avanco_rapido):
+            return 0
+        agora = pygame.time.get_ticks()
+        prazos = []
+        if animando:
+            prazos.append(self.tempo_ultimo_passo + self.intervalo_animacao - agora)
+        if self.mostrar_desempenho:
+            prazos.append(self.desempenho_atualizado_em + INTERVALO_HUD_MS - agora)
+        return max(0, min(prazos)) if prazos else None
+    
+    def iniciar_avanco_rapido(self):
+        self.avanco_rapido = True
+        self.mensagem = f"Avançando até o fim da busca com {self.algoritmo_usado}..."
+    
+    def atualizar_animacao(self):
+        # Chamado a cada quadro: avança a animação da busca, se houver uma
+        if self.estado == "ANIMANDO_BFS":
+            self.atualizar_animacao_bfs()
+        elif self.estado == "ANIMANDO_BIDIRECIONAL":
+            self.atualizar_animacao_bidirecional()
+        elif self.estado == "ANIMANDO_DFS":
+            self.atualizar_animacao_dfs()
+        elif self.estado in ("ANIMANDO_DIJKSTRA", "ANIMANDO_A_ESTRELA"):
+            self.atualizar_animacao_custo()
+    
+    def atualizar_animacao_bfs(self):
+        # Se passou o intervalo de tempo para o próximo passo (e a busca já o gravou)
+        if self.hora_do_proximo_passo():
             
             # Se ainda há passos na animação
             if self.indice_historico < len(self.historico_busca):
-                passo = self.historico_busca[self.indice_historico]
-                self.visitados = passo['visitados']
-                self.fronteira = passo['fronteira']
-                self.caminho_atual_bfs = passo['caminho_atual']
-                self.armadilhas_evitadas = passo.get('armadilhas_evitadas', set())
+                self.aplicar_passo_historico(self.indice_historico)
                 
                 if len(self.caminho_atual_bfs) > 1:
                     ultimo_no = self.caminho_atual_bfs[-1]
@@ -620,20 +439,65 @@ class Jogo:
                     self.mensagem = "Não foi possível encontrar um caminho até o tesouro!"
                 self.caminho_atual_bfs = None
 
+    def atualizar_animacao_bidirecional(self):
+        # Se passou o intervalo de tempo para o próximo passo (e a busca já o gravou)
+        if self.hora_do_proximo_passo():
+            
+            # Se ainda há passos na animação
+            if self.indice_historico < len(self.historico_busca):
+                self.aplicar_passo_historico(self.indice_historico)
+                
+                # Os passos do lado do tesouro mostram o caminho a partir dele
+                if len(self.caminho_atual_bfs) > 1:
+                    ultimo_no = self.caminho_atual_bfs[-1]
+                    penultimo_no = self.caminho_atual_bfs[-2]
+                    self.mensagem = f"Explorando pelos dois lados: de {self.grafo.nos[penultimo_no].nome} para {self.grafo.nos[ultimo_no].nome}..."
+                else:
+                    self.mensagem = "Iniciando busca pelos dois lados..."
+                
+                self.indice_historico += 1
+            else:
+                # Animação concluída
+                self.estado = "JOGANDO"
+                if self.caminho_atual:
+                    self.mensagem = f"Caminho encontrado com BFS bidirecional! {len(self.visitados)} nós visitados, {len(self.armadilhas_evitadas)} armadilhas evitadas, melhor caminho tem {len(self.caminho_atual)} nós."
+                else:
+                    self.mensagem = "Não foi possível encontrar um caminho até o tesouro!"
+                self.caminho_atual_bfs = None
+
+    def atualizar_animacao_custo(self):
+        # Animação comum a Dijkstra e A*
+        # Se passou o intervalo de tempo para o próximo passo (e a busca já o gravou)
+        if self.hora_do_proximo_passo():
+            
+            # Se ainda há passos na animação
+            if self.indice_historico < len(self.historico_busca):
+                self.aplicar_passo_historico(self.indice_historico)
+                
+                if len(self.caminho_atual_bfs) > 1:
+                    ultimo_no = self.caminho_atual_bfs[-1]
+                    penultimo_no = self.caminho_atual_bfs[-2]
+                    self.mensagem = f"{self.algoritmo_usado}: chegando em {self.grafo.nos[ultimo_no].nome} por {self.grafo.nos[penultimo_no].nome} (distância {self.grafo.custo_caminho(self.caminho_atual_bfs):.0f})..."
+                else:
+                    self.mensagem = f"Iniciando busca com {self.algoritmo_usado}..."
+                
+                self.indice_historico += 1
+            else:
+                # Animação concluída
+                self.estado = "JOGANDO"
+                if self.caminho_atual:
+                    self.mensagem = f"Caminho encontrado com {self.algoritmo_usado}! {len(self.visitados)} nós visitados, {len(self.armadilhas_evitadas)} armadilhas evitadas, caminho tem {len(self.caminho_atual)} nós e distância total {self.grafo.custo_caminho(self.caminho_atual):.0f}."
+                else:
+                    self.mensagem = "Não foi possível encontrar um caminho até o tesouro!"
+                self.caminho_atual_bfs = None
+
     def atualizar_animacao_dfs(self):
-        tempo_atual = pygame.time.get_ticks()
-        
-        # Se passou o intervalo de tempo para o próximo passo
-        if tempo_atual - self.tempo_ultimo_passo >= self.intervalo_animacao:
-            self.tempo_ultimo_passo = tempo_atual
+        # Se passou o intervalo de tempo para o próximo passo (e a busca já o gravou)
+        if self.hora_do_proximo_passo():
             
             # Se ainda há passos na animação
             if self.indice_historico < len(self.historico_busca):
-                passo = self.historico_busca[self.indice_historico]
-                self.visitados = passo['visitados']
-                self.fronteira = passo['fronteira']
-                self.caminho_atual_bfs = passo['caminho_atual']
-                self.armadilhas_evitadas = passo.get('armadilhas_evitadas', set())
+                self.aplicar_passo_historico(self.indice_historico)
                 
                 if len(self.caminho_atual_bfs) > 1:
                     ultimo_no = self.caminho_atual_bfs[-1]
@@ -652,16 +516,46 @@ class Jogo:
                     self.mensagem = "Não foi possível encontrar um caminho até o tesouro!"
                 self.caminho_atual_bfs = None
     
+    def aplicar_passo_historico(self, indice):
+        # O cursor reconstrói o passo aplicando ou desfazendo eventos (ou a
+        # partir de um checkpoint) e altera seus conjuntos no lugar
+        self.caminho_atual_bfs = self.cursor_historico.ir_para(indice)
+        self.visitados = self.cursor_historico.visitados
+        self.fronteira = self.cursor_historico.fronteira
+        self.armadilhas_evitadas = self.cursor_historico.armadilhas_evitadas
+    
+    def navegar_historico(self, deslocamento):
+        # Permite voltar e avançar pelos passos da busca durante a animação
+        if not len(self.historico_busca):
+            return
+        passo_exibido = max(self.indice_historico - 1, 0)
+        alvo = min(max(passo_exibido + deslocamento, 0), len(self.historico_busca) - 1)
+        self.aplicar_passo_historico(alvo)
+        self.indice_historico = alvo + 1
+        self.tempo_ultimo_passo = pygame.time.get_ticks()
+        self.mensagem = f"Passo {alvo + 1} de {len(self.historico_busca)} da busca com {self.algoritmo_usado}."
+    
     def seguir_caminho(self):
         if not self.caminho_atual or len(self.caminho_atual) <= 1:
             self.mensagem = "Não há caminho para seguir!"
             return
         
-        # Inicia a partir do segundo nó no caminho (o primeiro é onde já estamos)
-        indice_atual = self.caminho_atual.index(self.no_atual_id)
-        
-        if indice_atual + 1 < len(self.caminho_atual):
-            proximo_no = self.caminho_atual[indice_atual + 1]
+        # Posição atual no caminho pelo índice do caminho, sem percorrer a lista
+        posicao = self.indice_do_caminho('final', self.caminho_atual).posicoes.get(self.no_atual_id)
+        
+        if posicao is None:
+            # Fora do caminho calculado: segue a rota mais curta até o
+            # tesouro, lida da árvore pré-calculada a partir dele
+            rota = self.grafo.arvore_ate(*self.tesouros)
+            if rota.proximo(self.no_atual_id) is None:
+                self.mensagem = "Não há caminho daqui até o tesouro!"
+                self.botoes["seguir"].ativo = False
+                return
+            self.caminho_atual = rota.caminho(self.no_atual_id)
+            self.mover_para(rota.proximo(self.no_atual_id))
+        elif posicao + 1 < len(self.caminho_atual):
+            # O próximo nó no caminho (o atual é onde já estamos)
+            proximo_no = self.caminho_atual[posicao + 1]
             self.mover_para(proximo_no)
         else:
             self.mensagem = "Você já está no fim do caminho!"
@@ -671,31 +565,120 @@ class Jogo:
         if self.estado != "JOGANDO":
             self.botoes["seguir"].ativo = False
     
+    def assinaturas_desenho(self):
+        # Resumo do que cada região da tela mostra; uma região só é
+        # redesenhada quando sua assinatura muda
+        animando = self.estado in ESTADOS_ANIMACAO
+        pos_mouse = pygame.mouse.get_pos()
+        return {
+            'estado': self.estado,
+            'tabuleiro': (id(self.grafo), self.grafo.versao, self.no_atual_id, id(self.caminho_atual),
+                          animando, self.indice_historico if animando else None, id(self.caminho_atual_bfs),
+                          self.no_sob_mouse, self.camera.estado()),
+            'painel': (id(self.grafo), self.grafo.versao, self.no_atual_id,
+                       tuple((botao.ativo, botao.ativo and botao.rect.collidepoint(pos_mouse)) for botao in self.botoes.values())),
+            'mensagem': self.mensagem,
+        }
+    
+    def invalidar_desenho(self):
+        # Força o redesenho completo no próximo quadro
+        self.assinaturas_desenhadas = None
+    
     def desenhar(self, tela):
-        # Limpa a tela
-        tela.fill(AZUL_ESCURO)
+        # Redesenha apenas as regiões que mudaram e devolve os retângulos
+        # alterados, para serem passados a pygame.display.update
+        assinaturas = self.assinaturas_desenho()
+        anteriores = self.assinaturas_desenhadas
+        self.assinaturas_desenhadas = assinaturas
+        
+        medir = self.desempenho.medir
+        if anteriores is None or anteriores['estado'] != assinaturas['estado']:
+            # Limpa a tela
+            tela.fill(AZUL_ESCURO)
+            with medir("tabuleiro"):
+                self.desenhar_tabuleiro(tela)
+            with medir("painel"):
+                self.desenhar_painel(tela)
+                self.desenhar_mensagem(tela)
+            sujos = [tela.get_rect()]
+        else:
+            sujos = []
+            if anteriores['tabuleiro'] != assinaturas['tabuleiro']:
+                # A caixa de mensagem fica sobre o tabuleiro, então é redesenhada junto
+                tela.set_clip(self.area_tabuleiro)
+                with medir("tabuleiro"):
+                    self.desenhar_tabuleiro(tela)
+                pygame.draw.line(tela, PRETO, (1050, 0), (1050, ALTURA), 3)
+                tela.set_clip(None)
+                with medir("painel"):
+                    self.desenhar_mensagem(tela)
+                sujos.append(self.area_tabuleiro)
+            elif anteriores['mensagem'] != assinaturas['mensagem']:
+                with medir("painel"):
+                    self.desenhar_mensagem(tela)
+                sujos.append(self.area_mensagem)
+            
+            if anteriores['painel'] != assinaturas['painel']:
+                with medir("painel"):
+                    self.desenhar_painel(tela)
+                sujos.append(self.painel_info)
+        
+        # Se o jogo acabou, mostra uma mensagem especial sobre as regiões redesenhadas
+        if self.estado != "JOGANDO" and self.estado not in ESTADOS_ANIMACAO:
+            with medir("painel"):
+                for retangulo in sujos:
+                    tela.set_clip(retangulo)
+                    self.desenhar_fim_de_jogo(tela)
+                tela.set_clip(None)
+        
+        # O painel de desempenho é opaco e fica por cima de tudo, então pode
+        # ser redesenhado a cada quadro sem redesenhar o tabuleiro embaixo
+        if self.mostrar_desempenho:
+            with medir("hud"):
+                sujos.append(self.desenhar_desempenho(tela))
+        
+        return sujos
+    
+    def indice_do_caminho(self, chave, caminho):
+        # Reaproveita o IndiceCaminho enquanto a lista do caminho for a mesma
+        indice = self.indices_caminho.get(chave)
+        if indice is None or indice.caminho is not caminho:
+            indice = indexar_caminho(caminho)
+            self.indices_caminho[chave] = indice
+        return indice
+    
+    def desenhar_tabuleiro(self, tela):
+        caminho = self.indice_do_caminho('final', self.caminho_atual)
         
         # Desenha o grafo (tabuleiro)
-        if self.estado == "ANIMANDO_BFS" or self.estado == "ANIMANDO_DFS":
-            self.grafo.desenhar(tela, self.no_atual_id, self.caminho_atual, 
-                               self.visitados, self.fronteira, self.caminho_atual_bfs,
-                               self.armadilhas_evitadas)
+        if self.estado in ESTADOS_ANIMACAO:
+            self.grafo.desenhar(tela, self.no_atual_id, caminho, 
+                               self.visitados, self.fronteira,
+                               self.indice_do_caminho('explorando', self.caminho_atual_bfs),
+                               self.armadilhas_evitadas, camera=self.camera)
         else:
-            self.grafo.desenhar(tela, self.no_atual_id, self.caminho_atual)
+            self.grafo.desenhar(tela, self.no_atual_id, caminho, camera=self.camera)
         
+        # Anel em volta do nó sob o mouse
+        if self.no_sob_mouse is not None:
+            no = self.grafo.nos[self.no_sob_mouse]
+            centro = self.camera.para_tela(no.pos_x, no.pos_y)
+            pygame.draw.circle(tela, BRANCO, centro, max(2, int((no.raio + 12) * self.camera.zoom)), 3)
+    
+    def desenhar_painel(self, tela):
         # Desenha a área de informações
         pygame.draw.rect(tela, CINZA, self.painel_info)
         pygame.draw.line(tela, PRETO, (1050, 0), (1050, ALTURA), 3)
         
         # Desenha o título no painel
-        titulo = fonte_titulo.render("Caça ao Tesouro", True, PRETO)
+        titulo = renderizar_texto('titulo', "Caça ao Tesouro", PRETO)
         tela.blit(titulo, (self.painel_info.centerx - titulo.get_width()//2, 20))
         
         # Desenha a legenda
         pygame.draw.rect(tela, BRANCO, (1070, 80, 310, 230))
         pygame.draw.rect(tela, PRETO, (1070, 80, 310, 230), 2)
         
-        legenda_titulo = fonte_grande.render("Legenda:", True, PRETO)
+        legenda_titulo = renderizar_texto('grande', "Legenda:", PRETO)
         tela.blit(legenda_titulo, (1080, 90))
         
         # Itens da legenda
@@ -715,16 +698,25 @@ class Jogo:
             y = 120 + i * 22
             pygame.draw.circle(tela, cor, (1085, y), 8)
             pygame.draw.circle(tela, PRETO, (1085, y), 8, 1)
-            texto_leg = fonte_media.render(texto, True, PRETO)
+            texto_leg = renderizar_texto('media', texto, PRETO)
             tela.blit(texto_leg, (1100, y - 8))
         
         # Desenha informações do local atual
         info_y = 340
-        local_titulo = fonte_grande.render("Local Atual:", True, PRETO)
+        local_titulo = renderizar_texto('grande', "Local Atual:", PRETO)
         tela.blit(local_titulo, (1070, info_y))
         
+        # Distância até o tesouro, consultada na árvore de caminhos mais curtos
+        # (ou até o mais próximo, se houver vários)
+        distancia = self.grafo.arvore_ate(*self.tesouros).distancia(self.no_atual_id)
+        texto_distancia = "sem caminho até o tesouro" if distancia is None else f"a {distancia} passos do tesouro"
+        if distancia is not None and len(self.tesouros) > 1:
+            texto_distancia += " mais próximo"
+        distancia_surf = renderizar_texto('pequena', texto_distancia, PRETO)
+        tela.blit(distancia_surf, (1380 - distancia_surf.get_width(), info_y + 6))
+        
         no_atual = self.grafo.nos[self.no_atual_id]
-        nome_local = fonte_media.render(f"{no_atual.nome}", True, PRETO)
+        nome_local = renderizar_texto('media', f"{no_atual.nome}", PRETO)
         tela.blit(nome_local, (1070, info_y + 30))
         
         # Desenhar a descrição do local em multi-linhas
@@ -734,56 +726,129 @@ class Jogo:
         # Desenha botões
         for botao in self.botoes.values():
             botao.desenhar(tela)
-        
+    
+    def desenhar_mensagem(self, tela):
         # Desenha a mensagem
         mensagem_surf = pygame.Surface((1030, 90))
         mensagem_surf.fill(BRANCO)
         pygame.draw.rect(mensagem_surf, PRETO, (0, 0, 1030, 90), 2)
         self.renderizar_texto_multilinhas(mensagem_surf, self.mensagem, 10, 10, 1010)
         tela.blit(mensagem_surf, (10, 800))
-        
-        # Se o jogo acabou, mostra uma mensagem especial
-        if self.estado not in ["JOGANDO", "ANIMANDO_BFS", "ANIMANDO_DFS"]:
-            cor_overlay = VERDE if self.estado == "VITORIA" else VERMELHO
-            overlay = pygame.Surface((LARGURA, ALTURA), pygame.SRCALPHA)
-            overlay.fill((cor_overlay[0], cor_overlay[1], cor_overlay[2], 100))
-            tela.blit(overlay, (0, 0))
-            
-            status_texto = "VITÓRIA!" if self.estado == "VITORIA" else "DERROTA!"
-            status_surf = fonte_titulo.render(status_texto, True, PRETO)
-            tela.blit(status_surf, (525 - status_surf.get_width()//2, 400))
+    
+    def desenhar_fim_de_jogo(self, tela):
+        cor_overlay = VERDE if self.estado == "VITORIA" else VERMELHO
+        overlay = pygame.Surface((LARGURA, ALTURA), pygame.SRCALPHA)
+        overlay.fill((cor_overlay[0], cor_overlay[1], cor_overlay[2], 100))
+        tela.blit(overlay, (0, 0))
+        
+        status_texto = "VITÓRIA!" if self.estado == "VITORIA" else "DERROTA!"
+        status_surf = renderizar_texto('titulo', status_texto, PRETO)
+        tela.blit(status_surf, (525 - status_surf.get_width()//2, 400))
+    
+    def alternar_desempenho(self):
+        self.mostrar_desempenho = not self.mostrar_desempenho
+        self.superficie_desempenho = None
+        # Ao esconder, o tabuleiro embaixo do painel precisa voltar
+        self.invalidar_desenho()
+    
+    def linhas_desempenho(self):
+        medias = self.desempenho.medias_ms()
+        if medias is None:
+            return ["Medindo..."]
+        linhas = [f"Quadro: {medias['total']:.1f} ms (pior {medias['pior']:.1f} ms, {len(self.desempenho.recentes)} quadros)"]
+        fases = [f"{fase} {medias[fase]:.2f}" for fase in FASES_QUADRO + ("outros",)]
+        for inicio in range(0, len(fases), 4):
+            linhas.append("  " + "   ".join(fases[inicio:inicio + 4]))
+        
+        busca = self.desempenho.busca
+        if busca is not None:
+            situacao = "" if busca.concluida() else " (em andamento)"
+            linhas.append(f"Busca {busca.algoritmo}{situacao}: {busca.passos} passos em {busca.quadros} quadros")
+            linhas.append(f"  tempo {busca.tempo * 1000:.1f} ms, {busca.blocos_alocados:+d} blocos alocados")
+            if busca.concluida():
+                linhas.append(f"  {busca.nos_expandidos} nós expandidos, histórico {busca.historico_bytes / 1024:.1f} KiB")
+                linhas.append(f"  resultado em {busca.duracao:.2f} s")
+        return linhas
+    
+    def desenhar_desempenho(self, tela):
+        # Os números só mudam a cada INTERVALO_HUD_MS; nos outros quadros a
+        # mesma superfície é reaproveitada. O texto usa a fonte direto, sem
+        # o cache de texto, para não encher o cache com números que mudam
+        agora = pygame.time.get_ticks()
+        if self.superficie_desempenho is None or agora - self.desempenho_atualizado_em >= INTERVALO_HUD_MS:
+            fonte = obter_fontes()['pequena']
+            linhas = self.linhas_desempenho()
+            # Tamanho fixo, para que o painel nunca encolha deixando restos
+            superficie = pygame.Surface((430, 10 + 18 * 7))
+            superficie.fill(PRETO)
+            for i, linha in enumerate(linhas):
+                superficie.blit(fonte.render(linha, True, VERDE), (8, 5 + i * 18))
+            self.superficie_desempenho = superficie
+            self.desempenho_atualizado_em = agora
+        return tela.blit(self.superficie_desempenho, (10, 10))
     
     def renderizar_texto_multilinhas(self, superficie, texto, x, y, largura_max, cor=PRETO):
-        palavras = texto.split()
-        linhas = []
-        linha_atual = []
-        
-        for palavra in palavras:
-            teste_linha = ' '.join(linha_atual + [palavra])
-            largura_texto = fonte_pequena.size(teste_linha)[0]
-            
-            if largura_texto > largura_max:
-                linhas.append(' '.join(linha_atual))
-                linha_atual = [palavra]
-            else:
-                linha_atual.append(palavra)
-        
-        if linha_atual:
-            linhas.append(' '.join(linha_atual))
+        # A quebra de linhas e as superfícies de cada linha vêm do cache de texto
+        linhas = CACHE_TEXTO.quebrar_linhas('pequena', texto, largura_max)
         
         for i, linha in enumerate(linhas):
-            texto_surf = fonte_pequena.render(linha, True, cor)
+            texto_surf = renderizar_texto('pequena', linha, cor)
             superficie.blit(texto_surf, (x, y + i * 20))
     
     def processar_evento(self, evento):
         if evento.type == pygame.QUIT:
             return False
         
+        # A janela foi descoberta ou redimensionada: redesenha tudo
+        if evento.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.invalidar_desenho()
+        
+        # Setas esquerda/direita percorrem o histórico da busca (PageUp/PageDown pulam 10 passos)
+        if evento.type == pygame.KEYDOWN and self.estado in ESTADOS_ANIMACAO:
+            deslocamentos = {pygame.K_LEFT: -1, pygame.K_RIGHT: 1, pygame.K_PAGEUP: -10, pygame.K_PAGEDOWN: 10}
+            if evento.key in deslocamentos:
+                self.navegar_historico(deslocamentos[evento.key])
+            # F pula para o fim da busca sem mostrar os passos intermediários
+            elif evento.key == pygame.K_f and not self.avanco_rapido:
+                self.iniciar_avanco_rapido()
+
+        # Câmera: roda do mouse aproxima/afasta, botão direito arrasta,
+        # W/A/S/D deslocam, +/- mudam o zoom e Home volta à vista inicial
+        if evento.type == pygame.MOUSEWHEEL:
+            pos_mouse = pygame.mouse.get_pos()
+            if self.area_tabuleiro.collidepoint(pos_mouse):
+                self.camera.aplicar_zoom(PASSO_ZOOM ** evento.y, pos_mouse)
+        if evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 3 and self.area_tabuleiro.collidepoint(evento.pos):
+            self.arrastando_camera = True
+        if evento.type == pygame.MOUSEBUTTONUP and evento.button == 3:
+            self.arrastando_camera = False
+        if evento.type == pygame.MOUSEMOTION and self.arrastando_camera:
+            self.camera.mover(-evento.rel[0], -evento.rel[1])
+        if evento.type == pygame.KEYDOWN:
+            deslocamentos_camera = {pygame.K_a: (-100, 0), pygame.K_d: (100, 0), pygame.K_w: (0, -100), pygame.K_s: (0, 100)}
+            if evento.key in deslocamentos_camera:
+                self.camera.mover(*deslocamentos_camera[evento.key])
+            elif evento.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                self.camera.aplicar_zoom(PASSO_ZOOM)
+            elif evento.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.camera.aplicar_zoom(1 / PASSO_ZOOM)
+            elif evento.key == pygame.K_HOME:
+                self.ajustar_camera()
+            elif evento.key == pygame.K_F3:
+                self.alternar_desempenho()
+        
+        # Destaca o nó sob o mouse
+        if evento.type == pygame.MOUSEMOTION:
+            if self.area_tabuleiro.collidepoint(evento.pos):
+                self.no_sob_mouse = self.grafo.no_em_ponto(self.camera.para_mundo(*evento.pos))
+            else:
+                self.no_sob_mouse = None
+        
         if evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 1:
             pos = pygame.mouse.get_pos()
             
             # Se estiver animando, ignora cliques (exceto no botão de reiniciar)
-            if (self.estado == "ANIMANDO_BFS" or self.estado == "ANIMANDO_DFS") and not self.botoes["reiniciar"].clicado(pos):
+            if self.estado in ESTADOS_ANIMACAO and not self.botoes["reiniciar"].clicado(pos):
                 return True
             
             # Verifica cliques nos botões
@@ -797,43 +862,106 @@ class Jogo:
             elif self.botoes["bfs"].clicado(pos) and self.estado == "JOGANDO":
                 self.calcular_caminho("BFS")
             
+            elif self.botoes["bidirecional"].clicado(pos) and self.estado == "JOGANDO":
+                self.calcular_caminho("BIDIRECIONAL")
+            
             elif self.botoes["dfs"].clicado(pos) and self.estado == "JOGANDO":
                 self.calcular_caminho("DFS")
             
+            elif self.botoes["dijkstra"].clicado(pos) and self.estado == "JOGANDO":
+                self.calcular_caminho("DIJKSTRA")
+            
+            elif self.botoes["a_estrela"].clicado(pos) and self.estado == "JOGANDO":
+                self.calcular_caminho("A*")
+            
             elif self.botoes["seguir"].clicado(pos) and self.estado == "JOGANDO":
                 self.seguir_caminho()
             
             elif self.botoes["reiniciar"].clicado(pos):
                 self.reiniciar()
             
-            # Verifica cliques nos nós do grafo
-            else:
-                for no_id, no in self.grafo.nos.items():
-                    if no.contem_ponto(pos):
-                        self.no_selecionado = no_id
-                        self.mensagem = f"Selecionado: {no.nome}"
-                        break
+            # Verifica cliques nos nós do grafo (pelo índice espacial)
+            elif self.area_tabuleiro.collidepoint(pos):
+                no_id = self.grafo.no_em_ponto(self.camera.para_mundo(*pos))
+                if no_id is not None:
+                    self.no_selecionado = no_id
+                    self.mensagem = f"Selecionado: {self.grafo.nos[no_id].nome}"
         
         return True
 
-def main():
-    jogo = Jogo()
+def esperar_eventos(tempo_maximo_ms):
+    # Dorme até chegar algum evento ou passar tempo_maximo_ms e devolve os
+    # eventos (lista vazia se nenhum chegou). pygame.event.wait acorda assim
+    # que o evento chega; sem timeout positivo ele esperaria para sempre
+    if tempo_maximo_ms <= 0:
+        return pygame.event.get()
+    evento = pygame.event.wait(tempo_maximo_ms)
+    if evento.type == pygame.NOEVENT:
+        return []
+    return [evento] + pygame.event.get()
+
+def laco_principal(jogo, tela):
+    # Laço orientado a eventos: parado, o jogo dorme (esperar_eventos) até
+    # chegar uma entrada ou o próximo prazo de jogo.ms_ate_proxima_atualizacao
+    # (passo da animação, painel de desempenho), em vez de acordar 60 vezes
+    # por segundo. Com uma busca rodando, os quadros seguem no ritmo fixo de
+    # QUADROS_POR_SEGUNDO. Termina quando a janela é fechada
+    desempenho = jogo.desempenho
     clock = pygame.time.Clock()
     executando = True
     
     while executando:
-        for evento in pygame.event.get():
-            executando = jogo.processar_evento(evento)
+        desempenho.iniciar_quadro()
+        prazo = jogo.ms_ate_proxima_atualizacao()
+        if prazo != 0:
+            with desempenho.medir("espera"):
+                eventos = esperar_eventos(ESPERA_OCIOSA_MS if prazo is None else min(prazo, ESPERA_OCIOSA_MS))
+        else:
+            eventos = []
+        
+        with desempenho.medir("eventos"):
+            eventos.extend(pygame.event.get())
+            for evento in eventos:
+                if not jogo.processar_evento(evento):
+                    executando = False
         
         # Atualiza a animação se necessário
-        if jogo.estado == "ANIMANDO_BFS":
-            jogo.atualizar_animacao_bfs()
-        elif jogo.estado == "ANIMANDO_DFS":
-            jogo.atualizar_animacao_dfs()
-        
-        jogo.desenhar(tela)
-        pygame.display.flip()
-        clock.tick(60)
+        with desempenho.medir("animacao"):
+            jogo.atualizar_animacao()
+        
+        # Só as regiões alteradas (nenhuma, se nada mudou) vão para a janela
+        retangulos = jogo.desenhar(tela)
+        if retangulos:
+            with desempenho.medir("tela"):
+                pygame.display.update(retangulos)
+        with desempenho.medir("espera"):
+            clock.tick(QUADROS_POR_SEGUNDO)
+        desempenho.finalizar_quadro()
+
+def main():
+    # Um arquivo de mapa (.json ou .ctmapa) pode ser passado na linha de comando
+    parser = argparse.ArgumentParser(description=TITULO_JANELA)
+    parser.add_argument("mapa", nargs="?", default=None, help="arquivo de mapa (.json ou .ctmapa)")
+    parser.add_argument("--rastro", default=None,
+                        help="grava os tempos dos quadros e das buscas neste arquivo (.json ou .csv) ao sair")
+    parser.add_argument("--gravar", default=None,
+                        help="grava a sessão (movimentos e buscas) neste arquivo .ctgrav; veja reproducao.py")
+    args = parser.parse_args()
+    
+    # Inicializa pygame
+    pygame.init()
+    tela = pygame.display.set_mode((LARGURA, ALTURA))
+    pygame.display.set_caption(TITULO_JANELA)
+    
+    jogo = Jogo(args.mapa, gravar_rastro=args.rastro is not None)
+    if args.gravar is not None:
+        jogo.iniciar_gravacao(args.gravar)
+    laco_principal(jogo, tela)
+    jogo.encerrar_gravacao()
+    
+    if args.rastro is not None:
+        jogo.desempenho.exportar(args.rastro)
+        print(f"Rastro de desempenho gravado em {args.rastro}")
     
     pygame.quit()
     sys.exit()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# Carregamento e gravação de mapas em arquivo.
+#
+# Formato texto (.json), pensado para ser editado à mão:
+#
+#   {
+#     "formato": "caca-tesouro-mapa",
+#     "versao": 1,
+#     "inicio": 1,
+#     "nos": [
+#       {"id": 1, "nome": "Entrada da Caverna", "x": 200, "y": 130, "vizinhos": [2, 3]},
+#       ...
+#     ],
+#     "tesouros": [15],
+#     "armadilhas": [4, 10, 13],
+#     "pesos": [[1, 2, 250.0]]
+#   }
+#
+# Os ids são inteiros não negativos. As arestas são não direcionadas e
+# aparecem nas listas "vizinhos" dos dois nós; a ordem dos nós e dos vizinhos
+# é preservada porque define a ordem de visita das buscas. "nome" é opcional
+# (padrão "Local <id>", que não é gravado). "pesos" também é opcional e lista
+# só as arestas cujo peso difere do comprimento euclidiano, como
+# [id1, id2, peso].
+#
+# Formato binário (.ctmapa), para mapas com milhões de locais: um cabeçalho
+# seguido dos arrays de GrafoCSR, cada seção alinhada em 8 bytes e em
+# little-endian. O arquivo é mapeado em memória com mmap e os arrays viram
+# memoryviews sobre ele, então abrir o mapa não cria um objeto Python por
+# registro; as páginas só são lidas do disco quando usadas.
+#
+#   cabeçalho (CABECALHO_BINARIO): assinatura b"CTMAPA\0\0", versão,
+#       marcadores do arquivo, número de nós (n), número de alvos (m),
+#       id do início, número de tesouros (t), tamanho do texto dos nomes (b)
+#   ids         int64[n]
+#   pos_x       int32[n]
+#   pos_y       int32[n]
+#   offsets     int64[n + 1]   (CSR: vizinhos de i em alvos[offsets[i]:offsets[i + 1]])
+#   alvos       int64[m]       (ids dos vizinhos, as duas direções de cada aresta)
+#   marcadores  uint8[n]       (MARCA_TESOURO | MARCA_ARMADILHA de grafo_compacto)
+#   tesouros    int64[t]
+#   nomes_offsets int64[n + 1] e nomes utf-8[b]   (só se algum nome não for o padrão)
+#
+# O formato binário ainda não guarda pesos explícitos; mapas com pesos
+# precisam ser salvos em .json.
+#
+# A conversão entre os formatos preserva o mapa inteiro, e .ctmapa -> .json
+# -> .ctmapa devolve o mesmo arquivo: os marcadores do cabeçalho saem dos
+# próprios dados (ids consecutivos, algum nome diferente do padrão), e os
+# nomes padrão não são gravados em nenhum dos dois formatos.
+#
+# Uso como conversor: python mapas.py entrada.json saida.ctmapa (ou o inverso)
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from grafo import Grafo, NoGrafo, criar_mapa
+from grafo_compacto import GrafoCSR, nome_padrao
+
+FORMATO_TEXTO = "caca-tesouro-mapa"
+VERSAO_FORMATO = 1
+
+ASSINATURA_BINARIO = b"CTMAPA\0\0"
+CABECALHO_BINARIO = struct.Struct("<8sIIqqqqq")
+
+# Marcadores do cabeçalho binário
+ARQUIVO_IDS_CONSECUTIVOS = 1
+ARQUIVO_TEM_NOMES = 2
+
+# Modelos compartilhados (veja carregar_modelo): caminho absoluto do arquivo
+# (None = mapa original) -> (mtime e tamanho do arquivo, Mapa)
+MODELOS = {}
+
+class Mapa:
+    # Grafo mais as informações da partida que não fazem parte dele
+    def __init__(self, grafo, inicio_id, tesouros):
+        self.grafo = grafo
+        self.inicio_id = inicio_id
+        self.tesouros = list(tesouros)
+
+class TabelaNomes:
+    # Nomes guardados como um único bloco utf-8, decodificados sob demanda
+    __slots__ = ('offsets', 'dados')
+
+    def __init__(self, offsets, dados):
+        self.offsets = offsets
+        self.dados = dados
+
+    def __getitem__(self, indice):
+        return bytes(self.dados[self.offsets[indice]:self.offsets[indice + 1]]).decode('utf-8')
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+def mapa_padrao():
+    # O mapa original do jogo: 15 locais, início na Entrada da Caverna e
+    # tesouro no Altar Antigo
+    return Mapa(criar_mapa(), 1, [15])
+
+# --- Formato texto ---
+
+def carregar_mapa_json(caminho_arquivo):
+    with open(caminho_arquivo, encoding='utf-8') as arquivo:
+        dados = json.load(arquivo)
+
+    if dados.get("formato") != FORMATO_TEXTO:
+        raise ValueError(f"{caminho_arquivo}: não é um mapa do jogo (formato {dados.get('formato')!r})")
+    if dados.get("versao") != VERSAO_FORMATO:
+        raise ValueError(f"{caminho_arquivo}: versão de formato não suportada ({dados.get('versao')!r})")
+
+    grafo = Grafo()
+    for no in dados["nos"]:
+        grafo.adicionar_no(NoGrafo(no["id"], no.get("nome", nome_padrao(no["id"])), no["x"], no["y"]))
+
+    for no in dados["nos"]:
+        vizinhos = no.get("vizinhos", [])
+        for vizinho_id in vizinhos:
+            if vizinho_id not in grafo.nos:
+                raise ValueError(f"{caminho_arquivo}: nó {no['id']} ligado ao nó inexistente {vizinho_id}")
+        grafo.definir_vizinhos(no["id"], vizinhos)
+
+    # Toda aresta precisa aparecer nas listas dos dois nós
+    for no_id, vizinhos in grafo.arestas.items():
+        for vizinho_id in vizinhos:
+            if no_id not in grafo.arestas[vizinho_id]:
+                raise ValueError(f"{caminho_arquivo}: a aresta {no_id}-{vizinho_id} só aparece nos vizinhos de {no_id}")
+
+    for no_id in dados.get("tesouros", []):
+        grafo.nos[no_id].definir_tesouro()
+    for no_id in dados.get("armadilhas", []):
+        grafo.nos[no_id].definir_armadilha()
+    for no1_id, no2_id, peso in dados.get("pesos", []):
+        if no2_id not in grafo.arestas.get(no1_id, ()):
+            raise ValueError(f"{caminho_arquivo}: peso definido para a aresta inexistente {no1_id}-{no2_id}")
+        grafo.definir_peso(no1_id, no2_id, peso)
+
+    return Mapa(grafo, dados["inicio"], dados.get("tesouros", []))
+
+def dados_do_no(grafo, no_id, no):
+    dados = {"id": no_id}
+    if no.nome != nome_padrao(no_id):
+        dados["nome"] = no.nome
+    dados.update({"x": no.pos_x, "y": no.pos_y, "vizinhos": list(grafo.arestas[no_id])})
+    return dados
+
+def salvar_mapa_json(mapa, caminho_arquivo):
+    grafo = mapa.grafo
+    dados = {
+        "formato": FORMATO_TEXTO,
+        "versao": VERSAO_FORMATO,
+        "inicio": mapa.inicio_id,
+        "nos": [dados_do_no(grafo, no_id, no) for no_id, no in grafo.nos.items()],
+        "tesouros": list(mapa.tesouros),
+        "armadilhas": [no_id for no_id, no in grafo.nos.items() if no.eh_armadilha],
+    }
+    if grafo.pesos:
+        dados["pesos"] = [[no1_id, no2_id, peso] for (no1_id, no2_id), peso in grafo.pesos.items()]
+    with open(caminho_arquivo, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False)
+
+# --- Formato binário ---
+
+def alinhar(tamanho):
+    return (tamanho + 7) // 8 * 8
+
+def salvar_mapa_binario(mapa, caminho_arquivo):
+    grafo = mapa.grafo
+    if grafo.pesos:
+        raise ValueError("o formato binário não guarda pesos explícitos; salve o mapa em .json")
+    if not isinstance(grafo, GrafoCSR):
+        grafo = GrafoCSR.de_grafo(grafo)
+
+    marcadores_arquivo = 0
+    if grafo.indice_por_id is None:
+        marcadores_arquivo |= ARQUIVO_IDS_CONSECUTIVOS
+
+    secoes = [
+        array('q', grafo.ids),
+        array('i', grafo.pos_x),
+        array('i', grafo.pos_y),
+        array('q', grafo.offsets),
+        array('q', grafo.alvos),
+        array('B', grafo.marcadores),
+        array('q', mapa.tesouros),
+    ]
+
+    texto_nomes = b""
+    nomes = grafo.nomes
+    if nomes is not None and any(nomes[indice] != nome_padrao(no_id) for indice, no_id in enumerate(grafo.ids)):
+        marcadores_arquivo |= ARQUIVO_TEM_NOMES
+        nomes_offsets = array('q', [0])
+        pedacos = []
+        for indice in range(len(grafo.ids)):
+            pedacos.append(grafo.nomes[indice].encode('utf-8'))
+            nomes_offsets.append(nomes_offsets[-1] + len(pedacos[-1]))
+        texto_nomes = b"".join(pedacos)
+        secoes.append(nomes_offsets)
+
+    if sys.byteorder != 'little':
+        for secao in secoes:
+            secao.byteswap()
+
+    with open(caminho_arquivo, 'wb') as arquivo:
+        arquivo.write(CABECALHO_BINARIO.pack(ASSINATURA_BINARIO, VERSAO_FORMATO, marcadores_arquivo,
+                                             len(grafo.ids), len(grafo.alvos), mapa.inicio_id,
+                                             len(mapa.tesouros), len(texto_nomes)))
+        for secao in secoes + [texto_nomes]:
+            dados = secao.tobytes() if isinstance(secao, array) else secao
+            arquivo.write(dados)
+            arquivo.write(bytes(alinhar(len(dados)) - len(dados)))
+
+def carregar_mapa_binario(caminho_arquivo, usar_mmap=True):
+    with open(caminho_arquivo, 'rb') as arquivo:
+        if usar_mmap:
+            # ACCESS_COPY: alterações (como definir_armadilha) ficam só na memória
+            conteudo = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_COPY)
+        else:
+            conteudo = bytearray(arquivo.read())
+
+    (assinatura, versao, marcadores_arquivo, num_nos, num_alvos,
+     inicio_id, num_tesouros, tamanho_nomes) = CABECALHO_BINARIO.unpack_from(conteudo, 0)
+    if assinatura != ASSINATURA_BINARIO:
+        raise ValueError(f"{caminho_arquivo}: não é um mapa binário do jogo")
+    if versao != VERSAO_FORMATO:
+        raise ValueError(f"{caminho_arquivo}: versão de formato não suportada ({versao})")
+
+    visao = memoryview(conteudo)
+    posicao = alinhar(CABECALHO_BINARIO.size)
+
+    def secao(tipo, quantidade):
+        nonlocal posicao
+        tamanho = quantidade * array(tipo).itemsize
+        dados = visao[posicao:posicao + tamanho].cast(tipo)
+        posicao += alinhar(tamanho)
+        if sys.byteorder != 'little':
+            dados = array(tipo, dados)
+            dados.byteswap()
+        return dados
+
+    ids = secao('q', num_nos)
+    pos_x = secao('i', num_nos)
+    pos_y = secao('i', num_nos)
+    offsets = secao('q', num_nos + 1)
+    alvos = secao('q', num_alvos)
+    marcadores = secao('B', num_nos)
+    tesouros = list(secao('q', num_tesouros))
+
+    nomes = None
+    if marcadores_arquivo & ARQUIVO_TEM_NOMES:
+        nomes_offsets = secao('q', num_nos + 1)
+        nomes = TabelaNomes(nomes_offsets, visao[posicao:posicao + tamanho_nomes])
+
+    grafo = GrafoCSR(ids, pos_x, pos_y, offsets, alvos, marcadores, nomes,
+                     ids_consecutivos=bool(marcadores_arquivo & ARQUIVO_IDS_CONSECUTIVOS))
+    return Mapa(grafo, inicio_id, tesouros)
+
+# --- Escolha pelo nome do arquivo ---
+
+def carregar_mapa(caminho_arquivo):
+    if caminho_arquivo.endswith(".json"):
+        return carregar_mapa_json(caminho_arquivo)
+    return carregar_mapa_binario(caminho_arquivo)
+
+def carregar_modelo(caminho_arquivo=None):
+    # O mapa como modelo imutável (grafo congelado), carregado uma vez por
+    # processo e compartilhado por todas as partidas que o usam. Reiniciar
+    # uma partida não relê o arquivo nem refaz os índices guardados no grafo
+    # (componentes, árvores de caminhos, grade espacial). Se o arquivo mudar
+    # no disco, o modelo é carregado de novo
+    if caminho_arquivo is None:
+        chave = assinatura = None
+    else:
+        chave = os.path.abspath(caminho_arquivo)
+        estado = os.stat(chave)
+        assinatura = (estado.st_mtime_ns, estado.st_size)
+    guardado = MODELOS.get(chave)
+    if guardado is not None and guardado[0] == assinatura:
+        return guardado[1]
+    mapa = mapa_padrao() if caminho_arquivo is None else carregar_mapa(caminho_arquivo)
+    mapa.grafo.congelar()
+    MODELOS[chave] = (assinatura, mapa)
+    return mapa
+
+def salvar_mapa(mapa, caminho_arquivo):
+    if caminho_arquivo.endswith(".json"):
+        salvar_mapa_json(mapa, caminho_arquivo)
+    else:
+        salvar_mapa_binario(mapa, caminho_arquivo)
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte mapas entre o formato texto (.json) e o binário (.ctmapa)")
+    parser.add_argument("entrada", help="arquivo de entrada (.json ou .ctmapa)")
+    parser.add_argument("saida", help="arquivo de saída (.json ou .ctmapa)")
+    args = parser.parse_args()
+
+    mapa = carregar_mapa(args.entrada)
+    salvar_mapa(mapa, args.saida)
+    print(f"{args.entrada} -> {args.saida}: {len(mapa.grafo.nos)} locais")
+
+if __name__ == "__main__":
+    main()
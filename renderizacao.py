@@ -0,0 +1,479 @@
+# Desenho do tabuleiro com pygame. As fontes e imagens são criadas apenas
+# na primeira vez que algo é desenhado, então importar este módulo não
+# inicializa o pygame nem abre janela.
+
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+from camera import DETALHE_COMPLETO, DETALHE_MINIMO
+from configuracoes import (LARGURA, ALTURA, PRETO, CINZA, AZUL, VERDE, VERMELHO,
+                           AMARELO, MARROM, MARROM_CLARO)
+from grafo import indexar_caminho
+
+# Preenchidos sob demanda por obter_fontes() e obter_imagens()
+FONTES = {}
+IMAGENS = {}
+
+# Camada estática de cada grafo, junto com a versão do grafo usada para criá-la
+CAMADAS_ESTATICAS = weakref.WeakKeyDictionary()
+
+def obter_fontes():
+    if not FONTES:
+        pygame.font.init()
+        FONTES['pequena'] = pygame.font.SysFont('Arial', 14)
+        FONTES['media'] = pygame.font.SysFont('Arial', 18)
+        FONTES['grande'] = pygame.font.SysFont('Arial', 26)
+        FONTES['titulo'] = pygame.font.SysFont('Arial', 36, bold=True)
+    return FONTES
+
+def obter_imagens():
+    if not IMAGENS:
+        IMAGENS.update(carregar_imagens())
+    return IMAGENS
+
+# Limite de superfícies de texto e de quebras de linha mantidas em cache
+CAPACIDADE_CACHE_TEXTO = 512
+
+class CacheTexto:
+    # Cache LRU de superfícies de texto já renderizadas, indexado por
+    # (fonte, texto, cor), e das quebras de linha de textos longos. Os
+    # contadores permitem conferir que quadros estáveis não rasterizam glifos.
+    def __init__(self, capacidade=CAPACIDADE_CACHE_TEXTO):
+        self.capacidade = capacidade
+        self.superficies = OrderedDict()
+        self.layouts = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.acertos_layout = 0
+        self.falhas_layout = 0
+    
+    def renderizar(self, nome_fonte, texto, cor):
+        chave = (nome_fonte, texto, cor)
+        superficie = self.superficies.get(chave)
+        if superficie is not None:
+            self.acertos += 1
+            self.superficies.move_to_end(chave)
+            return superficie
+        
+        self.falhas += 1
+        superficie = obter_fontes()[nome_fonte].render(texto, True, cor)
+        self.superficies[chave] = superficie
+        if len(self.superficies) > self.capacidade:
+            self.superficies.popitem(last=False)
+        return superficie
+    
+    def quebrar_linhas(self, nome_fonte, texto, largura_max):
+        chave = (nome_fonte, texto, largura_max)
+        linhas = self.layouts.get(chave)
+        if linhas is not None:
+            self.acertos_layout += 1
+            self.layouts.move_to_end(chave)
+            return linhas
+        
+        self.falhas_layout += 1
+        fonte = obter_fontes()[nome_fonte]
+        palavras = texto.split()
+        linhas = []
+        linha_atual = []
+        
+        for palavra in palavras:
+            teste_linha = ' '.join(linha_atual + [palavra])
+            largura_texto = fonte.size(teste_linha)[0]
+            
+            if largura_texto > largura_max:
+                linhas.append(' '.join(linha_atual))
+                linha_atual = [palavra]
+            else:
+                linha_atual.append(palavra)
+        
+        if linha_atual:
+            linhas.append(' '.join(linha_atual))
+        
+        linhas = tuple(linhas)
+        self.layouts[chave] = linhas
+        if len(self.layouts) > self.capacidade:
+            self.layouts.popitem(last=False)
+        return linhas
+    
+    def estatisticas(self):
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'acertos_layout': self.acertos_layout,
+            'falhas_layout': self.falhas_layout,
+            'superficies': len(self.superficies),
+            'layouts': len(self.layouts),
+        }
+
+CACHE_TEXTO = CacheTexto()
+
+def renderizar_texto(nome_fonte, texto, cor):
+    return CACHE_TEXTO.renderizar(nome_fonte, texto, cor)
+
+# Carrega imagens do jogo
+def carregar_imagens():
+    imagens = {}
+    try:
+        # Imagem de fundo
+        imagens['fundo'] = pygame.Surface((LARGURA, ALTURA))
+        imagens['fundo'].fill(MARROM_CLARO)  # Cor base para o fundo
+        
+        # Imagens para os locais - Círculos mais sofisticados por enquanto
+        imagens['local_normal'] = pygame.Surface((60, 60), pygame.SRCALPHA)
+        pygame.draw.circle(imagens['local_normal'], CINZA, (30, 30), 25)
+        pygame.draw.circle(imagens['local_normal'], PRETO, (30, 30), 25, 2)
+        
+        imagens['local_atual'] = pygame.Surface((70, 70), pygame.SRCALPHA)
+        pygame.draw.circle(imagens['local_atual'], AZUL, (35, 35), 30)
+        pygame.draw.circle(imagens['local_atual'], PRETO, (35, 35), 30, 2)
+        
+        imagens['local_tesouro'] = pygame.Surface((60, 60), pygame.SRCALPHA)
+        pygame.draw.circle(imagens['local_tesouro'], VERDE, (30, 30), 25)
+        pygame.draw.circle(imagens['local_tesouro'], PRETO, (30, 30), 25, 2)
+        
+        imagens['local_armadilha'] = pygame.Surface((60, 60), pygame.SRCALPHA)
+        pygame.draw.circle(imagens['local_armadilha'], VERMELHO, (30, 30), 25)
+        pygame.draw.circle(imagens['local_armadilha'], PRETO, (30, 30), 25, 2)
+        
+        imagens['local_visitado'] = pygame.Surface((70, 70), pygame.SRCALPHA)
+        pygame.draw.circle(imagens['local_visitado'], (147, 112, 219), (35, 35), 30)
+        pygame.draw.circle(imagens['local_visitado'], PRETO, (35, 35), 30, 2)
+        
+        imagens['local_fronteira'] = pygame.Surface((70, 70), pygame.SRCALPHA)
+        pygame.draw.circle(imagens['local_fronteira'], (173, 216, 230), (35, 35), 30)
+        pygame.draw.circle(imagens['local_fronteira'], PRETO, (35, 35), 30, 2)
+        
+        imagens['local_caminho'] = pygame.Surface((70, 70), pygame.SRCALPHA)
+        pygame.draw.circle(imagens['local_caminho'], AMARELO, (35, 35), 30)
+        pygame.draw.circle(imagens['local_caminho'], PRETO, (35, 35), 30, 2)
+        
+        imagens['local_explorando'] = pygame.Surface((70, 70), pygame.SRCALPHA)
+        pygame.draw.circle(imagens['local_explorando'], (255, 140, 0), (35, 35), 30)
+        pygame.draw.circle(imagens['local_explorando'], PRETO, (35, 35), 30, 2)
+        
+        # Desenha textura no fundo
+        for i in range(0, LARGURA, 40):
+            for j in range(0, ALTURA, 40):
+                if (i // 40 + j // 40) % 2 == 0:
+                    pygame.draw.rect(imagens['fundo'], (190, 160, 120), (i, j, 40, 40))
+        
+        # Adiciona bordas ao tabuleiro
+        pygame.draw.rect(imagens['fundo'], MARROM, (0, 0, LARGURA, ALTURA), 20)
+        
+        return imagens
+    except Exception as e:
+        print(f"Erro ao carregar imagens: {e}")
+        return {}
+
+def desenhar_no(tela, no, atual=False, caminho=False):
+    imagens = obter_imagens()
+    
+    # Escolhe a imagem correta baseado no estado
+    if atual:
+        img = imagens['local_atual']
+        pos_x = no.pos_x - 35
+        pos_y = no.pos_y - 35
+    elif no.eh_tesouro:
+        img = imagens['local_tesouro']
+        pos_x = no.pos_x - 30
+        pos_y = no.pos_y - 30
+    elif no.eh_armadilha:
+        img = imagens['local_armadilha']
+        pos_x = no.pos_x - 30
+        pos_y = no.pos_y - 30
+    elif caminho:
+        img = imagens['local_caminho']
+        pos_x = no.pos_x - 35
+        pos_y = no.pos_y - 35
+    else:
+        img = imagens['local_normal']
+        pos_x = no.pos_x - 30
+        pos_y = no.pos_y - 30
+    
+    # Desenha a imagem
+    tela.blit(img, (pos_x, pos_y))
+    
+    # Desenha o número do local
+    texto = renderizar_texto('media', str(no.id), PRETO)
+    tela.blit(texto, (no.pos_x - texto.get_width()//2, no.pos_y - texto.get_height()//2))
+
+def desenhar_aresta_pontilhada(superficie, no, vizinho, cor=MARROM):
+    # Linha pontilhada para caminhos normais
+    dx = vizinho.pos_x - no.pos_x
+    dy = vizinho.pos_y - no.pos_y
+    dist = (dx**2 + dy**2)**0.5
+    
+    if dist > 0:
+        dx, dy = dx / dist, dy / dist
+        
+        # Número de pontos na linha pontilhada
+        num_pontos = int(dist / 20)
+        
+        if num_pontos > 1:
+            for i in range(num_pontos):
+                p = i / (num_pontos - 1)
+                x = no.pos_x + dx * dist * p
+                y = no.pos_y + dy * dist * p
+                pygame.draw.circle(superficie, cor, (int(x), int(y)), 3)
+
+def criar_camada_estatica(grafo):
+    # Fundo, arestas pontilhadas e nós sem destaque, desenhados uma única vez
+    camada = obter_imagens()['fundo'].copy()
+    
+    for no_id, vizinhos in grafo.arestas.items():
+        no = grafo.nos[no_id]
+        for vizinho_id in vizinhos:
+            if vizinho_id > no_id:  # Evita desenhar a mesma aresta duas vezes
+                desenhar_aresta_pontilhada(camada, no, grafo.nos[vizinho_id])
+    
+    for no in grafo.nos.values():
+        no.desenhar(camada)
+    
+    return camada
+
+def obter_camada_estatica(grafo):
+    # A camada só é refeita quando o grafo muda (grafo.versao)
+    versao, camada = CAMADAS_ESTATICAS.get(grafo, (None, None))
+    if camada is None or versao != grafo.versao:
+        camada = criar_camada_estatica(grafo)
+        CAMADAS_ESTATICAS[grafo] = (grafo.versao, camada)
+    return camada
+
+def desenhar_grafo(tela, grafo, no_atual=None, caminho=None, visitados=None, fronteira=None, caminho_atual=None, armadilhas_evitadas=None, camera=None):
+    # Com uma câmera deslocada ou com zoom, só a parte visível é desenhada
+    if camera is not None and not camera.eh_identidade():
+        desenhar_grafo_camera(tela, grafo, camera, no_atual, caminho, visitados, fronteira,
+                              caminho_atual, armadilhas_evitadas)
+        return
+    
+    imagens = obter_imagens()
+    
+    # Fundo, arestas pontilhadas e nós comuns já vêm prontos na camada estática
+    tela.blit(obter_camada_estatica(grafo), (0, 0))
+    
+    # Listas viram conjuntos aqui; quem desenha a cada quadro deve passar
+    # IndiceCaminho já montados (veja Jogo.desenhar_tabuleiro)
+    caminho = indexar_caminho(caminho)
+    caminho_atual = indexar_caminho(caminho_atual)
+    
+    # Desenha por cima apenas as arestas destacadas (caminhos do tabuleiro);
+    # o caminho sendo explorado (laranja) tem prioridade sobre o final (amarelo)
+    arestas_destacadas = []
+    if caminho:
+        arestas_destacadas.extend((aresta, AMARELO, 8) for aresta in caminho.arestas
+                                  if not (caminho_atual and aresta in caminho_atual.arestas))
+    if caminho_atual:
+        arestas_destacadas.extend((aresta, (255, 140, 0), 10) for aresta in caminho_atual.arestas)
+    
+    for (no_id, vizinho_id), cor_aresta, espessura in arestas_destacadas:
+        no = grafo.nos[no_id]
+        vizinho = grafo.nos[vizinho_id]
+        pygame.draw.line(tela, cor_aresta, (no.pos_x, no.pos_y), 
+                        (vizinho.pos_x, vizinho.pos_y), espessura)
+    
+    # Redesenha por cima só os nós que têm algum destaque
+    destacados = set()
+    for conjunto in (visitados, fronteira, armadilhas_evitadas):
+        if conjunto:
+            destacados.update(conjunto)
+    for indice in (caminho, caminho_atual):
+        if indice:
+            destacados.update(indice.nos)
+    if no_atual is not None:
+        destacados.add(no_atual)
+    
+    for no_id in sorted(destacados):
+        no = grafo.nos[no_id]
+        
+        # Define estados diferentes para visualização
+        eh_atual = no_atual == no_id
+        eh_caminho = caminho is not None and no_id in caminho.nos
+        eh_visitado = visitados and no_id in visitados
+        eh_fronteira = fronteira and no_id in fronteira
+        eh_caminho_atual = caminho_atual is not None and no_id in caminho_atual.nos
+        eh_armadilha_evitada = armadilhas_evitadas and no_id in armadilhas_evitadas
+        
+        # Desenha círculos extras para visualização dos estados
+        if eh_fronteira and not eh_visitado:
+            tela.blit(imagens['local_fronteira'], (no.pos_x - 35, no.pos_y - 35))
+        
+        if eh_visitado:
+            tela.blit(imagens['local_visitado'], (no.pos_x - 35, no.pos_y - 35))
+        
+        if eh_caminho_atual:
+            tela.blit(imagens['local_explorando'], (no.pos_x - 35, no.pos_y - 35))
+        
+        # Desenha um X para armadilhas evitadas
+        if eh_armadilha_evitada:
+            pygame.draw.circle(tela, (255, 192, 203), (no.pos_x, no.pos_y), no.raio + 12)  # Rosa claro para armadilhas evitadas
+            espessura = 3
+            pygame.draw.line(tela, (139, 0, 0), 
+                            (no.pos_x - no.raio - 5, no.pos_y - no.raio - 5),
+                            (no.pos_x + no.raio + 5, no.pos_y + no.raio + 5), 
+                            espessura)
+            pygame.draw.line(tela, (139, 0, 0), 
+                            (no.pos_x - no.raio - 5, no.pos_y + no.raio + 5),
+                            (no.pos_x + no.raio + 5, no.pos_y - no.raio - 5), 
+                            espessura)
+        
+        # Desenha o nó normalmente
+        no.desenhar(tela, eh_atual, eh_caminho)
+
+# Cores dos destaques, as mesmas das imagens usadas sem câmera
+COR_VISITADO = (147, 112, 219)
+COR_FRONTEIRA = (173, 216, 230)
+COR_EXPLORANDO = (255, 140, 0)
+COR_ARMADILHA_EVITADA = (255, 192, 203)
+
+def segmento_visivel(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
+    # Teste rápido pela caixa do segmento; basta para descartar quase todas
+    # as arestas fora da tela
+    return (min(x1, x2) <= x_max and max(x1, x2) >= x_min and
+            min(y1, y2) <= y_max and max(y1, y2) >= y_min)
+
+def desenhar_grafo_camera(tela, grafo, camera, no_atual=None, caminho=None, visitados=None, fronteira=None,
+                          caminho_atual=None, armadilhas_evitadas=None):
+    # Desenho com câmera: consulta o índice espacial para achar os nós na
+    # área visível e desenha só eles e suas arestas, então o custo depende
+    # do que aparece na tela e não do tamanho do mapa. Com pouco zoom o
+    # nível de detalhe cai: sem números, sem pontilhado e, no mínimo, sem
+    # as arestas comuns.
+    area = pygame.Rect(camera.area)
+    clip_anterior = tela.get_clip()
+    tela.set_clip(area.clip(clip_anterior))
+    tela.fill(MARROM_CLARO, area)
+    
+    caminho = indexar_caminho(caminho)
+    caminho_atual = indexar_caminho(caminho_atual)
+    zoom = camera.zoom
+    detalhe = camera.nivel_detalhe()
+    para_tela = camera.para_tela
+    
+    x_min, y_min, x_max, y_max = camera.retangulo_visivel()
+    maior_aresta = grafo.obter_geometria()[4]
+    raio_borda = 30 + 12  # maior círculo desenhado em volta de um nó
+    
+    # Nós com centro perto o bastante da tela para aparecer nela ou para
+    # ter uma aresta que a cruza
+    candidatos = list(grafo.nos_no_retangulo(x_min, y_min, x_max, y_max, max(maior_aresta, raio_borda)))
+    visiveis = []
+    for no_id in candidatos:
+        no = grafo.nos[no_id]
+        if x_min - raio_borda <= no.pos_x <= x_max + raio_borda and y_min - raio_borda <= no.pos_y <= y_max + raio_borda:
+            visiveis.append(no_id)
+    
+    # Arestas comuns; cada uma é desenhada uma vez, a partir da ponta de
+    # menor id, a não ser que essa ponta não esteja entre os candidatos
+    if detalhe != DETALHE_MINIMO:
+        conjunto_candidatos = set(candidatos)
+        for no_id in candidatos:
+            no = grafo.nos[no_id]
+            for vizinho_id in grafo.arestas[no_id]:
+                if vizinho_id < no_id and vizinho_id in conjunto_candidatos:
+                    continue
+                vizinho = grafo.nos[vizinho_id]
+                if not segmento_visivel(no.pos_x, no.pos_y, vizinho.pos_x, vizinho.pos_y, x_min, y_min, x_max, y_max):
+                    continue
+                inicio = para_tela(no.pos_x, no.pos_y)
+                fim = para_tela(vizinho.pos_x, vizinho.pos_y)
+                if detalhe == DETALHE_COMPLETO:
+                    desenhar_linha_pontilhada(tela, inicio, fim, zoom)
+                else:
+                    pygame.draw.line(tela, MARROM, inicio, fim, 1)
+    
+    # Arestas destacadas; o caminho sendo explorado tem prioridade
+    arestas_destacadas = []
+    if caminho:
+        arestas_destacadas.extend((aresta, AMARELO, 8) for aresta in caminho.arestas
+                                  if not (caminho_atual and aresta in caminho_atual.arestas))
+    if caminho_atual:
+        arestas_destacadas.extend((aresta, COR_EXPLORANDO, 10) for aresta in caminho_atual.arestas)
+    for (no_id, vizinho_id), cor_aresta, espessura in arestas_destacadas:
+        no = grafo.nos[no_id]
+        vizinho = grafo.nos[vizinho_id]
+        if segmento_visivel(no.pos_x, no.pos_y, vizinho.pos_x, vizinho.pos_y, x_min, y_min, x_max, y_max):
+            pygame.draw.line(tela, cor_aresta, para_tela(no.pos_x, no.pos_y), para_tela(vizinho.pos_x, vizinho.pos_y),
+                             max(1, int(espessura * zoom)))
+    
+    # Nós visíveis, com o estado de cada um consultado nos conjuntos
+    for no_id in sorted(visiveis):
+        no = grafo.nos[no_id]
+        centro = para_tela(no.pos_x, no.pos_y)
+        raio = max(1, int(no.raio * zoom))
+        raio_destaque = max(1, int((no.raio + 5) * zoom))
+        
+        eh_atual = no_atual == no_id
+        eh_caminho = caminho is not None and no_id in caminho.nos
+        eh_visitado = visitados and no_id in visitados
+        eh_fronteira = fronteira and no_id in fronteira
+        eh_caminho_atual = caminho_atual is not None and no_id in caminho_atual.nos
+        eh_armadilha_evitada = armadilhas_evitadas and no_id in armadilhas_evitadas
+        
+        if detalhe == DETALHE_MINIMO:
+            # Um quadrado de poucos pixels na cor mais importante do nó
+            if eh_atual:
+                cor = AZUL
+            elif eh_caminho_atual:
+                cor = COR_EXPLORANDO
+            elif no.eh_tesouro or no.eh_armadilha:
+                cor = no.cor
+            elif eh_caminho:
+                cor = AMARELO
+            elif eh_visitado:
+                cor = COR_VISITADO
+            elif eh_fronteira:
+                cor = COR_FRONTEIRA
+            else:
+                cor = CINZA
+            lado = max(2, raio)
+            tela.fill(cor, (centro[0] - lado // 2, centro[1] - lado // 2, lado, lado))
+            continue
+        
+        if eh_fronteira and not eh_visitado:
+            pygame.draw.circle(tela, COR_FRONTEIRA, centro, raio_destaque)
+        if eh_visitado:
+            pygame.draw.circle(tela, COR_VISITADO, centro, raio_destaque)
+        if eh_caminho_atual:
+            pygame.draw.circle(tela, COR_EXPLORANDO, centro, raio_destaque)
+        if eh_armadilha_evitada:
+            pygame.draw.circle(tela, COR_ARMADILHA_EVITADA, centro, max(1, int((no.raio + 12) * zoom)))
+            braco = int((no.raio + 5) * zoom)
+            espessura = max(1, int(3 * zoom))
+            pygame.draw.line(tela, (139, 0, 0), (centro[0] - braco, centro[1] - braco),
+                             (centro[0] + braco, centro[1] + braco), espessura)
+            pygame.draw.line(tela, (139, 0, 0), (centro[0] - braco, centro[1] + braco),
+                             (centro[0] + braco, centro[1] - braco), espessura)
+        
+        # O nó em si, com as mesmas cores de desenhar_no
+        if eh_atual:
+            cor, raio_no = AZUL, raio_destaque
+        elif no.eh_tesouro or no.eh_armadilha:
+            cor, raio_no = no.cor, raio
+        elif eh_caminho:
+            cor, raio_no = AMARELO, raio_destaque
+        else:
+            cor, raio_no = CINZA, raio
+        pygame.draw.circle(tela, cor, centro, raio_no)
+        if detalhe == DETALHE_COMPLETO:
+            pygame.draw.circle(tela, PRETO, centro, raio_no, max(1, int(2 * zoom)))
+            texto = renderizar_texto('media', str(no.id), PRETO)
+            tela.blit(texto, (centro[0] - texto.get_width() // 2, centro[1] - texto.get_height() // 2))
+    
+    # Mesma moldura do fundo usado sem câmera
+    pygame.draw.rect(tela, MARROM, area, 20)
+    tela.set_clip(clip_anterior)
+
+def desenhar_linha_pontilhada(tela, inicio, fim, zoom, cor=MARROM):
+    # Como desenhar_aresta_pontilhada, mas em coordenadas de tela, com o
+    # espaçamento e o tamanho dos pontos acompanhando o zoom
+    dx = fim[0] - inicio[0]
+    dy = fim[1] - inicio[1]
+    dist = (dx**2 + dy**2)**0.5
+    num_pontos = int(dist / (20 * zoom))
+    if num_pontos > 1:
+        raio = max(1, int(3 * zoom))
+        for i in range(num_pontos):
+            p = i / (num_pontos - 1)
+            pygame.draw.circle(tela, cor, (int(inicio[0] + dx * p), int(inicio[1] + dy * p)), raio)
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# Reprodução de sessões gravadas com "jogo_caca_tesouro_pygame.py --gravar"
+# (formato em gravacao.py). Os registros são lidos do arquivo aos poucos e
+# aplicados a um Jogo como se o jogador repetisse as ações: cada partida,
+# movimento e busca acontece de novo, e os eventos, passos e caminho de
+# cada busca refeita são conferidos com os gravados. Qualquer diferença é
+# uma divergência, o que faz das gravações testes de regressão das buscas
+# em mapas grandes.
+#
+# Com janela, a sessão é mostrada no ritmo gravado multiplicado por
+# --velocidade (ou o mais rápido possível com --maximo). Com --sem-janela,
+# nada é desenhado e cada busca roda até o fim assim que é pedida. Com
+# --a-partir-de, as partidas, movimentos e caminhos anteriores ao instante
+# são aplicados sem refazer as buscas, pulando os logs de eventos no arquivo.
+#
+# Uso: python reproducao.py sessao.ctgrav [--mapa caverna.ctmapa] [--velocidade 4]
+#          [--maximo] [--sem-janela] [--a-partir-de 600]
+
+import argparse
+import sys
+import time
+
+import pygame
+
+from configuracoes import ALTURA, LARGURA, TITULO_JANELA
+from gravacao import (LeitorGravacao, REGISTRO_BUSCA, REGISTRO_EVENTOS, REGISTRO_FIM_BUSCA,
+                      REGISTRO_MOVIMENTO, REGISTRO_PARTIDA, REGISTRO_PASSOS)
+from jogo_caca_tesouro_pygame import ESTADOS_ANIMACAO, QUADROS_POR_SEGUNDO, Jogo
+
+# Divergências guardadas com detalhes (as demais só são contadas)
+MAXIMO_DIVERGENCIAS_GUARDADAS = 20
+
+class ReproducaoSessao:
+    def __init__(self, jogo, leitor, inicio_ms=0):
+        # jogo deve ter sido criado com o mapa da gravação (veja criar_jogo)
+        self.jogo = jogo
+        self.leitor = leitor
+        self.divergencias = []
+        self.total_divergencias = 0
+        self.registros_aplicados = 0
+        self.movimentos = 0
+        self.buscas = 0
+        self.eventos_conferidos = 0
+        # A primeira partida gravada é a do próprio jogo recém-criado
+        self.jogo_novo = True
+        # Busca gravada que está sendo refeita e conferida
+        self.busca_ao_vivo = False
+        self.busca_divergiu = False
+        self.eventos_da_busca = 0
+        self.passos_da_busca = 0
+
+        self.registros = iter(())
+        posicao = self.pular_para(inicio_ms) if inicio_ms > 0 else None
+        if posicao is not False:
+            self.registros = leitor.registros(posicao=posicao)
+        self.proximo = next(self.registros, None)
+
+    def divergir(self, registro, descricao):
+        self.total_divergencias += 1
+        if len(self.divergencias) < MAXIMO_DIVERGENCIAS_GUARDADAS:
+            self.divergencias.append(f"{registro.tempo_ms / 1000:.3f} s: {descricao}")
+
+    def pular_para(self, inicio_ms):
+        # Aplica só o estado (partidas, movimentos e caminhos encontrados)
+        # gravado antes de inicio_ms e devolve a posição de onde a reprodução
+        # continua, ou False se a gravação termina antes. Um reinício apaga
+        # tudo o que veio antes, então a leitura começa na última partida
+        # anterior a inicio_ms, achada no índice da gravação
+        jogo = self.jogo
+        posicao = self.leitor.posicao_da_partida(inicio_ms)
+        for registro in self.leitor.registros(tipos={REGISTRO_PARTIDA, REGISTRO_MOVIMENTO, REGISTRO_FIM_BUSCA},
+                                              posicao=posicao):
+            if registro.tempo_ms >= inicio_ms:
+                return registro.posicao
+            if registro.tipo == REGISTRO_PARTIDA:
+                self.aplicar_partida(registro)
+            elif registro.tipo == REGISTRO_MOVIMENTO:
+                self.aplicar_movimento(registro)
+            elif registro.tipo == REGISTRO_FIM_BUSCA:
+                jogo.caminho_atual = registro.dados[0]
+                jogo.botoes["seguir"].ativo = bool(jogo.caminho_atual) and jogo.estado == "JOGANDO"
+        return False
+
+    def aplicar_partida(self, registro):
+        num_nos, inicio_id, _ = registro.dados
+        if not self.jogo_novo:
+            self.jogo.reiniciar()
+        self.jogo_novo = False
+        self.busca_ao_vivo = False
+        if num_nos != len(self.jogo.grafo.nos) or inicio_id != self.jogo.no_inicio_id:
+            self.divergir(registro, f"mapa diferente: gravado com {num_nos} locais e início {inicio_id}")
+
+    def aplicar_movimento(self, registro):
+        no_id = registro.dados[0]
+        if self.jogo.mover_para(no_id):
+            self.movimentos += 1
+        else:
+            self.divergir(registro, f"movimento impossível de {self.jogo.no_atual_id} para {no_id}")
+
+    def aplicar(self, registro):
+        # Aplica o registro ao jogo; devolve False se ele precisa esperar a
+        # busca ou a animação em andamento (e deve ser aplicado de novo depois)
+        jogo = self.jogo
+        tipo = registro.tipo
+
+        if tipo in (REGISTRO_EVENTOS, REGISTRO_PASSOS, REGISTRO_FIM_BUSCA):
+            # Logs de uma busca que começou antes do ponto de partida não
+            # têm busca refeita para conferir
+            if self.busca_ao_vivo and not self.conferir_busca(registro):
+                return False
+        elif jogo.estado in ESTADOS_ANIMACAO and tipo != REGISTRO_PARTIDA:
+            # Durante a gravação as ações só vieram depois do fim da animação
+            if not jogo.avanco_rapido:
+                jogo.iniciar_avanco_rapido()
+            return False
+        elif tipo == REGISTRO_PARTIDA:
+            self.aplicar_partida(registro)
+        elif tipo == REGISTRO_MOVIMENTO:
+            self.aplicar_movimento(registro)
+        elif tipo == REGISTRO_BUSCA:
+            algoritmo, inicio_id, destino_id = registro.dados
+            if jogo.no_atual_id != inicio_id:
+                self.divergir(registro, f"busca {algoritmo} a partir de {jogo.no_atual_id}, gravada a partir de {inicio_id}")
+            jogo.calcular_caminho(algoritmo)
+            self.buscas += 1
+            if jogo.passos_busca is None:
+                # Recusada sem buscar (nenhum tesouro alcançável); os logs
+                # gravados desta busca não têm com o que ser conferidos
+                self.divergir(registro, f"busca {algoritmo} recusada: nenhum tesouro alcançável de {jogo.no_atual_id}")
+                self.busca_ao_vivo = False
+                self.registros_aplicados += 1
+                return True
+            if jogo.no_tesouro_id != destino_id:
+                self.divergir(registro, f"busca {algoritmo} até {jogo.no_tesouro_id}, gravada até {destino_id}")
+            self.busca_ao_vivo = True
+            self.busca_divergiu = False
+            self.eventos_da_busca = 0
+            self.passos_da_busca = 0
+
+        self.registros_aplicados += 1
+        return True
+
+    def conferir_busca(self, registro):
+        # Compara um trecho gravado com o histórico da busca refeita; só a
+        # primeira diferença de cada busca é registrada
+        jogo = self.jogo
+        historico = jogo.historico_busca
+        rodando = jogo.passos_busca is not None
+
+        if registro.tipo == REGISTRO_FIM_BUSCA:
+            if rodando:
+                return False
+            self.busca_ao_vivo = False
+            caminho = registro.dados[0]
+            if caminho != jogo.caminho_atual and not self.busca_divergiu:
+                self.divergir(registro, f"caminho diferente: {len(caminho or [])} locais gravados, "
+                                        f"{len(jogo.caminho_atual or [])} agora")
+            return True
+
+        if registro.tipo == REGISTRO_EVENTOS:
+            tipos, nos = registro.dados
+            inicio = self.eventos_da_busca
+            fim = inicio + len(tipos)
+            if len(historico.tipos) < fim and rodando:
+                return False
+            iguais = historico.tipos[inicio:fim] == tipos and historico.nos[inicio:fim] == nos
+            self.eventos_da_busca = fim
+            self.eventos_conferidos += len(tipos)
+            descricao = f"eventos {inicio} a {fim - 1} da busca diferentes"
+        else:
+            fim_passo, passo_no, passo_pai = registro.dados
+            inicio = self.passos_da_busca
+            fim = inicio + len(fim_passo)
+            if len(historico) < fim and rodando:
+                return False
+            iguais = (historico.fim_passo[inicio:fim] == fim_passo and historico.passo_no[inicio:fim] == passo_no
+                      and historico.passo_pai[inicio:fim] == passo_pai)
+            self.passos_da_busca = fim
+            descricao = f"passos {inicio} a {fim - 1} da busca diferentes"
+
+        if not iguais and not self.busca_divergiu:
+            self.busca_divergiu = True
+            self.divergir(registro, descricao)
+        return True
+
+    def avancar(self):
+        # Passa ao registro seguinte do arquivo
+        self.proximo = next(self.registros, None)
+
+    def concluir_busca(self):
+        # Roda a busca em andamento e a animação até o fim, sem esperar
+        jogo = self.jogo
+        jogo.avanco_rapido = True
+        while jogo.estado in ESTADOS_ANIMACAO:
+            jogo.atualizar_animacao()
+
+    def reproduzir_sem_janela(self):
+        # O mais rápido possível: cada busca roda inteira assim que é pedida
+        while self.proximo is not None:
+            if self.aplicar(self.proximo):
+                self.avancar()
+            else:
+                self.concluir_busca()
+        self.concluir_busca()
+
+    def reproduzir_em_janela(self, tela, velocidade=None):
+        # Mostra a sessão no ritmo gravado vezes velocidade (None = o mais
+        # rápido possível, ainda desenhando). Cliques no tabuleiro e nos
+        # botões são ignorados; câmera e painel de desempenho funcionam
+        jogo = self.jogo
+        if velocidade is not None:
+            jogo.intervalo_animacao = max(1, int(jogo.intervalo_animacao / velocidade))
+        clock = pygame.time.Clock()
+        inicio_relogio = pygame.time.get_ticks()
+        inicio_gravacao = self.proximo.tempo_ms if self.proximo is not None else 0
+
+        while self.proximo is not None or jogo.estado in ESTADOS_ANIMACAO:
+            for evento in pygame.event.get():
+                if evento.type == pygame.QUIT:
+                    return False
+                if evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 1:
+                    continue
+                jogo.processar_evento(evento)
+
+            if velocidade is None:
+                tempo_gravacao = float("inf")
+            else:
+                tempo_gravacao = inicio_gravacao + (pygame.time.get_ticks() - inicio_relogio) * velocidade
+            while self.proximo is not None and self.proximo.tempo_ms <= tempo_gravacao:
+                if not self.aplicar(self.proximo):
+                    break
+                self.avancar()
+
+            jogo.atualizar_animacao()
+            retangulos = jogo.desenhar(tela)
+            if retangulos:
+                pygame.display.update(retangulos)
+            clock.tick(QUADROS_POR_SEGUNDO)
+        return True
+
+    def resumo(self):
+        return (f"{self.registros_aplicados} registros, {self.movimentos} movimentos, {self.buscas} buscas, "
+                f"{self.eventos_conferidos} eventos conferidos, {self.total_divergencias} divergências")
+
+def primeira_partida(leitor):
+    # Dados (num_nos, inicio_id, arquivo_mapa) do primeiro registro de partida
+    for registro in leitor.registros(tipos={REGISTRO_PARTIDA}):
+        if registro.tipo == REGISTRO_PARTIDA:
+            return registro.dados
+    raise ValueError(f"{leitor.caminho_arquivo}: gravação sem partida")
+
+def criar_jogo(leitor, arquivo_mapa=None):
+    # Jogo com o mapa da gravação (ou arquivo_mapa, se dado; "padrao" é o original)
+    if arquivo_mapa is None:
+        arquivo_mapa = primeira_partida(leitor)[2]
+    elif arquivo_mapa == "padrao":
+        arquivo_mapa = None
+    return Jogo(arquivo_mapa)
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduz uma sessão gravada com --gravar e confere as buscas")
+    parser.add_argument("gravacao", help="arquivo .ctgrav")
+    parser.add_argument("--mapa", default=None, help="mapa a usar em vez do gravado ('padrao' usa o original)")
+    parser.add_argument("--velocidade", type=float, default=1.0, help="multiplica o ritmo gravado")
+    parser.add_argument("--maximo", action="store_true", help="reproduz o mais rápido possível")
+    parser.add_argument("--sem-janela", action="store_true", help="não abre janela (implica --maximo)")
+    parser.add_argument("--a-partir-de", type=float, default=0, help="começa neste instante da gravação (segundos)")
+    args = parser.parse_args()
+    if args.velocidade <= 0:
+        parser.error("--velocidade precisa ser positiva")
+
+    leitor = LeitorGravacao(args.gravacao)
+    jogo = criar_jogo(leitor, args.mapa)
+    inicio = time.perf_counter()
+    reproducao = ReproducaoSessao(jogo, leitor, int(args.a_partir_de * 1000))
+
+    if args.sem_janela:
+        reproducao.reproduzir_sem_janela()
+    else:
+        pygame.init()
+        tela = pygame.display.set_mode((LARGURA, ALTURA))
+        pygame.display.set_caption(f"{TITULO_JANELA} - reprodução")
+        reproducao.reproduzir_em_janela(tela, None if args.maximo else args.velocidade)
+        pygame.quit()
+
+    print(f"{reproducao.resumo()} em {time.perf_counter() - inicio:.2f} s")
+    for divergencia in reproducao.divergencias:
+        print(f"  {divergencia}")
+    sys.exit(1 if reproducao.total_divergencias else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# Servidor de caminhos: um processo carrega o mapa uma vez e responde, por um
+# socket local, às consultas de vários clientes leves (quiosques, bots...),
+# em vez de cada um carregar o mapa e buscar por conta própria.
+#
+# Protocolo: JSON Lines nos dois sentidos. Cada pedido leva um "id" escolhido
+# pelo cliente, que volta na resposta. Um cliente pode mandar vários pedidos
+# sem esperar as respostas, que chegam na ordem em que ficam prontas (não na
+# dos pedidos); assim uma conexão basta para muitas consultas simultâneas.
+#
+#   {"id": 1, "tipo": "caminho", "inicio": 1, "destino": 15, "algoritmo": "bfs"}
+#   {"id": 1, "inicio": 1, "destino": 15, "passos": 5, "custo": 1019.2, "caminho": [1, ...]}
+#
+#   {"id": 2, "tipo": "caminho", "inicio": 1, "destino": "*"}   tesouro mais próximo
+#   {"id": 3, "tipo": "movimento", "de": 1, "para": 2}
+#   {"id": 3, "valido": true, "armadilha": false, "tesouro": false}
+#   {"id": 4, "tipo": "mapa"}
+#   {"id": 4, "locais": 15, "inicio": 1, "tesouros": [15]}
+#   {"id": 5, "tipo": "estatisticas"}
+#   {"id": 5, "pedidos": 812, "buscas": 40, "agrupados": 700, "recusados": 72, "conexoes": 3}
+#
+# "algoritmo" é um dos de buscas_em_lote.py (padrão bfs); "sem_caminho": true
+# omite a lista de locais. Sem caminho, "passos" é null. Erros voltam como
+# {"id": ..., "erro": "..."}; uma linha maior que 64 KiB recebe
+# {"id": null, "erro": "pedido muito longo"} e encerra a conexão.
+# "movimento" segue as regras de Jogo.mover_para: válido se os locais forem
+# vizinhos, e indica se o destino é armadilha ou tesouro.
+#
+# As buscas rodam em buscas_em_lote.resolver_consulta num executor, fora do
+# laço de eventos. Por padrão é um ProcessPoolExecutor com um processo por
+# CPU (--processos N muda o número), como em buscas_em_lote.executar: cada
+# processo carrega o mapa uma vez, e com .ctmapa eles compartilham o
+# arquivo mapeado. As buscas são Python puro, então em threads uma busca
+# longa seguraria o GIL e o laço de eventos junto; --threads usa threads
+# sobre o mesmo Grafo do servidor mesmo assim, o que só compensa em mapas
+# pequenos (sem cópia dos resultados entre processos). Pedidos iguais que chegam
+# enquanto a mesma busca está em andamento esperam por ela em vez de
+# repeti-la. Destinos inalcançáveis são respondidos na hora pelo índice de
+# componentes (Grafo.alcancavel), sem ocupar o executor.
+#
+# Uso: python servidor_caminhos.py mapa.ctmapa [--porta 8765 | --unix /tmp/caca.sock]
+#          [--processos 4 | --threads]
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from buscas_em_lote import ALGORITMOS, TODOS, iniciar_processo, resolver_consulta
+from mapas import carregar_modelo
+
+ENDERECO = "127.0.0.1"
+PORTA_PADRAO = 8765
+# Pedidos de uma mesma conexão sendo respondidos ao mesmo tempo; a conexão
+# só é lida de novo quando algum termina
+PEDIDOS_POR_CONEXAO = 64
+
+def eh_id(valor):
+    # true/false do JSON viram bool, que é subclasse de int (True == 1)
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+class ServidorCaminhos:
+    def __init__(self, mapa, executor, mapa_no_executor=False):
+        # Com mapa_no_executor, os processos do executor já têm o mapa
+        # (iniciar_processo) e ele não é enviado junto com cada busca
+        self.mapa = mapa
+        self.executor = executor
+        self.mapa_no_executor = mapa_no_executor
+        # (inicio, destino, busca, incluir_caminho) -> Future da busca em andamento
+        self.em_andamento = {}
+        self.pedidos = 0
+        self.buscas = 0
+        self.agrupados = 0
+        self.recusados = 0
+        self.conexoes = 0
+
+    async def atender(self, leitor, escritor):
+        # Uma conexão: cada linha vira uma tarefa, para que um pedido lento
+        # não segure os seguintes
+        self.conexoes += 1
+        vagas = asyncio.Semaphore(PEDIDOS_POR_CONEXAO)
+        tarefas = set()
+        try:
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except ValueError:
+                    # Linha maior que o limite do leitor: o resto dela não
+                    # dá para separar do pedido seguinte, então a conexão
+                    # é encerrada depois das respostas pendentes
+                    escritor.write(json.dumps({"id": None, "erro": "pedido muito longo"}).encode() + b"\n")
+                    break
+                if not linha:
+                    break
+                await vagas.acquire()
+                tarefa = asyncio.create_task(self.responder(linha, escritor, vagas))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+            # O cliente pode fechar a escrita e ainda esperar as respostas
+            await asyncio.gather(*tarefas, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+            escritor.close()
+
+    async def responder(self, linha, escritor, vagas):
+        try:
+            pedido = None
+            try:
+                pedido = json.loads(linha)
+                if not isinstance(pedido, dict):
+                    raise ValueError("o pedido deve ser um objeto JSON")
+                resposta = await self.resolver(pedido)
+            except (ValueError, KeyError, TypeError) as erro:
+                resposta = {"erro": str(erro)}
+            resposta = {"id": pedido.get("id") if isinstance(pedido, dict) else None, **resposta}
+            escritor.write(json.dumps(resposta).encode() + b"\n")
+            await escritor.drain()
+        finally:
+            vagas.release()
+
+    async def resolver(self, pedido):
+        self.pedidos += 1
+        tipo = pedido.get("tipo")
+        if tipo == "caminho":
+            return await self.caminho(pedido)
+        if tipo == "movimento":
+            return self.movimento(pedido)
+        if tipo == "mapa":
+            return {"locais": len(self.mapa.grafo.nos), "inicio": self.mapa.inicio_id, "tesouros": list(self.mapa.tesouros)}
+        if tipo == "estatisticas":
+            return self.estatisticas()
+        raise ValueError(f"tipo de pedido desconhecido: {tipo!r}")
+
+    async def caminho(self, pedido):
+        algoritmo = pedido.get("algoritmo", "bfs")
+        if algoritmo not in ALGORITMOS:
+            raise ValueError(f"algoritmo desconhecido: {algoritmo!r}")
+        inicio_id = pedido.get("inicio")
+        destino_id = pedido.get("destino")
+        if not eh_id(inicio_id) or not (eh_id(destino_id) or destino_id == TODOS):
+            raise ValueError(f"'inicio' deve ser um id e 'destino' um id ou '{TODOS}'")
+        incluir_caminho = not pedido.get("sem_caminho", False)
+
+        # Sem caminho possível: responde sem buscar
+        grafo = self.mapa.grafo
+        destinos = self.mapa.tesouros if destino_id == TODOS else [destino_id]
+        if (inicio_id in grafo.nos and all(no_id in grafo.nos for no_id in destinos)
+                and not any(grafo.alcancavel(inicio_id, no_id) for no_id in destinos)):
+            self.recusados += 1
+            resposta = {"inicio": inicio_id, "destino": None if destino_id == TODOS else destino_id,
+                        "passos": None, "custo": None}
+            if incluir_caminho:
+                resposta["caminho"] = None
+            return resposta
+
+        chave = (inicio_id, destino_id, ALGORITMOS[algoritmo], incluir_caminho)
+        futuro = self.em_andamento.get(chave)
+        if futuro is None:
+            argumentos = chave if self.mapa_no_executor else chave + (None, self.mapa)
+            futuro = asyncio.get_running_loop().run_in_executor(self.executor, resolver_consulta, None, *argumentos)
+            self.em_andamento[chave] = futuro
+            futuro.add_done_callback(lambda _: self.em_andamento.pop(chave, None))
+            self.buscas += 1
+        else:
+            self.agrupados += 1
+        # shield: se este cliente desconectar, a busca continua para os demais
+        resultado = (await asyncio.shield(futuro))[0]
+        return {campo: valor for campo, valor in resultado.items() if campo != "consulta"}
+
+    def movimento(self, pedido):
+        grafo = self.mapa.grafo
+        de_id = pedido.get("de")
+        para_id = pedido.get("para")
+        if not eh_id(de_id) or not eh_id(para_id) or de_id not in grafo.nos or para_id not in grafo.nos:
+            raise ValueError("local inexistente")
+        no = grafo.nos[para_id]
+        return {"valido": para_id in grafo.arestas[de_id], "armadilha": no.eh_armadilha, "tesouro": no.eh_tesouro}
+
+    def estatisticas(self):
+        return {"pedidos": self.pedidos, "buscas": self.buscas, "agrupados": self.agrupados,
+                "recusados": self.recusados, "conexoes": self.conexoes}
+
+def criar_executor(caminho_mapa, processos=None, threads=False):
+    # Devolve o executor das buscas e se ele já tem o mapa (veja
+    # ServidorCaminhos)
+    if threads:
+        return ThreadPoolExecutor(), False
+    executor = ProcessPoolExecutor(max_workers=processos or os.cpu_count() or 1,
+                                   initializer=iniciar_processo, initargs=(caminho_mapa,))
+    return executor, True
+
+async def servir(servidor, porta=PORTA_PADRAO, caminho_unix=None):
+    if caminho_unix is not None:
+        socket = await asyncio.start_unix_server(servidor.atender, path=caminho_unix)
+        print(f"servindo em {caminho_unix}", file=sys.stderr)
+    else:
+        socket = await asyncio.start_server(servidor.atender, ENDERECO, porta)
+        print(f"servindo em {ENDERECO}:{porta}", file=sys.stderr)
+    async with socket:
+        await socket.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de consultas de caminho sobre um mapa carregado uma vez")
+    parser.add_argument("mapa", help="arquivo de mapa (.json ou .ctmapa); 'padrao' usa o mapa original")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help=f"porta TCP em {ENDERECO}")
+    parser.add_argument("--unix", default=None, help="caminho de um socket Unix, em vez da porta TCP")
+    parser.add_argument("--processos", type=int, default=None, help="processos para as buscas (padrão: um por CPU)")
+    parser.add_argument("--threads", action="store_true",
+                        help="buscas em threads sobre o mapa do servidor, em vez de processos")
+    args = parser.parse_args()
+    if args.threads and args.processos is not None:
+        parser.error("--threads e --processos não podem ser usados juntos")
+
+    caminho_mapa = None if args.mapa == "padrao" else args.mapa
+    mapa = carregar_modelo(caminho_mapa)
+    mapa.grafo.obter_componentes()
+    executor, mapa_no_executor = criar_executor(caminho_mapa, args.processos, args.threads)
+    servidor = ServidorCaminhos(mapa, executor, mapa_no_executor)
+    # SIGTERM (kill, gerenciadores de serviço) encerra como o Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(servir(servidor, args.porta, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(cancel_futures=True)
+        estatisticas = servidor.estatisticas()
+        print(f"{estatisticas['pedidos']} pedidos, {estatisticas['buscas']} buscas, "
+              f"{estatisticas['agrupados']} agrupados com uma busca em andamento, "
+              f"{estatisticas['recusados']} sem caminho respondidos na hora", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
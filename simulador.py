@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# Simulação de partidas sem interface (Monte Carlo): agentes programados
+# jogam milhares ou milhões de partidas num mapa, com as regras de
+# Jogo.mover_para e Jogo.seguir_caminho, para avaliar onde ficam as
+# armadilhas. Nada é desenhado e o pygame não é importado.
+#
+# Agentes:
+#   aleatorio    anda para um vizinho qualquer, sem enxergar as armadilhas
+#   guloso       vai para o vizinho mais perto, em linha reta, do tesouro
+#                mais próximo, preferindo locais ainda não visitados; também
+#                não enxerga as armadilhas
+#   seguir_bfs   pede o caminho mais curto e usa "Seguir Caminho" até o
+#                fim, como quem joga pelos botões
+#
+# Cada partida começa no início do mapa (ou num local livre sorteado, com
+# --inicio-aleatorio) e termina em vitória, derrota (caiu numa armadilha) ou
+# sem desfecho (limite de passos; para seguir_bfs, nenhum caminho). As
+# partidas são divididas em lotes e distribuídas por um ProcessPoolExecutor,
+# como em buscas_em_lote.py: cada processo carrega o mapa uma única vez e
+# cada lote devolve estatísticas já agregadas (contagens, soma e soma dos
+# quadrados dos passos, derrotas por armadilha), que o processo principal
+# junta e mostra enquanto a simulação roda. O sorteio de um lote depende só
+# da semente, do agente e da primeira partida do lote, então o resultado não
+# muda com o número de processos.
+#
+# Uso: python simulador.py mapa.ctmapa [--agentes aleatorio,guloso,seguir_bfs]
+#          [--partidas 100000] [--passos-maximos 1000] [--processos 4]
+#          [--lote 2000] [--semente 1] [--inicio-aleatorio] [--saida resultado.json]
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from grafo import indexar_caminho
+from mapas import carregar_modelo
+
+PARTIDAS_POR_LOTE = 2000
+PASSOS_MAXIMOS = 1000
+# Intervalo entre as linhas de progresso, em segundos
+INTERVALO_PROGRESSO = 1.0
+# Armadilhas listadas no resumo de cada agente
+ARMADILHAS_NO_RESUMO = 5
+
+# Mapa do processo atual, carregado por iniciar_processo
+_mapa = None
+
+def iniciar_processo(caminho_mapa):
+    global _mapa
+    _mapa = carregar_modelo(caminho_mapa)
+
+class PartidaSimulada:
+    # O estado de Jogo que as regras usam, sem interface nem animação
+    def __init__(self, mapa):
+        self.grafo = mapa.grafo
+        self.tesouros = list(mapa.tesouros)
+        self.reiniciar(mapa.inicio_id)
+
+    def reiniciar(self, inicio_id):
+        self.no_atual_id = inicio_id
+        self.estado = "JOGANDO"
+        self.caminho_atual = None
+        self.indice_caminho = None
+        self.passos = 0
+
+    def mover_para(self, no_id):
+        # As regras de Jogo.mover_para
+        if no_id not in self.grafo.arestas[self.no_atual_id]:
+            return False
+        self.no_atual_id = no_id
+        self.passos += 1
+        no = self.grafo.nos[no_id]
+        if no.eh_armadilha:
+            self.estado = "DERROTA"
+        elif no.eh_tesouro:
+            self.estado = "VITORIA"
+        return True
+
+    def calcular_caminho_bfs(self):
+        # Jogo.calcular_caminho("BFS") sem animação. O caminho sai da árvore
+        # de caminhos até os tesouros, montada uma vez por mapa: tem o mesmo
+        # número de passos que o da BFS (só o desempate entre caminhos
+        # igualmente curtos pode mudar) e é None se nenhum tesouro for
+        # alcançável
+        self.definir_caminho(self.grafo.arvore_ate(*self.tesouros).caminho(self.no_atual_id))
+
+    def definir_caminho(self, caminho):
+        self.caminho_atual = caminho
+        self.indice_caminho = indexar_caminho(caminho)
+
+    def seguir_caminho(self):
+        # As regras de Jogo.seguir_caminho; devolve False quando o botão
+        # ficaria desativado (sem caminho ou no fim dele)
+        if not self.caminho_atual or len(self.caminho_atual) <= 1:
+            return False
+        posicao = self.indice_caminho.posicoes.get(self.no_atual_id)
+        if posicao is None:
+            # Fora do caminho: segue a árvore de caminhos até o tesouro
+            rota = self.grafo.arvore_ate(*self.tesouros)
+            if rota.proximo(self.no_atual_id) is None:
+                return False
+            self.definir_caminho(rota.caminho(self.no_atual_id))
+            self.mover_para(rota.proximo(self.no_atual_id))
+        elif posicao + 1 < len(self.caminho_atual):
+            self.mover_para(self.caminho_atual[posicao + 1])
+        else:
+            return False
+        return self.estado == "JOGANDO"
+
+# --- Agentes: jogam uma partida até o fim ou até passos_maximos ---
+
+def jogar_aleatorio(partida, aleatorio, passos_maximos):
+    arestas = partida.grafo.arestas
+    while partida.estado == "JOGANDO" and partida.passos < passos_maximos:
+        vizinhos = arestas[partida.no_atual_id]
+        if not vizinhos:
+            return
+        partida.mover_para(aleatorio.choice(vizinhos))
+
+def jogar_guloso(partida, aleatorio, passos_maximos):
+    grafo = partida.grafo
+    alvos = [(grafo.nos[tesouro_id].pos_x, grafo.nos[tesouro_id].pos_y) for tesouro_id in partida.tesouros]
+
+    def distancia_ao_tesouro(no_id):
+        no = grafo.nos[no_id]
+        return min(math.hypot(x - no.pos_x, y - no.pos_y) for x, y in alvos)
+
+    visitados = {partida.no_atual_id}
+    while partida.estado == "JOGANDO" and partida.passos < passos_maximos:
+        vizinhos = grafo.arestas[partida.no_atual_id]
+        if not vizinhos:
+            return
+        novos = [vizinho for vizinho in vizinhos if vizinho not in visitados]
+        if novos:
+            # O sorteio só desempata vizinhos à mesma distância
+            proximo = min(novos, key=lambda no_id: (distancia_ao_tesouro(no_id), aleatorio.random()))
+        else:
+            # Sem vizinhos novos, volta por um caminho qualquer
+            proximo = aleatorio.choice(vizinhos)
+        visitados.add(proximo)
+        partida.mover_para(proximo)
+
+def jogar_seguir_bfs(partida, aleatorio, passos_maximos):
+    partida.calcular_caminho_bfs()
+    while partida.passos < passos_maximos and partida.seguir_caminho():
+        pass
+
+AGENTES = {
+    "aleatorio": jogar_aleatorio,
+    "guloso": jogar_guloso,
+    "seguir_bfs": jogar_seguir_bfs,
+}
+
+# --- Estatísticas ---
+
+class Estatistica:
+    # Contagem, soma e soma dos quadrados de uma quantidade, que podem ser
+    # juntadas entre lotes sem guardar os valores
+    def __init__(self):
+        self.contagem = 0
+        self.soma = 0
+        self.soma_quadrados = 0
+        self.minimo = None
+        self.maximo = None
+
+    def adicionar(self, valor):
+        self.contagem += 1
+        self.soma += valor
+        self.soma_quadrados += valor * valor
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+
+    def juntar(self, outra):
+        self.contagem += outra.contagem
+        self.soma += outra.soma
+        self.soma_quadrados += outra.soma_quadrados
+        if outra.contagem:
+            self.minimo = outra.minimo if self.minimo is None else min(self.minimo, outra.minimo)
+            self.maximo = outra.maximo if self.maximo is None else max(self.maximo, outra.maximo)
+
+    def media(self):
+        return self.soma / self.contagem if self.contagem else None
+
+    def desvio(self):
+        if self.contagem < 2:
+            return None
+        variancia = (self.soma_quadrados - self.soma * self.soma / self.contagem) / (self.contagem - 1)
+        return math.sqrt(max(0.0, variancia))
+
+    def como_dicionario(self):
+        media = self.media()
+        desvio = self.desvio()
+        return {"contagem": self.contagem, "media": None if media is None else round(media, 3),
+                "desvio": None if desvio is None else round(desvio, 3),
+                "minimo": self.minimo, "maximo": self.maximo}
+
+class EstatisticasAgente:
+    def __init__(self, agente):
+        self.agente = agente
+        self.partidas = 0
+        self.vitorias = 0
+        self.derrotas = 0
+        self.sem_desfecho = 0
+        self.passos_vitoria = Estatistica()
+        self.passos_derrota = Estatistica()
+        # id da armadilha -> derrotas nela
+        self.armadilhas = Counter()
+
+    def registrar(self, partida):
+        self.partidas += 1
+        if partida.estado == "VITORIA":
+            self.vitorias += 1
+            self.passos_vitoria.adicionar(partida.passos)
+        elif partida.estado == "DERROTA":
+            self.derrotas += 1
+            self.passos_derrota.adicionar(partida.passos)
+            self.armadilhas[partida.no_atual_id] += 1
+        else:
+            self.sem_desfecho += 1
+
+    def juntar(self, outra):
+        self.partidas += outra.partidas
+        self.vitorias += outra.vitorias
+        self.derrotas += outra.derrotas
+        self.sem_desfecho += outra.sem_desfecho
+        self.passos_vitoria.juntar(outra.passos_vitoria)
+        self.passos_derrota.juntar(outra.passos_derrota)
+        self.armadilhas.update(outra.armadilhas)
+
+    def taxa(self, quantidade):
+        return quantidade / self.partidas if self.partidas else 0.0
+
+    def como_dicionario(self):
+        return {
+            "agente": self.agente,
+            "partidas": self.partidas,
+            "vitorias": self.vitorias,
+            "derrotas": self.derrotas,
+            "sem_desfecho": self.sem_desfecho,
+            "taxa_vitoria": round(self.taxa(self.vitorias), 6),
+            "taxa_derrota": round(self.taxa(self.derrotas), 6),
+            "passos_vitoria": self.passos_vitoria.como_dicionario(),
+            "passos_derrota": self.passos_derrota.como_dicionario(),
+            "derrotas_por_armadilha": {str(no_id): quantidade for no_id, quantidade in self.armadilhas.most_common()},
+        }
+
+    def resumo(self):
+        linhas = [f"{self.agente}: {self.partidas} partidas   vitórias {self.taxa(self.vitorias):6.1%}   "
+                  f"derrotas {self.taxa(self.derrotas):6.1%}   sem desfecho {self.taxa(self.sem_desfecho):6.1%}"]
+        for nome, estatistica in (("vitória", self.passos_vitoria), ("derrota", self.passos_derrota)):
+            if estatistica.contagem:
+                desvio = estatistica.desvio()
+                linhas.append(f"  passos até a {nome}: média {estatistica.media():.1f}"
+                              f"{'' if desvio is None else f' ± {desvio:.1f}'}"
+                              f" (mín {estatistica.minimo}, máx {estatistica.maximo})")
+        if self.armadilhas:
+            mais_fatais = ", ".join(f"{no_id} ({quantidade / self.derrotas:.0%})"
+                                    for no_id, quantidade in self.armadilhas.most_common(ARMADILHAS_NO_RESUMO))
+            linhas.append(f"  armadilhas que mais derrubam: {mais_fatais}")
+        return "\n".join(linhas)
+
+# --- Execução ---
+
+def simular_lote(agente, primeira_partida, quantidade, semente, passos_maximos, inicio_aleatorio):
+    # Executado nos processos do pool; devolve as estatísticas do lote
+    aleatorio = random.Random(f"{semente}:{agente}:{primeira_partida}")
+    jogar = AGENTES[agente]
+    partida = PartidaSimulada(_mapa)
+    estatisticas = EstatisticasAgente(agente)
+    inicios = None
+    if inicio_aleatorio:
+        inicios = [no_id for no_id, no in _mapa.grafo.nos.items() if not no.eh_armadilha and not no.eh_tesouro]
+    for _ in range(quantidade):
+        partida.reiniciar(aleatorio.choice(inicios) if inicios else _mapa.inicio_id)
+        jogar(partida, aleatorio, passos_maximos)
+        estatisticas.registrar(partida)
+    return estatisticas
+
+def dividir_em_lotes(agentes, partidas, tamanho_lote):
+    # (agente, primeira partida, quantidade), alternando os agentes para que
+    # o progresso de todos apareça desde o início
+    for primeira in range(0, partidas, tamanho_lote):
+        for agente in agentes:
+            yield agente, primeira, min(tamanho_lote, partidas - primeira)
+
+def executar(caminho_mapa, agentes, partidas, processos=None, tamanho_lote=PARTIDAS_POR_LOTE, semente=1,
+             passos_maximos=PASSOS_MAXIMOS, inicio_aleatorio=False, progresso=None):
+    # Simula partidas de cada agente e devolve {agente: EstatisticasAgente}.
+    # progresso(resultados, partidas feitas, segundos) é chamado a cada lote
+    for agente in agentes:
+        if agente not in AGENTES:
+            raise ValueError(f"agente desconhecido: {agente}")
+    resultados = {agente: EstatisticasAgente(agente) for agente in agentes}
+    lotes = dividir_em_lotes(agentes, partidas, tamanho_lote)
+    feitas = 0
+    inicio = time.perf_counter()
+
+    def juntar(estatisticas):
+        nonlocal feitas
+        resultados[estatisticas.agente].juntar(estatisticas)
+        feitas += estatisticas.partidas
+        if progresso is not None:
+            progresso(resultados, feitas, time.perf_counter() - inicio)
+
+    if processos == 1:
+        iniciar_processo(caminho_mapa)
+        for agente, primeira, quantidade in lotes:
+            juntar(simular_lote(agente, primeira, quantidade, semente, passos_maximos, inicio_aleatorio))
+        return resultados
+
+    processos = processos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=processos, initializer=iniciar_processo,
+                             initargs=(caminho_mapa,)) as executor:
+        # Poucos lotes em andamento por vez, como em buscas_em_lote.py
+        pendentes = set()
+        for agente, primeira, quantidade in lotes:
+            if len(pendentes) >= 2 * processos:
+                prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    juntar(futuro.result())
+            pendentes.add(executor.submit(simular_lote, agente, primeira, quantidade, semente,
+                                          passos_maximos, inicio_aleatorio))
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                juntar(futuro.result())
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula partidas com agentes programados, em vários processos")
+    parser.add_argument("mapa", help="arquivo de mapa (.json ou .ctmapa); 'padrao' usa o mapa original")
+    parser.add_argument("--agentes", default=",".join(AGENTES),
+                        help=f"agentes separados por vírgula ({', '.join(AGENTES)})")
+    parser.add_argument("--partidas", type=int, default=100000, help="partidas de cada agente")
+    parser.add_argument("--passos-maximos", type=int, default=PASSOS_MAXIMOS,
+                        help="passos até a partida terminar sem desfecho")
+    parser.add_argument("--processos", type=int, default=None, help="número de processos (padrão: um por núcleo)")
+    parser.add_argument("--lote", type=int, default=PARTIDAS_POR_LOTE, help="partidas por tarefa")
+    parser.add_argument("--semente", type=int, default=1, help="semente dos sorteios")
+    parser.add_argument("--inicio-aleatorio", action="store_true",
+                        help="cada partida começa num local livre sorteado, em vez do início do mapa")
+    parser.add_argument("--saida", default=None, help="grava as estatísticas finais neste arquivo JSON")
+    args = parser.parse_args()
+    agentes = args.agentes.split(",")
+    for agente in agentes:
+        if agente not in AGENTES:
+            parser.error(f"agente desconhecido: {agente} (opções: {', '.join(AGENTES)})")
+
+    ultimo_progresso = 0.0
+
+    def mostrar_progresso(resultados, feitas, segundos):
+        # Uma linha por segundo na saída de erro, com as taxas até agora
+        nonlocal ultimo_progresso
+        if segundos - ultimo_progresso < INTERVALO_PROGRESSO:
+            return
+        ultimo_progresso = segundos
+        taxas = "   ".join(f"{agente} {estatisticas.taxa(estatisticas.vitorias):.1%}"
+                           for agente, estatisticas in resultados.items())
+        print(f"{feitas} partidas, {feitas / segundos:.0f} partidas/s   vitórias: {taxas}", file=sys.stderr)
+
+    caminho_mapa = None if args.mapa == "padrao" else args.mapa
+    inicio = time.perf_counter()
+    resultados = executar(caminho_mapa, agentes, args.partidas, args.processos, args.lote, args.semente,
+                          args.passos_maximos, args.inicio_aleatorio, mostrar_progresso)
+    segundos = time.perf_counter() - inicio
+    total = sum(estatisticas.partidas for estatisticas in resultados.values())
+
+    for estatisticas in resultados.values():
+        print(estatisticas.resumo())
+    print(f"{total} partidas em {segundos:.2f} s ({total / segundos:.0f} partidas/s)")
+    if args.saida is not None:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump({"mapa": args.mapa, "semente": args.semente, "passos_maximos": args.passos_maximos,
+                       "inicio_aleatorio": args.inicio_aleatorio, "segundos": round(segundos, 3),
+                       "agentes": [estatisticas.como_dicionario() for estatisticas in resultados.values()]},
+                      arquivo, indent=1)
+
+if __name__ == "__main__":
+    main()
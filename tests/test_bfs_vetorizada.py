@@ -0,0 +1,66 @@
+# Motor NumPy de niveis_bfs contra o motor Python: mesmas distâncias e mesmos
+# pais, inclusive quando vários nós da fronteira têm vizinhos em comum (o pai
+# é o primeiro deles na ordem da fila).
+#
+# Uso: python -m unittest discover tests
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    numpy = None
+
+from gerador_mapas import gerar_caverna
+from grafo import MOTOR_NUMPY, MOTOR_PYTHON, Grafo, NoGrafo
+
+def grafo_em_camadas(camadas, largura, semente):
+    # Cada nó de uma camada liga-se a todos os da camada seguinte, com as
+    # listas de vizinhos embaralhadas: cada vizinho aparece várias vezes na
+    # expansão de um nível, vindo de nós diferentes da fronteira
+    aleatorio = random.Random(semente)
+    grafo = Grafo()
+    ids = [[1 + camada * largura + posicao for posicao in range(largura)] for camada in range(camadas)]
+    ids[0] = [0]
+    for camada in ids:
+        for no_id in camada:
+            grafo.adicionar_no(NoGrafo(no_id, f"Local {no_id}", no_id, 0))
+    vizinhos = {no_id: [] for camada in ids for no_id in camada}
+    for atual, seguinte in zip(ids, ids[1:]):
+        for no_id in atual:
+            for vizinho in seguinte:
+                vizinhos[no_id].append(vizinho)
+                vizinhos[vizinho].append(no_id)
+    for no_id, lista in vizinhos.items():
+        aleatorio.shuffle(lista)
+        grafo.definir_vizinhos(no_id, lista)
+    # Uma armadilha no meio, que não pode ser atravessada
+    grafo.nos[ids[camadas // 2][0]].definir_armadilha()
+    return grafo
+
+@unittest.skipIf(numpy is None, "NumPy não instalado")
+class TestNiveisBfsNumpy(unittest.TestCase):
+    def conferir(self, grafo, inicio_id):
+        python = grafo.niveis_bfs(inicio_id, motor=MOTOR_PYTHON)
+        vetorizado = grafo.niveis_bfs(inicio_id, motor=MOTOR_NUMPY)
+        self.assertEqual(len(python), len(vetorizado))
+        for no_id in grafo.nos:
+            self.assertEqual(python.distancia(no_id), vetorizado.distancia(no_id), no_id)
+            self.assertEqual(python.pai(no_id), vetorizado.pai(no_id), no_id)
+
+    def test_vizinhos_compartilhados(self):
+        for semente in range(20):
+            self.conferir(grafo_em_camadas(6, 8, semente), 0)
+
+    def test_caverna(self):
+        for compacto in (False, True):
+            mapa = gerar_caverna(3000, semente=7, compacto=compacto)
+            self.conferir(mapa.grafo, mapa.inicio_id)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# Componentes livres mantidas pelo grafo: armadilhas definidas uma a uma
+# dividem as componentes na hora (sem remontar o índice), e alcancavel
+# responde o mesmo que busca_bfs, inclusive partindo de armadilhas, tanto
+# no Grafo quanto no GrafoCSR.
+#
+# Uso: python -m unittest discover tests
+
+import os
+import random
+import sys
+import unittest
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gerador_mapas import gerar_caverna
+
+def rotulos_por_inundacao(grafo):
+    # Componente de cada nó livre, por BFS a partir de cada nó ainda sem
+    # rótulo
+    rotulos = {}
+    for no_id, no in grafo.nos.items():
+        if no.eh_armadilha or no_id in rotulos:
+            continue
+        rotulos[no_id] = no_id
+        fila = deque([no_id])
+        while fila:
+            for vizinho in grafo.arestas[fila.popleft()]:
+                if vizinho not in rotulos and not grafo.nos[vizinho].eh_armadilha:
+                    rotulos[vizinho] = no_id
+                    fila.append(vizinho)
+    return rotulos
+
+class TestComponentes(unittest.TestCase):
+    def mapas(self):
+        # Caverna pouco ramificada, para que as armadilhas cortem
+        # componentes com frequência
+        for compacto in (False, True):
+            yield "GrafoCSR" if compacto else "Grafo", gerar_caverna(1500, grau_medio=2.3, densidade_armadilhas=0.05,
+                                                                     semente=5, compacto=compacto)
+
+    def conferir_particao(self, componentes, grafo):
+        # Dois nós livres estão na mesma componente do índice se e só se a
+        # inundação os põe juntos
+        rotulos = rotulos_por_inundacao(grafo)
+        raiz_do_rotulo = {}
+        rotulo_da_raiz = {}
+        for no_id, rotulo in rotulos.items():
+            raiz = componentes.componente(componentes.indice(no_id))
+            self.assertEqual(raiz_do_rotulo.setdefault(rotulo, raiz), raiz, no_id)
+            self.assertEqual(rotulo_da_raiz.setdefault(raiz, rotulo), rotulo, no_id)
+
+    def test_armadilhas_incrementais(self):
+        for descricao, mapa in self.mapas():
+            with self.subTest(descricao):
+                grafo = mapa.grafo
+                componentes = grafo.obter_componentes()
+                aleatorio = random.Random(8)
+                livres = [no_id for no_id, no in grafo.nos.items() if not no.eh_armadilha]
+                aleatorio.shuffle(livres)
+                ids = list(grafo.nos)
+                for numero, no_id in enumerate(livres[:300], 1):
+                    grafo.nos[no_id].definir_armadilha()
+                    # Só armadilhas novas: nada de aproximação para remontar
+                    self.assertFalse(componentes.aproximado)
+                    if numero % 25:
+                        continue
+                    self.conferir_particao(componentes, grafo)
+                    for _ in range(40):
+                        inicio_id = aleatorio.choice(ids)
+                        destino_id = aleatorio.choice(ids)
+                        caminho = grafo.busca_bfs(inicio_id, destino_id, registrar_historico=False)[0]
+                        self.assertEqual(grafo.alcancavel(inicio_id, destino_id), caminho is not None,
+                                         (inicio_id, destino_id))
+                self.assertIs(grafo.componentes, componentes)
+                # Os elementos abandonados não crescem sem limite
+                self.assertLessEqual(len(componentes.pais), 2 * len(grafo.nos))
+
+    def test_armadilha_que_isola_o_tesouro(self):
+        for descricao, mapa in self.mapas():
+            with self.subTest(descricao):
+                grafo = mapa.grafo
+                tesouro_id = mapa.tesouros[0]
+                self.assertTrue(grafo.alcancavel(mapa.inicio_id, tesouro_id))
+                for vizinho in grafo.arestas[tesouro_id]:
+                    grafo.nos[vizinho].definir_armadilha()
+                self.assertFalse(grafo.alcancavel(mapa.inicio_id, tesouro_id))
+                self.assertIsNone(grafo.busca_bfs(mapa.inicio_id, tesouro_id, registrar_historico=False)[0])
+                # Partindo de uma das armadilhas vizinhas, o tesouro está a um passo
+                self.assertTrue(grafo.alcancavel(grafo.arestas[tesouro_id][0], tesouro_id))
+                self.conferir_particao(grafo.componentes, grafo)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+# Gravação de sessões (.ctgrav): ida e volta de todos os tipos de registro,
+# arquivo cortado em qualquer byte (jogo interrompido), índice do rodapé
+# igual ao montado pela varredura, e a reprodução a partir de um instante
+# chegando ao mesmo estado que a leitura desde o início.
+#
+# Uso: python -m unittest discover tests
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gravacao import (REGISTRO_BUSCA, REGISTRO_EVENTOS, REGISTRO_FIM_BUSCA, REGISTRO_MOVIMENTO,
+                      REGISTRO_PARTIDA, REGISTRO_PASSOS, RODAPE_GRAVACAO, GravadorSessao, LeitorGravacao)
+from mapas import mapa_padrao
+
+try:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame  # noqa: F401
+except ImportError:
+    pygame = None
+
+class Relogio:
+    # Relógio do gravador controlado pelo teste, em segundos
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+def gravar_sessao(caminho_arquivo, relogio):
+    # Duas partidas de alguns segundos com movimentos e uma busca cada;
+    # devolve os registros esperados como (tipo, tempo_ms, dados)
+    grafo = mapa_padrao().grafo
+    gravador = GravadorSessao(caminho_arquivo, relogio)
+    esperados = []
+    for partida in range(2):
+        relogio.agora += 0.75
+        gravador.partida(len(grafo.nos), 1, "mapa.ctmapa" if partida else None)
+        esperados.append((REGISTRO_PARTIDA, int(relogio.agora * 1000), (len(grafo.nos), 1, "mapa.ctmapa" if partida else None)))
+        for no_id in (2, 5, 2):
+            relogio.agora += 0.4
+            gravador.movimento(no_id)
+            esperados.append((REGISTRO_MOVIMENTO, int(relogio.agora * 1000), (no_id,)))
+        relogio.agora += 0.3
+        caminho, historico = grafo.busca_bfs(2, 15)[:2]
+        gravador.busca("BFS", 2, 15, historico)
+        esperados.append((REGISTRO_BUSCA, int(relogio.agora * 1000), ("BFS", 2, 15)))
+        relogio.agora += 1.2
+        gravador.fim_busca(caminho)
+        tempo = int(relogio.agora * 1000)
+        esperados.append((REGISTRO_EVENTOS, tempo, (historico.tipos, historico.nos)))
+        esperados.append((REGISTRO_PASSOS, tempo, (historico.fim_passo, historico.passo_no, historico.passo_pai)))
+        esperados.append((REGISTRO_FIM_BUSCA, tempo, (caminho,)))
+    gravador.fechar()
+    return esperados
+
+class TestGravacao(unittest.TestCase):
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.arquivo = os.path.join(pasta.name, "sessao.ctgrav")
+        self.esperados = gravar_sessao(self.arquivo, Relogio())
+
+    def test_ida_e_volta(self):
+        leitor = LeitorGravacao(self.arquivo)
+        self.assertIsNotNone(leitor.entradas)
+        lidos = [(registro.tipo, registro.tempo_ms, registro.dados) for registro in leitor.registros()]
+        self.assertEqual(lidos, self.esperados)
+        # Pulando os dados, os cabeçalhos são os mesmos
+        pulados = [(registro.tipo, registro.tempo_ms) for registro in leitor.registros(tipos={REGISTRO_MOVIMENTO})]
+        self.assertEqual(pulados, [esperado[:2] for esperado in self.esperados])
+
+    def test_indice_do_rodape_igual_ao_da_varredura(self):
+        com_rodape = LeitorGravacao(self.arquivo)
+        with open(self.arquivo, 'rb') as arquivo:
+            dados = arquivo.read()
+        # Sem o rodapé o arquivo é o de uma gravação interrompida logo
+        # depois do registro de índice, que a leitura ignora
+        sem_rodape_arquivo = self.arquivo + ".cortado"
+        with open(sem_rodape_arquivo, 'wb') as arquivo:
+            arquivo.write(dados[:-RODAPE_GRAVACAO.size])
+        sem_rodape = LeitorGravacao(sem_rodape_arquivo)
+        self.assertIsNone(sem_rodape.entradas)
+        self.assertEqual(len(list(sem_rodape.registros())), len(self.esperados))
+        self.assertEqual(com_rodape.indice(), sem_rodape.indice())
+        for tempo_ms in range(0, 8000, 50):
+            self.assertEqual(com_rodape.posicao_da_partida(tempo_ms), sem_rodape.posicao_da_partida(tempo_ms), tempo_ms)
+
+    def test_registro_cortado_no_fim(self):
+        # O arquivo cortado em qualquer byte devolve os registros inteiros
+        # anteriores ao corte, sem erro
+        with open(self.arquivo, 'rb') as arquivo:
+            dados = arquivo.read()
+        cortado = self.arquivo + ".cortado"
+        completos = [len(self.esperados)]
+        for tamanho in range(len(dados) - 1, 11, -1):
+            with open(cortado, 'wb') as arquivo:
+                arquivo.write(dados[:tamanho])
+            leitor = LeitorGravacao(cortado)
+            lidos = [(registro.tipo, registro.tempo_ms, registro.dados) for registro in leitor.registros()]
+            self.assertEqual(lidos, self.esperados[:len(lidos)], tamanho)
+            self.assertLessEqual(len(lidos), completos[-1])
+            completos.append(len(lidos))
+            leitor.indice()
+        self.assertEqual(completos[-1], 0)
+
+    def test_posicao_da_partida(self):
+        leitor = LeitorGravacao(self.arquivo)
+        partidas = [registro for registro in leitor.registros(tipos=()) if registro.tipo == REGISTRO_PARTIDA]
+        self.assertIsNone(leitor.posicao_da_partida(partidas[0].tempo_ms))
+        self.assertEqual(leitor.posicao_da_partida(partidas[0].tempo_ms + 1)[0], partidas[0].posicao[0])
+        self.assertEqual(leitor.posicao_da_partida(partidas[1].tempo_ms)[0], partidas[0].posicao[0])
+        self.assertEqual(leitor.posicao_da_partida(10 ** 9)[0], partidas[1].posicao[0])
+
+@unittest.skipIf(pygame is None, "pygame não instalado")
+class TestReproducaoAPartirDe(unittest.TestCase):
+    def test_mesmo_estado_que_desde_o_inicio(self):
+        from jogo_caca_tesouro_pygame import ESTADOS_ANIMACAO, Jogo
+        from reproducao import ReproducaoSessao
+
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        arquivo = os.path.join(pasta.name, "sessao.ctgrav")
+        relogio = Relogio()
+        jogo = Jogo()
+        jogo.gravador = GravadorSessao(arquivo, relogio)
+        jogo.gravar_partida()
+        for rodada in range(3):
+            for algoritmo in ("BFS", "DFS"):
+                relogio.agora += 0.5
+                jogo.calcular_caminho(algoritmo)
+                jogo.avanco_rapido = True
+                while jogo.estado in ESTADOS_ANIMACAO:
+                    jogo.atualizar_animacao()
+                for _ in range(2):
+                    relogio.agora += 0.35
+                    livres = [no_id for no_id in jogo.grafo.arestas[jogo.no_atual_id]
+                              if not jogo.grafo.nos[no_id].eh_armadilha]
+                    jogo.mover_para(livres[rodada % len(livres)])
+            relogio.agora += 0.5
+            jogo.reiniciar()
+        jogo.encerrar_gravacao()
+
+        leitor = LeitorGravacao(arquivo)
+        fim_ms = int(relogio.agora * 1000) + 500
+        for inicio_ms in range(1, fim_ms, 125):
+            estados = []
+            for usar_indice in (True, False):
+                leitor_teste = LeitorGravacao(arquivo)
+                if not usar_indice:
+                    # Leitura desde o início, sem o atalho do índice
+                    leitor_teste.posicao_da_partida = lambda tempo_ms: None
+                reproducao = ReproducaoSessao(Jogo(), leitor_teste, inicio_ms)
+                jogo_reproduzido = reproducao.jogo
+                proximo = reproducao.proximo
+                estados.append((jogo_reproduzido.no_atual_id, jogo_reproduzido.historico_movimentos,
+                                jogo_reproduzido.caminho_atual, jogo_reproduzido.estado,
+                                None if proximo is None else proximo.posicao[0]))
+            self.assertEqual(estados[0], estados[1], inicio_ms)
+        self.assertIsNotNone(leitor.entradas)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# Histórico das buscas: um CursorHistorico levado a passos sorteados, para
+# frente e para trás, reconstrói os mesmos visitados, fronteira e armadilhas
+# evitadas que reaplicar o log de eventos desde o início; e os checkpoints
+# ficam espaçados por pelo menos max(intervalo, tamanho do estado).
+#
+# Uso: python -m unittest discover tests
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gerador_mapas import gerar_caverna
+from grafo import consumir_passos
+from historico_busca import EVENTO_EVITAR_ARMADILHA, HistoricoBusca, aplicar_evento
+
+def estado_desde_o_inicio(historico, indice):
+    # Reaplica os eventos até o fim do passo, sem checkpoints nem cursor
+    visitados, fronteira, armadilhas_evitadas = set(), set(), set()
+    for i in range(historico.fim_passo[indice]):
+        aplicar_evento(historico.tipos[i], historico.nos[i], visitados, fronteira, armadilhas_evitadas)
+    return visitados, fronteira, armadilhas_evitadas
+
+class TestHistoricoBusca(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Densidade de armadilhas alta, para haver eventos "evita armadilha"
+        cls.mapa = gerar_caverna(3000, densidade_armadilhas=0.15, semente=11)
+
+    def historicos(self):
+        grafo = self.mapa.grafo
+        for nome in ("passos_bfs", "passos_dfs"):
+            for intervalo in (1, 16, 1024):
+                historico = HistoricoBusca(intervalo_checkpoint=intervalo)
+                passos = getattr(grafo, nome)(self.mapa.inicio_id, self.mapa.tesouros[0], historico_busca=historico)
+                consumir_passos(passos)
+                yield f"{nome}, intervalo {intervalo}", historico
+
+    def test_cursor_igual_a_reaplicar_o_log(self):
+        aleatorio = random.Random(3)
+        for descricao, historico in self.historicos():
+            with self.subTest(descricao):
+                self.assertGreater(len(historico), 100)
+                self.assertIn(EVENTO_EVITAR_ARMADILHA, historico.tipos)
+                cursor = historico.cursor()
+                # Saltos longos nos dois sentidos e passos vizinhos (o caminho
+                # de desfazer eventos sem checkpoint)
+                indices = [aleatorio.randrange(len(historico)) for _ in range(120)]
+                indices += [len(historico) - 1, 0, len(historico) - 1]
+                for indice in list(indices[:20]):
+                    indices += [max(0, indice - 1), min(len(historico) - 1, indice + 1), indice]
+                for indice in indices:
+                    cursor.ir_para(indice)
+                    self.assertEqual((cursor.visitados, cursor.fronteira, cursor.armadilhas_evitadas),
+                                     estado_desde_o_inicio(historico, indice), indice)
+
+    def test_espacamento_dos_checkpoints(self):
+        for descricao, historico in self.historicos():
+            with self.subTest(descricao):
+                eventos = historico.eventos_checkpoint
+                for numero in range(1, len(eventos)):
+                    tamanho = sum(len(conjunto) for conjunto in historico.checkpoints[numero])
+                    intervalo = eventos[numero] - eventos[numero - 1]
+                    self.assertGreaterEqual(intervalo, historico.intervalo_checkpoint)
+                    self.assertGreaterEqual(intervalo, tamanho)
+                # Memória dos checkpoints linear no número de eventos
+                total = sum(len(conjunto) for checkpoint in historico.checkpoints for conjunto in checkpoint)
+                self.assertLessEqual(total, len(historico.tipos))
+
+if __name__ == "__main__":
+    unittest.main()
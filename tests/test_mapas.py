@@ -0,0 +1,113 @@
+# Arquivos de mapa: ida e volta entre o formato texto (.json), o binário
+# (.ctmapa) e o modelo compartilhado (carregar_modelo) preservando nós,
+# arestas na ordem, pesos, armadilhas e tesouros; .ctmapa -> .json ->
+# .ctmapa devolvendo o mesmo arquivo; e o modelo congelado recusando
+# alterações.
+#
+# Uso: python -m unittest discover tests
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gerador_mapas import gerar_caverna
+from mapas import carregar_mapa, carregar_modelo, mapa_padrao, salvar_mapa
+
+def descrever(mapa):
+    # Tudo o que os arquivos de mapa guardam, em tipos comparáveis
+    grafo = mapa.grafo
+    return {
+        "inicio": mapa.inicio_id,
+        "tesouros": list(mapa.tesouros),
+        "nos": [(no_id, no.nome, no.pos_x, no.pos_y) for no_id, no in grafo.nos.items()],
+        "arestas": {no_id: list(vizinhos) for no_id, vizinhos in grafo.arestas.items()},
+        "pesos": {(no_id, vizinho): grafo.peso(no_id, vizinho)
+                  for no_id, vizinhos in grafo.arestas.items() for vizinho in vizinhos},
+        "armadilhas": [no_id for no_id, no in grafo.nos.items() if no.eh_armadilha],
+        "marcados_tesouro": [no_id for no_id, no in grafo.nos.items() if no.eh_tesouro],
+    }
+
+class TestMapas(unittest.TestCase):
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.pasta = pasta.name
+
+    def caminho(self, nome):
+        return os.path.join(self.pasta, nome)
+
+    def ler_bytes(self, nome):
+        with open(self.caminho(nome), 'rb') as arquivo:
+            return arquivo.read()
+
+    def test_ida_e_volta_entre_formatos(self):
+        # Mapa com nomes (o original) e mapas gerados, sem nomes, nas duas
+        # representações do grafo
+        mapas = {
+            "original": mapa_padrao(),
+            "caverna": gerar_caverna(400, semente=4, num_tesouros=3),
+            "caverna compacta": gerar_caverna(400, semente=4, num_tesouros=3, compacto=True),
+        }
+        for descricao, mapa in mapas.items():
+            with self.subTest(descricao):
+                esperado = descrever(mapa)
+                salvar_mapa(mapa, self.caminho("a.json"))
+                salvar_mapa(carregar_mapa(self.caminho("a.json")), self.caminho("b.ctmapa"))
+                salvar_mapa(carregar_mapa(self.caminho("b.ctmapa")), self.caminho("c.json"))
+                for nome in ("a.json", "b.ctmapa", "c.json"):
+                    self.assertEqual(descrever(carregar_mapa(self.caminho(nome))), esperado, nome)
+                    self.assertEqual(descrever(carregar_modelo(self.caminho(nome))), esperado, nome)
+                self.assertEqual(self.ler_bytes("a.json"), self.ler_bytes("c.json"))
+
+                salvar_mapa(carregar_mapa(self.caminho("c.json")), self.caminho("d.ctmapa"))
+                self.assertEqual(self.ler_bytes("b.ctmapa"), self.ler_bytes("d.ctmapa"))
+
+    def test_binario_sem_nomes_volta_igual(self):
+        # Gerado direto em .ctmapa (ids consecutivos, sem seção de nomes):
+        # passar pelo .json não muda os marcadores do cabeçalho
+        salvar_mapa(gerar_caverna(1000, semente=9, compacto=True), self.caminho("a.ctmapa"))
+        salvar_mapa(carregar_mapa(self.caminho("a.ctmapa")), self.caminho("b.json"))
+        salvar_mapa(carregar_mapa(self.caminho("b.json")), self.caminho("c.ctmapa"))
+        self.assertEqual(self.ler_bytes("a.ctmapa"), self.ler_bytes("c.ctmapa"))
+
+    def test_pesos_explicitos(self):
+        mapa = mapa_padrao()
+        no_id = mapa.inicio_id
+        vizinho = mapa.grafo.arestas[no_id][0]
+        mapa.grafo.definir_peso(no_id, vizinho, 1.5)
+        salvar_mapa(mapa, self.caminho("pesos.json"))
+        carregado = carregar_mapa(self.caminho("pesos.json"))
+        self.assertEqual(descrever(carregado), descrever(mapa))
+        self.assertEqual(carregado.grafo.peso(vizinho, no_id), 1.5)
+        # O binário não guarda pesos: recusa em vez de perdê-los
+        with self.assertRaises(ValueError):
+            salvar_mapa(carregado, self.caminho("pesos.ctmapa"))
+
+    def test_modelo_congelado(self):
+        mapa = mapa_padrao()
+        salvar_mapa(mapa, self.caminho("modelo.json"))
+        salvar_mapa(mapa, self.caminho("modelo.ctmapa"))
+        for nome in (None, "modelo.json", "modelo.ctmapa"):
+            with self.subTest(nome):
+                caminho = None if nome is None else self.caminho(nome)
+                modelo = carregar_modelo(caminho)
+                self.assertIs(carregar_modelo(caminho), modelo)
+                antes = descrever(modelo)
+                grafo = modelo.grafo
+                no_id = modelo.inicio_id
+                vizinho = grafo.arestas[no_id][0]
+                with self.assertRaises(ValueError):
+                    grafo.definir_peso(no_id, vizinho, 1.0)
+                with self.assertRaises(ValueError):
+                    grafo.nos[vizinho].definir_armadilha()
+                if hasattr(grafo, "adicionar_aresta"):
+                    distante = next(outro for outro in grafo.nos if outro != no_id and outro not in grafo.arestas[no_id])
+                    with self.assertRaises(ValueError):
+                        grafo.adicionar_aresta(no_id, distante)
+                self.assertEqual(descrever(modelo), antes)
+
+if __name__ == "__main__":
+    unittest.main()
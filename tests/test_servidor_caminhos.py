@@ -0,0 +1,109 @@
+# Servidor de caminhos num socket Unix, com o mapa original e o executor
+# padrão (processos): respostas de caminho, recusa sem busca de destinos
+# inalcançáveis e os pedidos inválidos que não podem derrubar a conexão.
+#
+# Uso: python -m unittest discover tests
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cliente_caminhos import LIMITE_LINHA, ClienteCaminhos
+from mapas import carregar_modelo
+from servidor_caminhos import ServidorCaminhos, criar_executor, servir
+
+class TestServidorCaminhos(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.mapa = carregar_modelo()
+        cls.mapa.grafo.obter_componentes()
+        cls.executor, mapa_no_executor = criar_executor(None, processos=1)
+        cls.servidor = ServidorCaminhos(cls.mapa, cls.executor, mapa_no_executor)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def executar(self, teste):
+        # Sobe o servidor num socket Unix temporário, roda teste(caminho) e
+        # derruba o servidor
+        async def rodar():
+            with tempfile.TemporaryDirectory() as pasta:
+                caminho = os.path.join(pasta, "caca.sock")
+                # servir anuncia o endereço em stderr
+                with contextlib.redirect_stderr(io.StringIO()):
+                    tarefa = asyncio.create_task(servir(self.servidor, caminho_unix=caminho))
+                    while not os.path.exists(caminho):
+                        await asyncio.sleep(0.01)
+                try:
+                    await teste(caminho)
+                finally:
+                    tarefa.cancel()
+                    await asyncio.gather(tarefa, return_exceptions=True)
+        asyncio.run(rodar())
+
+    def test_caminho_igual_ao_da_bfs(self):
+        grafo = self.mapa.grafo
+        esperado = grafo.busca_bfs(1, 15, registrar_historico=False)[0]
+
+        async def teste(caminho):
+            cliente = await ClienteCaminhos.conectar(caminho_unix=caminho)
+            resposta = await cliente.caminho(1, 15)
+            await cliente.fechar()
+            self.assertEqual(resposta["caminho"], esperado)
+            self.assertEqual(resposta["passos"], len(esperado) - 1)
+            self.assertAlmostEqual(resposta["custo"], grafo.custo_caminho(esperado))
+        self.executar(teste)
+
+    def test_destino_inalcancavel_sem_busca(self):
+        # O local 4 é uma armadilha: nenhuma busca chega a ele
+        self.assertTrue(self.mapa.grafo.nos[4].eh_armadilha)
+
+        async def teste(caminho):
+            cliente = await ClienteCaminhos.conectar(caminho_unix=caminho)
+            antes = await cliente.estatisticas()
+            resposta = await cliente.caminho(1, 4)
+            depois = await cliente.estatisticas()
+            await cliente.fechar()
+            self.assertIsNone(resposta["passos"])
+            self.assertIsNone(resposta["caminho"])
+            self.assertEqual(depois["buscas"], antes["buscas"])
+            self.assertEqual(depois["recusados"], antes["recusados"] + 1)
+        self.executar(teste)
+
+    def test_ids_booleanos_recusados(self):
+        async def teste(caminho):
+            cliente = await ClienteCaminhos.conectar(caminho_unix=caminho)
+            # true/false do JSON não são ids de local, mesmo valendo 1/0
+            for pedido in ({"tipo": "caminho", "inicio": True, "destino": 2},
+                           {"tipo": "caminho", "inicio": True, "destino": True},
+                           {"tipo": "caminho", "inicio": 1, "destino": False},
+                           {"tipo": "movimento", "de": True, "para": 2}):
+                with self.assertRaises(ValueError, msg=pedido):
+                    await cliente.pedir(pedido)
+            # A conexão continua atendendo
+            self.assertEqual((await cliente.movimento(1, 2))["valido"], True)
+            await cliente.fechar()
+        self.executar(teste)
+
+    def test_linha_longa_encerra_a_conexao(self):
+        async def teste(caminho):
+            leitor, escritor = await asyncio.open_unix_connection(caminho, limit=LIMITE_LINHA)
+            escritor.write(json.dumps({"id": 1, "tipo": "mapa", "x": "a" * 200_000}).encode() + b"\n")
+            escritor.write(json.dumps({"id": 2, "tipo": "mapa"}).encode() + b"\n")
+            await escritor.drain()
+            resposta = json.loads(await leitor.readline())
+            self.assertEqual(resposta, {"id": None, "erro": "pedido muito longo"})
+            self.assertEqual(await leitor.readline(), b"")
+            escritor.close()
+        self.executar(teste)
+
+if __name__ == "__main__":
+    unittest.main()